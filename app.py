@@ -1,11 +1,29 @@
 #!/usr/bin/env python3
 
 
+import json
+import os
+from collections import OrderedDict
+from contextlib import nullcontext
+
 import streamlit as st
+import numpy as np
 import pandas as pd
-from collections import Counter
-from rag.indexer import load_index, search
-from rag.pipeline import rag_query
+from rag import metrics
+from rag.aggregates import answer_aggregate, vacancy_table
+from rag.cards import result_cards
+from rag.diversity import DEFAULT_LAMBDA
+from rag.fields import DEFAULT_FIELD_WEIGHTS
+from rag.freshness import DEFAULT_DECAY_WEIGHT, DEFAULT_HALF_LIFE_DAYS
+from rag.indexer import parse_query, search, skill_facets
+from rag.pipeline import extractive_answer, rag_query
+from rag.profiling import Profiler
+from rag.reloader import IndexReloader
+from rag.tombstones import COMPACT_THRESHOLD
+
+# RAG_METRICS=1 records counters / latency histograms (see rag.metrics), RAG_METRICS_FILE exports them
+if os.environ.get("RAG_METRICS"):
+    metrics.enable(otel=os.environ.get("RAG_METRICS") == "otel")
 
 
 # --- Page config ---
@@ -19,25 +37,30 @@ st.title("🔍 RAG по вакансиям hh.kz")
 st.caption("Семантический поиск и анализ IT-вакансий Казахстана")
 
 
-# --- Load index (cached) ---
+# --- Load index (one reloader per server, swaps in new versions in the background) ---
 @st.cache_resource
-def get_index():
+def get_reloader():
 
 
-    return load_index()
+    # RAG_COMPACT_THRESHOLD: deleted share of chunks at which closed vacancies are compacted out ("" = never)
+    threshold = os.environ.get("RAG_COMPACT_THRESHOLD", str(COMPACT_THRESHOLD))
+    return IndexReloader(interval=float(os.environ.get("RAG_RELOAD_INTERVAL", 10)),
+                         compact_threshold=float(threshold) if threshold else None).start()
 
 
 try:
-    index, model, chunks = get_index()
+    # One snapshot for the whole script run: a reload mid-run cannot mix versions
+    snapshot = get_reloader().current
 except Exception as e:
     st.error(f"Не удалось загрузить индекс: {e}")
     st.info("Сначала запустите: `python build_index.py`")
     st.stop()
+index, model, chunks, columns = snapshot.index, snapshot.model, snapshot.chunks, snapshot.columns
 
 
-# --- Precompute metadata for filters ---
-@st.cache_data
-def get_metadata(_chunks):
+# --- Precompute metadata for filters (per index version) ---
+@st.cache_data(max_entries=2)
+def get_metadata(version, _chunks):
     cities = sorted(set(c.get("area", "") for c in _chunks if c.get("area")))
     companies = sorted(set(c.get("employer", "") for c in _chunks if c.get("employer")))
     unique_vacancies = len(set(c["vacancy_id"] for c in _chunks))
@@ -46,22 +69,21 @@ def get_metadata(_chunks):
     return cities, companies, unique_vacancies
 
 
-cities, companies, n_vacancies = get_metadata(chunks)
+cities, companies, n_vacancies = get_metadata(snapshot.version, chunks)
+
 
+# --- Vacancy table for exact answers to aggregate questions (per index version and tombstones) ---
+@st.cache_resource(max_entries=2)
+def get_vacancy_table(version, tombstones, _chunks, _columns):
+    # Shared and read-only: cache_resource skips cache_data's copy of the frame on every rerun
+    return vacancy_table(_chunks, _columns)
 
-def _format_salary(r: dict) -> str:
-    """Format salary for display."""
-    parts = []
-    if r.get("salary_from"):
-        parts.append(f"от {r['salary_from']:,}")
-    if r.get("salary_to"):
-        parts.append(f"до {r['salary_to']:,}")
-    s = " ".join(parts)
-    if s and r.get("salary_currency"):
-        s += f" {r['salary_currency']}"
 
+table = get_vacancy_table(snapshot.version, snapshot.tombstones, chunks, columns)
 
-    return s
+# Searches kept per session (results, cards, LLM answer) and vacancy cards per results page
+SEARCH_CACHE_SIZE = 16
+PAGE_SIZE = 10
 
 
 # ======= SIDEBAR =========
@@ -74,14 +96,53 @@ st.sidebar.subheader("Фильтры")
 
 filter_city = st.sidebar.selectbox("Город", ["Все"] + cities)
 filter_salary = st.sidebar.number_input(
-    "Мин. зарплата (KZT)", min_value=0, max_value=5_000_000, value=0, step=50_000,
-    help="Показывать только вакансии с указанной зарплатой не ниже этого значения"
+    "Мин. зарплата (KZT, на руки)", min_value=0, max_value=5_000_000, value=0, step=50_000,
+    help="Показывать только вакансии с указанной зарплатой не ниже этого значения. "
+         "Зарплаты в других валютах и «до вычета налогов» пересчитываются в KZT на руки"
 )
 filter_experience = st.sidebar.selectbox(
     "Опыт",
     ["Любой", "Нет опыта", "От 1 до 3 лет", "От 3 до 6 лет", "Более 6 лет"],
 )
 
+# Skills sorted by the number of vacancies that have them
+skill_options = []
+if columns is not None and "skill_vocab" in columns:
+    order = np.argsort(-np.diff(columns["skill_postings_indptr"]), kind="stable")
+    skill_options = columns["skill_vocab"][order].tolist()
+filter_skills = st.sidebar.multiselect("Навыки", skill_options, help="Вакансия должна содержать все выбранные навыки")
+
+FRESHNESS_OPTIONS = {"Любая": None, "За сутки": 1, "За 3 дня": 3, "За неделю": 7, "За месяц": 30}
+filter_age = st.sidebar.selectbox("Дата публикации", list(FRESHNESS_OPTIONS))
+prefer_fresh = st.sidebar.checkbox(
+    "Поднимать свежие вакансии", value=True,
+    help=f"Оценка вакансии снижается с возрастом: через {DEFAULT_HALF_LIFE_DAYS:.0f} дней — "
+         f"на {DEFAULT_DECAY_WEIGHT / 2:.0%}, без даты — на {DEFAULT_DECAY_WEIGHT:.0%}",
+)
+freshness = {} if prefer_fresh else None
+understand_query = st.sidebar.checkbox(
+    "Распознавать фильтры в запросе", value=True,
+    help="«в Алматы», «от 500K», «опыт от 3 лет» в тексте запроса работают как фильтры; фильтры сайдбара важнее",
+)
+# Multi-field index (build_index.py --multi-field): the vectors are wider than the encoder's
+field_weights = None
+if index.d != model.get_sentence_embedding_dimension():
+    with st.sidebar.expander("Веса полей"):
+        field_labels = {"text": "Описание", "title": "Название", "skills": "Навыки"}
+        field_weights = {f: st.slider(label, 0.0, 1.0, DEFAULT_FIELD_WEIGHTS[f], 0.05)
+                         for f, label in field_labels.items()}
+        if not any(field_weights.values()):
+            field_weights = None
+diversity = None
+if st.sidebar.checkbox("Разнообразить выдачу", value=True,
+                       help="Меньше почти одинаковых вакансий подряд (MMR по векторам кандидатов)"):
+    diversity = {
+        "lambda": st.sidebar.slider("Релевантность ↔ разнообразие", 0.0, 1.0, DEFAULT_LAMBDA, 0.05,
+                                    help="1 — обычный порядок по релевантности"),
+        "max_per_employer": st.sidebar.number_input("Не больше результатов от одной компании", 0, 30, 3,
+                                                    help="0 — без ограничения") or None,
+    }
+
 # Build filters dict
 filters = {}
 if filter_city != "Все":
@@ -90,6 +151,10 @@ if filter_salary > 0:
     filters["salary_min"] = filter_salary
 if filter_experience != "Любой":
     filters["experience"] = filter_experience
+if filter_skills:
+    filters["skills"] = filter_skills
+if FRESHNESS_OPTIONS[filter_age]:
+    filters["max_age_days"] = FRESHNESS_OPTIONS[filter_age]
 
 # --- LLM ---
 st.sidebar.markdown("---")
@@ -108,6 +173,13 @@ if llm_backend == "ollama":
 elif llm_backend == "openai":
     llm_model = st.sidebar.text_input("OpenAI model", "gpt-4o-mini")
     api_key = st.sidebar.text_input("OpenAI API Key", type="password")
+llm_deadline = None
+if llm_backend != "none":
+    # RAG_LLM_DEADLINE: default seconds to wait before falling back to the extractive answer
+    llm_deadline = st.sidebar.number_input(
+        "Ждать ответ LLM, сек", 0, 300, int(os.environ.get("RAG_LLM_DEADLINE", 60)),
+        help="Дольше — показывается быстрый ответ по найденным вакансиям; 0 — ждать сколько потребуется",
+    ) or None
 
 # --- Stats ---
 st.sidebar.markdown("---")
@@ -117,6 +189,19 @@ col1.metric("Вакансий", n_vacancies)
 col2.metric("Компаний", len(companies))
 st.sidebar.metric("Городов", len(cities))
 st.sidebar.metric("Чанков в индексе", index.ntotal)
+if snapshot.version:
+    st.sidebar.caption(f"Версия индекса: {snapshot.version}")
+if columns is not None and "deleted" in columns and columns["deleted"].any():
+    st.sidebar.caption(f"Скрыто закрытых вакансий: {int(columns['deleted'].sum())} чанков")
+if get_reloader().last_error:
+    st.sidebar.warning(f"Новая версия индекса не загружена: {get_reloader().last_error}")
+
+# Each query -> data/profiles/query-*/ (cProfile, flamegraph stacks, per-stage wall/CPU/memory)
+profile_queries = st.sidebar.checkbox("Профилировать запросы", value=bool(os.environ.get("RAG_PROFILE")))
+
+if metrics.enabled():
+    with st.sidebar.expander("Метрики (Prometheus)"):
+        st.code(metrics.prometheus_text() or "—", language="text")
 
 
 # ======== MAIN AREA ==========
@@ -145,145 +230,219 @@ with tab_search:
     )
 
     if query:
-        with st.spinner("Ищу релевантные вакансии..."):
-            results = search(query, index, model, chunks, top_k=top_k, filters=filters if filters else None)
-
+        # Reruns after widget changes (pages, expanders) reuse the session's earlier searches
+        cache = st.session_state.setdefault("search_cache", OrderedDict())
+        cache_key = json.dumps([snapshot.version, snapshot.tombstones, query, filters, top_k, freshness is not None,
+                                understand_query, field_weights, diversity, llm_backend, llm_model, llm_deadline],
+                               ensure_ascii=False, sort_keys=True, default=str)
+        entry = None if profile_queries else cache.get(cache_key)
+        if entry is not None:
+            cache.move_to_end(cache_key)
+        else:
+            # Search and LLM answer under one trace, so the breakdown (and a profile) covers both
+            profiler = Profiler("query") if profile_queries else None
+            with (profiler or nullcontext()), metrics.trace() as timings:
+                # "средняя зарплата Python в Алматы": counted over the whole base, not the top-k
+                with metrics.span("aggregate"):
+                    aggregate = answer_aggregate(query, table, filters=filters if filters else None)
+                with st.spinner("Ищу релевантные вакансии..."):
+                    results = search(query, index, model, chunks, top_k=top_k, filters=filters if filters else None,
+                                     columns=columns, freshness=freshness, parse_queries=understand_query,
+                                     field_weights=field_weights, diversity=diversity)
+
+                response, llm_error, summary = None, None, None
+                if results:
+                    # Extractive answer right away; the LLM's replaces it when (and if) it arrives in time
+                    with metrics.span("extractive"):
+                        summary = extractive_answer(query, results)
+                if results and llm_backend != "none":
+                    placeholder = st.empty()
+                    with placeholder.container():
+                        if aggregate is not None:
+                            st.markdown("### 📊 Точный ответ по базе")
+                            st.info(aggregate["answer"])
+                        else:
+                            st.markdown("### ⚡ Быстрый ответ")
+                            st.info(summary["answer"])
+                    with st.spinner("🤖 Генерирую ответ..."):
+                        try:
+                            kwargs = {}
+                            if llm_backend == "openai" and api_key:
+                                kwargs["api_key"] = api_key
+                            response = rag_query(
+                                query, index, model, chunks,
+                                llm_backend=llm_backend,
+                                llm_model=llm_model,
+                                top_k=top_k,
+                                columns=columns,
+                                filters=filters if filters else None,
+                                parse_queries=understand_query,
+                                field_weights=field_weights,
+                                diversity=diversity,
+                                freshness=freshness,
+                                llm_deadline=llm_deadline,
+                                results=results,
+                                aggregate=aggregate,
+                                **kwargs,
+                            )
+                        except Exception as e:
+                            llm_error = e
+                    placeholder.empty()
+
+            entry = {
+                "results": results,
+                "cards": result_cards(results, snapshot.cards),
+                "response": response,
+                "llm_error": llm_error,
+                "summary": summary,
+                "aggregate": aggregate,
+                "stages": timings.stages,
+                "total_ms": timings.total_ms,
+                "profile_dir": profiler.out_dir if profiler is not None else None,
+                "profile_busy": profiler is not None and profiler.busy,
+            }
+            # A failed LLM call is retried on the next rerun
+            if llm_error is None:
+                cache[cache_key] = entry
+                while len(cache) > SEARCH_CACHE_SIZE:
+                    cache.popitem(last=False)
+
+        results, cards = entry["results"], entry["cards"]
+        # --- Exact statistics over all matching vacancies (aggregate questions) ---
+        aggregate = entry["aggregate"]
+        if aggregate is not None:
+            st.markdown("### 📊 Точный ответ по базе")
+            st.info(aggregate["answer"])
         if not results:
             st.warning("Ничего не найдено. Попробуйте изменить фильтры или запрос.")
         else:
-            # --- LLM answer ---
-            if llm_backend != "none":
-                with st.spinner("🤖 Генерирую ответ..."):
-                    try:
-                        kwargs = {}
-                        if llm_backend == "openai" and api_key:
-                            kwargs["api_key"] = api_key
-                        response = rag_query(
-                            query, index, model, chunks,
-                            llm_backend=llm_backend,
-                            llm_model=llm_model,
-                            top_k=top_k,
-                            **kwargs,
-                        )
-                        st.markdown("### 🤖 Ответ AI")
-                        st.info(response["answer"])
-                    except Exception as e:
-                        st.error(f"Ошибка LLM: {e}")
+            # --- LLM answer, or the extractive one without an LLM / when it failed or was too slow
+            # (aggregate questions already have the exact one above) ---
+            response = entry["response"]
+            if response is not None and response.get("answer_source", "llm") == "llm":
+                st.markdown("### 🤖 Ответ AI")
+                st.info(response["answer"])
+            else:
+                if entry["llm_error"] is not None:
+                    st.error(f"Ошибка LLM: {entry['llm_error']}")
+                elif response is not None and response.get("llm_timed_out"):
+                    st.warning(f"LLM не ответил за {llm_deadline} с — показан "
+                               + ("точный ответ по базе" if aggregate is not None else
+                                  "быстрый ответ по найденным вакансиям"))
+                if entry["summary"] is not None and aggregate is None:
+                    st.markdown("### ⚡ Быстрый ответ")
+                    st.info(entry["summary"]["answer"])
 
             # --- Results header --
-            # Deduplicate
-            seen = set()
-            unique_results = []
-            for r in results:
-                vid = r["vacancy_id"]
-                if vid not in seen:
-                    seen.add(vid)
-                    unique_results.append(r)
-
-            st.markdown(f"### Найдено: {len(unique_results)} вакансий")
-            if filters:
+            st.markdown(f"### Найдено: {len(cards)} вакансий")
+            stated = parse_query(query, cities)[1] if understand_query else {}
+            if filters or stated:
                 active = []
-                if filters.get("city"):
-                    active.append(f"город: {filters['city']}")
-                if filters.get("salary_min"):
-                    active.append(f"зарплата ≥ {filters['salary_min']:,} KZT")
-                if filters.get("experience"):
-                    active.append(f"опыт: {filters['experience']}")
+                shown = {**stated, **filters}
+                if shown.get("city"):
+                    active.append(f"город: {shown['city']}")
+                if shown.get("salary_min"):
+                    active.append(f"зарплата ≥ {shown['salary_min']:,} KZT")
+                if shown.get("salary_max"):
+                    active.append(f"зарплата ≤ {shown['salary_max']:,} KZT")
+                if shown.get("experience"):
+                    exp = shown["experience"]
+                    active.append(f"опыт: {exp if isinstance(exp, str) else ' / '.join(exp)}")
+                if filters.get("skills"):
+                    active.append(f"навыки: {', '.join(filters['skills'])}")
+                if filters.get("max_age_days"):
+                    active.append(f"опубликовано: {filter_age.lower()}")
                 st.caption(f"Фильтры: {' | '.join(active)}")
 
-            # --- Vacancy cards ---
-            for r in unique_results:
-                sal_str = _format_salary(r)
-                score_pct = int(r["score"] * 100)
-
+            with st.expander(f"⏱ Время обработки: {entry['total_ms']:.0f} мс"):
+                st.dataframe(
+                    pd.DataFrame([{"Этап": "  " * s["depth"] + s["name"], "мс": round(s["ms"], 1),
+                                   **({"CPU, мс": round(s["cpu_ms"], 1)} if "cpu_ms" in s else {})}
+                                  for s in entry["stages"]]),
+                    width="stretch", hide_index=True,
+                )
+                if entry["profile_dir"] is not None:
+                    st.caption(f"Профиль сохранён в `{entry['profile_dir']}/` (profile.prof, stacks.folded, summary.txt)")
+                if entry.get("profile_busy"):
+                    st.caption("cProfile уже занят запросом другой сессии — сохранены только этапы и стеки")
+
+            if columns is not None and "skill_vocab" in columns:
+                facets = skill_facets(results, columns, n=10)
+                if facets:
+                    st.caption("Топ навыков в результатах: " + ", ".join(f"{name} ({n})" for name, n in facets))
+
+            # --- Vacancy cards (only the current page is rendered) ---
+            n_pages = -(-len(cards) // PAGE_SIZE)
+            page = 1
+            if n_pages > 1:
+                page = st.number_input(f"Страница (из {n_pages})", 1, n_pages, 1, key=f"page:{cache_key}")
+            for card in cards[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]:
                 with st.container(border=True):
                     c1, c2 = st.columns([4, 1])
                     with c1:
-                        st.markdown(f"#### {r['vacancy_name']}")
-                        st.markdown(f"🏢 **{r['employer']}** &nbsp;|&nbsp; 📍 {r['area']}"
-                                    + (f" &nbsp;|&nbsp; 💰 {sal_str}" if sal_str else ""))
+                        st.markdown(f"#### {card['name']}")
+                        st.markdown(card["subtitle"])
                     with c2:
-                        st.metric("Релевантность", f"{score_pct}%")
+                        st.metric("Релевантность", f"{int(card['score'] * 100)}%")
 
 
                     with st.expander("Подробнее"):
-                        st.markdown(r["text"])
-                        url = r.get("url", "")
-                        if url:
-                            st.link_button("Открыть на hh.kz", url)
+                        st.markdown(card["text"])
+                        if card["url"]:
+                            st.link_button("Открыть на hh.kz", card["url"])
+
+        if metrics.enabled() and os.environ.get("RAG_METRICS_FILE"):
+            metrics.write_prometheus(os.environ["RAG_METRICS_FILE"])
 
 
 #========== TAB: ANALYTICS ========
 with tab_analytics:
     st.markdown("### 📊 Аналитика по базе вакансий")
 
-    # City distribution
-    city_counts = Counter(c.get("area", "Не указан") for c in chunks if c.get("chunk_index", 0) == 0)
-    col_a, col_b = st.columns(2)
-
-    with col_a:
-        st.markdown("**Вакансии по городам**")
-        st.bar_chart({k: v for k, v in city_counts.most_common(15)})
-
-    # Companies with most vacancies
-    company_counts = Counter(c.get("employer", "") for c in chunks if c.get("chunk_index", 0) == 0)
-    with col_b:
-        st.markdown("**Топ-15 компаний**")
-        st.bar_chart({k: v for k, v in company_counts.most_common(15)})
-
-    # Salary analysis
-    st.markdown("---")
-    st.markdown("**Анализ зарплат**")
-    salaries = []
-    for c in chunks:
-        if c.get("chunk_index", 0) != 0:
-            continue
-        sal_from = c.get("salary_from") or 0
-        sal_to = c.get("salary_to") or 0
-        best = max(sal_from, sal_to)
-        if best > 0:
-            salaries.append({
-                "vacancy": c.get("vacancy_name", ""),
-                "company": c.get("employer", ""),
-                "salary": best,
-                "currency": c.get("salary_currency", ""),
-            })
-
-    if salaries:
-        df_sal = pd.DataFrame(salaries)
-        kzt = df_sal[df_sal["currency"] == "KZT"]
-        if not kzt.empty:
-            col_s1, col_s2, col_s3 = st.columns(3)
-            col_s1.metric("Мин. зарплата (KZT)", f"{int(kzt['salary'].min()):,}")
-            col_s2.metric("Медиана (KZT)", f"{int(kzt['salary'].median()):,}")
-            col_s3.metric("Макс. зарплата (KZT)", f"{int(kzt['salary'].max()):,}")
-
-            st.bar_chart(kzt["salary"].value_counts().sort_index())
-
-        st.markdown(f"Вакансий с указанной зарплатой: **{len(salaries)}** из {n_vacancies} ({100 * len(salaries) // max(n_vacancies, 1)}%)")
+    analytics = snapshot.analytics  # precomputed by build_index.py
+    if analytics is None:
+        st.info("Аналитика не найдена — пересоберите индекс: `python build_index.py`")
     else:
-        st.info("Нет вакансий с указанной зарплатой.")
-
-
-    # Skills word cloud (text-based   
-    st.markdown("---")
-    st.markdown("**Топ навыков (key_skills)**")
-    all_skills = []
-    for c in chunks:
-        text = c.get("text", "")
-        try:
-            if "Ключевые навыки:" in text:
-                skills_line = text.split("Ключевые навыки:")[1].split("\n")[0].strip()
-                for skill in skills_line.split(","):
-                    s = skill.strip()
-                    if s:
-                        all_skills.append(s)
-        except (IndexError, ValueError):
-            continue
-
-    if all_skills:
-        skill_counts = Counter(all_skills)
-        df_skills = pd.DataFrame(skill_counts.most_common(25), columns=["Навык", "Кол-во"])
-        st.dataframe(df_skills, width="stretch", hide_index=True)
-    else:
-        st.info("Нет данных по навыкам.")
+        # City distribution
+        col_a, col_b = st.columns(2)
+
+        with col_a:
+            st.markdown("**Вакансии по городам**")
+            st.bar_chart(dict(analytics["cities"]["top"][:15]))
+
+        # Companies with most vacancies
+        with col_b:
+            st.markdown("**Топ-15 компаний**")
+            st.bar_chart(dict(analytics["companies"]["top"][:15]))
+
+        # Salary analysis
+        st.markdown("---")
+        st.markdown("**Анализ зарплат**")
+        sal = analytics["salaries"]
+        n_total = analytics["n_vacancies"]
+
+        if sal["n_with_salary"]:
+            if sal["n"]:
+                col_s1, col_s2, col_s3 = st.columns(3)
+                col_s1.metric(f"Мин. зарплата ({sal['currency']}, на руки)", f"{int(sal['min']):,}")
+                col_s2.metric(f"Медиана ({sal['currency']}, на руки)", f"{int(sal['median']):,}")
+                col_s3.metric(f"Макс. зарплата ({sal['currency']}, на руки)", f"{int(sal['max']):,}")
+
+                hist = sal["histogram"]
+                st.bar_chart(pd.Series(hist["counts"], index=[int(e) for e in hist["edges"][:-1]]))
+
+            st.markdown(f"Вакансий с указанной зарплатой: **{sal['n_with_salary']}** из {n_total} ({100 * sal['n_with_salary'] // max(n_total, 1)}%)")
+        else:
+            st.info("Нет вакансий с указанной зарплатой.")
+
+
+        # Skills
+        st.markdown("---")
+        st.markdown("**Топ навыков (key_skills)**")
+        top_skills = analytics["skills"]["top"][:25]
+
+        if top_skills:
+            df_skills = pd.DataFrame(top_skills, columns=["Навык", "Кол-во"])
+            st.dataframe(df_skills, width="stretch", hide_index=True)
+        else:
+            st.info("Нет данных по навыкам.")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+clean_html throughput: lxml path vs the BeautifulSoup reference, single process and a process pool.
+
+    python benchmarks/bench_clean_html.py -n 20000
+    python benchmarks/bench_clean_html.py --input data/vacancies_raw.json --workers 4
+
+Without --input the golden descriptions from tests/data are repeated up to N.
+With --input, "description" fields (raw hh HTML) of a JSON/JSONL dump are used.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parser.hh_parser import _clean_html_bs4, clean_html
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "tests", "data", "descriptions.json")
+
+
+def load_html(path: str | None, n: int) -> list[str]:
+    if path is None:
+        with open(GOLDEN_FILE, encoding="utf-8") as f:
+            samples = [s["html"] for s in json.load(f)]
+    elif path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            samples = [json.loads(line).get("description") or "" for line in f if line.strip()]
+    else:
+        with open(path, encoding="utf-8") as f:
+            samples = [v.get("description") or "" for v in json.load(f)]
+    samples = [s for s in samples if s]
+
+
+    return (samples * (n // max(len(samples), 1) + 1))[:n]
+
+
+def _run(name: str, fn, docs: list[str], workers: int = 0) -> list[str]:
+    t0 = time.perf_counter()
+    if workers:
+        with ProcessPoolExecutor(workers) as pool:
+            out = list(pool.map(fn, docs, chunksize=256))
+    else:
+        out = [fn(d) for d in docs]
+    dt = time.perf_counter() - t0
+    mb = sum(len(d.encode()) for d in docs) / 1e6
+    print(f"  {name:<22} {dt:7.2f} s  {len(docs) / dt:9,.0f} docs/s  {mb / dt:6.1f} MB/s")
+
+
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark description HTML cleaning")
+    p.add_argument("-n", type=int, default=20_000, help="Number of descriptions")
+    p.add_argument("--input", default=None, help="JSON / JSONL dump with raw HTML descriptions")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for the pool run")
+    args = p.parse_args()
+
+    docs = load_html(args.input, args.n)
+    print(f"{len(docs):,} descriptions\n")
+
+    reference = _run("bs4 (reference)", _clean_html_bs4, docs)
+    fast = _run("lxml", clean_html, docs)
+    _run(f"lxml, {args.workers} processes", clean_html, docs, workers=args.workers)
+
+    mismatches = sum(a != b for a, b in zip(reference, fast))
+    print(f"\nOutput mismatches vs reference: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Single-field vs multi-field index (rag.fields): storage, build time, search latency and title/skill precision.
+
+Queries are "<title> <skill>" pairs; a hit counts for title precision if the
+vacancy has that title, for skill precision if it lists that skill. With the
+hashing embedder this measures how much of the title / skills signal survives
+in the vectors, not semantic quality — pass --model for a real encoder.
+
+    python benchmarks/bench_fields.py -n 20000
+    python benchmarks/bench_fields.py -n 5000 --model intfloat/multilingual-e5-small
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_models import HashingEmbedder
+from benchmarks.synthetic import SKILLS, TITLES, generate_vacancies
+from rag.chunker import chunk_documents
+from rag.indexer import build_index, search_batch
+from rag.skills import skill_key, split_skills
+
+
+def _dir_mb(path: str) -> float:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files) / 2**20
+
+
+def _precision(results: list[list[dict]], queries: list[tuple[str, str]], k: int) -> tuple[float, float]:
+    """Mean share of the top-k unique vacancies with the queried title / skill."""
+    title_p, skill_p = [], []
+    for hits, (title, skill) in zip(results, queries):
+        seen, vacancies = set(), []
+        for r in hits:
+            if r["vacancy_id"] not in seen:
+                seen.add(r["vacancy_id"])
+                vacancies.append(r)
+        vacancies = vacancies[:k]
+        if not vacancies:
+            title_p.append(0.0)
+            skill_p.append(0.0)
+            continue
+        title_p.append(np.mean([title in (v.get("vacancy_name") or "") for v in vacancies]))
+        skill_p.append(np.mean([skill_key(skill) in {skill_key(s) for s in split_skills(v.get("key_skills"))}
+                                for v in vacancies]))
+
+
+    return float(np.mean(title_p)), float(np.mean(skill_p))
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the multi-field index against the single-field layout")
+    p.add_argument("-n", type=int, default=20_000, help="Synthetic vacancies")
+    p.add_argument("--max-chunk-len", type=int, default=400, help="Chunk length (short = several chunks per vacancy)")
+    p.add_argument("--queries", type=int, default=300)
+    p.add_argument("-k", type=int, default=10)
+    p.add_argument("--model", default=None, help="SentenceTransformer name instead of the hashing embedder")
+    args = p.parse_args()
+
+    if args.model:
+        from sentence_transformers import SentenceTransformer
+        model, model_name = SentenceTransformer(args.model), args.model
+        model._is_e5 = "e5" in args.model.lower()
+    else:
+        model, model_name = HashingEmbedder(), "hashing"
+
+    chunks = chunk_documents(generate_vacancies(args.n), max_chunk_length=args.max_chunk_len)
+    rnd = random.Random(1)
+    queries = [(rnd.choice(TITLES), rnd.choice(SKILLS)) for _ in range(args.queries)]
+    texts = [f"{title} {skill}" for title, skill in queries]
+    print(f"{args.n:,} vacancies -> {len(chunks):,} chunks, {args.queries} queries, model {model_name}\n")
+
+    print(f"{'layout':<14}{'build s':>9}{'index MB':>10}{'1 query p50':>13}{'p95':>9}{'batch QPS':>11}"
+          f"{'title P@k':>11}{'skill P@k':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, multi_field, weights in [("single", False, None), ("multi", True, None),
+                                            ("multi title", True, {"text": 0.3, "title": 0.5, "skills": 0.2})]:
+            index_dir = os.path.join(tmp, "multi" if multi_field else "single")
+            build = "-"  # same index, other weights
+            if not os.path.exists(index_dir):
+                t0 = time.perf_counter()
+                index, model, _ = build_index(chunks, model_name=model_name, index_dir=index_dir, model=model,
+                                              multi_field=multi_field)
+                build = f"{time.perf_counter() - t0:.1f}"
+
+            ms = []
+            for q in texts:
+                t0 = time.perf_counter()
+                search_batch([q], index, model, chunks, top_k=args.k * 3, field_weights=weights)
+                ms.append((time.perf_counter() - t0) * 1000)
+            t0 = time.perf_counter()
+            results = search_batch(texts, index, model, chunks, top_k=args.k * 3, field_weights=weights)
+            qps = len(texts) / (time.perf_counter() - t0)
+            title_p, skill_p = _precision(results, queries, args.k)
+
+            print(f"{label:<14}{build:>9}{_dir_mb(index_dir):10.1f}{np.percentile(ms, 50):10.2f} ms"
+                  f"{np.percentile(ms, 95):6.2f} ms{qps:11,.0f}{title_p:11.3f}{skill_p:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
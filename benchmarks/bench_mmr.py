@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+MMR diversification (rag.diversity): cost of the stage and how varied the top-k gets.
+
+Every synthetic vacancy is reposted --reposts times (same text, new id), like
+the duplicates hh returns. Reports the "diversify" stage alone (reconstruct the
+candidates' vectors + MMR) and the whole search, and for the top-k the mean
+number of distinct original vacancies / employers and the largest share of one
+employer.
+
+    python benchmarks/bench_mmr.py -n 20000 --candidates 200
+    python benchmarks/bench_mmr.py -n 20000 --lambdas 1 0.7 0.5 --max-per-employer 2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_models import HashingEmbedder
+from benchmarks.synthetic import SKILLS, TITLES, generate_vacancies
+from rag import metrics
+from rag.chunker import chunk_documents
+from rag.indexer import build_index, search
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark MMR re-ranking of search candidates")
+    p.add_argument("-n", type=int, default=20_000, help="Synthetic vacancies")
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("-k", type=int, default=10)
+    p.add_argument("--candidates", type=int, default=200)
+    p.add_argument("--lambdas", type=float, nargs="+", default=[1.0, 0.7, 0.5])
+    p.add_argument("--max-per-employer", type=int, default=None)
+    p.add_argument("--reposts", type=int, default=3, help="Copies of every vacancy (reposts with new ids)")
+    args = p.parse_args()
+
+    vacancies = [dict(v, id=f"{v['id']}-{j}") for v in generate_vacancies(args.n // args.reposts)
+                 for j in range(args.reposts)]
+    chunks = chunk_documents(vacancies, max_chunk_length=400)
+    texts = [f"{t} {s}" for t, s in zip(TITLES * args.queries, SKILLS * args.queries)][:args.queries]
+    with tempfile.TemporaryDirectory() as tmp:
+        index, model, chunks = build_index(chunks, model_name="hashing", index_dir=tmp, model=HashingEmbedder())
+    print(f"{len(vacancies):,} vacancies -> {len(chunks):,} chunks, top-{args.k} of {args.candidates} candidates\n")
+
+    print(f"{'mode':<12}{'search p50':>12}{'diversify p50':>15}{'p95':>9}{'originals':>11}{'employers':>11}"
+          f"{'max share':>11}")
+    for lam in [None] + args.lambdas:
+        diversity = None if lam is None else {"lambda": lam, "candidates": args.candidates,
+                                              "max_per_employer": args.max_per_employer}
+        total_ms, stage_ms, n_vac, n_emp, share = [], [], [], [], []
+        for q in texts:
+            t0 = time.perf_counter()
+            with metrics.trace() as timings:
+                results = search(q, index, model, chunks, top_k=args.k, diversity=diversity)
+            total_ms.append((time.perf_counter() - t0) * 1000)
+            stage_ms.append(timings.breakdown().get("diversify", 0.0))
+            employers = Counter(r.get("employer") for r in results)
+            n_vac.append(len({r["vacancy_id"].rsplit("-", 1)[0] for r in results}))
+            n_emp.append(len(employers))
+            share.append(max(employers.values()) / len(results) if results else 0.0)
+
+        label = "plain" if lam is None else f"λ={lam:g}"
+        print(f"{label:<12}{np.percentile(total_ms, 50):9.2f} ms{np.percentile(stage_ms, 50):12.2f} ms"
+              f"{np.percentile(stage_ms, 95):6.2f} ms{np.mean(n_vac):11.1f}{np.mean(n_emp):11.1f}{np.mean(share):11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+End-to-end offline benchmark: crawl -> chunk -> index -> search -> answer.
+
+Everything runs locally: synthetic vacancies (benchmarks.synthetic), the hh API
+stub (benchmarks.stub_hh), a hashing embedder and an Ollama-compatible LLM stub
+(benchmarks.stub_models). Reports throughput per stage, p50/p95/p99 latency of
+search and rag_query, peak memory, and writes everything as JSON for comparing
+runs over time.
+
+    python benchmarks/bench_pipeline.py -n 100000 --out bench.json
+    python benchmarks/bench_pipeline.py -n 100000 --compare bench.json
+    python benchmarks/bench_pipeline.py -n 20000 --model intfloat/multilingual-e5-small
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_hh import StubHH
+from benchmarks.stub_models import HashingEmbedder, StubLLM
+from benchmarks.synthetic import CITIES, SKILLS, TITLES, generate_vacancies
+from parser.api import RateLimiter
+from parser.checkpoint import CrawlLog
+from parser.orchestrator import CrawlOrchestrator
+from rag.chunker import chunk_documents
+from rag.indexer import build_index, load_columns, search
+from rag.pipeline import rag_query
+
+TZ = timezone(timedelta(hours=5))
+# benchmarks.synthetic publishes everything in 2025
+SYNTHETIC_DATES = (datetime(2025, 1, 1, tzinfo=TZ), datetime(2026, 1, 1, tzinfo=TZ))
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _percentiles(ms: list[float]) -> dict:
+    a = np.asarray(ms)
+
+
+    return {"p50": float(np.percentile(a, 50)), "p95": float(np.percentile(a, 95)),
+            "p99": float(np.percentile(a, 99)), "mean": float(a.mean()), "n": len(ms)}
+
+
+class Stages:
+    """Collects per-stage wall time, throughput, peak RSS and (optional) traced Python heap."""
+
+    def __init__(self, trace_memory: bool = False):
+        self.results = {}
+        self.trace_memory = trace_memory
+        if trace_memory:
+            tracemalloc.start()
+
+    def run(self, name: str, fn, count=None):
+        """Run fn(), count(result) items processed; returns fn's result."""
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - t0
+
+        items = count(result) if count else None
+        stage = {"seconds": round(seconds, 4), "peak_rss_mb": round(_peak_rss_mb(), 1)}
+        if items is not None:
+            stage["items"] = items
+            stage["per_second"] = round(items / seconds, 1) if seconds else None
+        if self.trace_memory:
+            stage["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        self.results[name] = stage
+
+        rate = f", {stage['per_second']:,.0f}/s" if items is not None else ""
+        print(f"  {name:<18} {seconds:8.2f} s{rate}  (peak RSS {stage['peak_rss_mb']:.0f} MB)")
+
+
+        return result
+
+    def latency(self, name: str, fn, inputs: list):
+        """Call fn(x) for every input; per-call latency percentiles in ms."""
+        ms = []
+        for x in inputs:
+            t0 = time.perf_counter()
+            fn(x)
+            ms.append((time.perf_counter() - t0) * 1000)
+        stats = {k: round(v, 3) if isinstance(v, float) else v for k, v in _percentiles(ms).items()}
+        self.results[name] = {"latency_ms": stats, "peak_rss_mb": round(_peak_rss_mb(), 1)}
+        print(f"  {name:<18} p50 {stats['p50']:8.2f} ms  p95 {stats['p95']:8.2f} ms  p99 {stats['p99']:8.2f} ms")
+
+
+def make_queries(n: int, seed: int = 0) -> list[tuple[str, dict]]:
+    """Russian search queries with a filter on every other one."""
+    rnd = random.Random(seed)
+    templates = ["{title}", "{title} {city}", "вакансия {title} со знанием {skill}", "{skill} {skill2} удалённо",
+                 "работа {title} зарплата от 500 тысяч"]
+    queries = []
+    for i in range(n):
+        text = rnd.choice(templates).format(title=rnd.choice(TITLES), city=rnd.choice(CITIES),
+                                            skill=rnd.choice(SKILLS), skill2=rnd.choice(SKILLS))
+        filters = rnd.choice([{"city": rnd.choice(CITIES)}, {"salary_min": 500_000},
+                              {"skills": [rnd.choice(["Python", "SQL", "Docker", "Git"])]}]) if i % 2 else {}
+        queries.append((text, filters))
+
+
+    return queries
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _bench_crawl(stages: Stages, n: int, tmp: str) -> None:
+    with StubHH(generate_vacancies(n, seed=1)) as stub:
+        config = {"searches": [{"text": "", "area": 40, "experience": None, "max": None}],
+                  "search_workers": 1, "detail_workers": 8, "fetch_details": True}
+        orchestrator = CrawlOrchestrator(config, base_url=stub.url, limiter=RateLimiter(rate=0),
+                                         date_range=SYNTHETIC_DATES)
+        with CrawlLog(os.path.join(tmp, "crawl.log"), {}) as log:
+            stages.run("crawl", lambda: sum(1 for _ in orchestrator.crawl(log)), count=lambda n: n)
+
+
+def compare(current: dict, baseline: dict) -> None:
+    """Print per-stage changes against a previous run (latency ratio > 1 = slower, throughput < 1 = slower)."""
+    print(f"\nvs {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}):")
+    if baseline["meta"]["args"].get("n") != current["meta"]["args"].get("n"):
+        print(f"  (different sizes: n={baseline['meta']['args'].get('n')} vs {current['meta']['args'].get('n')})")
+    for name, stage in current["stages"].items():
+        old = baseline["stages"].get(name)
+        if not old:
+            continue
+        if "latency_ms" in stage and "latency_ms" in old:
+            p50 = stage["latency_ms"]["p50"] / max(old["latency_ms"]["p50"], 1e-9)
+            p95 = stage["latency_ms"]["p95"] / max(old["latency_ms"]["p95"], 1e-9)
+            print(f"  {name:<18} latency p50 x{p50:.2f}, p95 x{p95:.2f}")
+        elif stage.get("per_second") and old.get("per_second"):
+            print(f"  {name:<18} throughput x{stage['per_second'] / old['per_second']:.2f}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="End-to-end offline benchmark of the RAG pipeline")
+    p.add_argument("-n", type=int, default=20_000, help="Synthetic vacancies to index (scales to 1M)")
+    p.add_argument("--crawl-n", type=int, default=2000, help="Vacancies served by the hh stub (0 = skip crawl)")
+    p.add_argument("--queries", type=int, default=200, help="Search queries for latency percentiles")
+    p.add_argument("--rag-queries", type=int, default=20, help="rag_query calls against the LLM stub (0 = skip)")
+    p.add_argument("--model", default=None, help="SentenceTransformer model (default: offline hashing embedder)")
+    p.add_argument("--trace-memory", action="store_true", help="Also report traced Python heap peak per stage")
+    p.add_argument("--out", default=None, help="Write results as JSON")
+    p.add_argument("--compare", default=None, help="Previous JSON result to compare against")
+    args = p.parse_args()
+
+    stages = Stages(trace_memory=args.trace_memory)
+    print(f"{args.n:,} vacancies, {args.queries} queries\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.crawl_n:
+            _bench_crawl(stages, args.crawl_n, tmp)
+
+        vacancies = stages.run("generate", lambda: list(generate_vacancies(args.n)), count=len)
+        chunks = stages.run("chunk", lambda: chunk_documents(vacancies), count=len)
+        del vacancies
+
+        if args.model:
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(args.model)
+            model._is_e5 = "e5" in args.model.lower()
+        else:
+            model = HashingEmbedder()
+        index_dir = os.path.join(tmp, "index")
+        index, _, _ = stages.run(
+            "embed+index",
+            lambda: build_index(chunks, model_name=args.model or "hashing", index_dir=index_dir, model=model),
+            count=lambda r: r[0].ntotal,
+        )
+        columns = load_columns(index_dir)
+
+        queries = make_queries(args.queries)
+        stages.latency("search", lambda q: search(q[0], index, model, chunks, top_k=10), queries)
+        stages.latency("search+filters",
+                       lambda q: search(q[0], index, model, chunks, top_k=10, filters=q[1], columns=columns),
+                       [q for q in queries if q[1]])
+
+        if args.rag_queries:
+            with StubLLM() as llm:
+                stages.latency("rag_query", lambda q: rag_query(q[0], index, model, chunks, llm_backend="ollama",
+                                                                base_url=llm.url),
+                               queries[:args.rag_queries])
+
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "args": vars(args),
+            "embedder": args.model or f"hashing-{getattr(model, 'dim', '')}",
+        },
+        "stages": stages.results,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+    print(f"\nPeak RSS: {result['peak_rss_mb']:.0f} MB")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"Results written to {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Sharded index scaling: search latency and throughput at 1, 2, 4, 8 shards.
+
+Vectors are random unit vectors (embedding speed is not what sharding changes),
+areas come from synthetic vacancies, so a city filter prunes like on real data.
+
+    python benchmarks/bench_shards.py -n 1000000
+    python benchmarks/bench_shards.py -n 1000000 --shards 1 2 4 8 16 --omp-threads 1
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import CITIES, generate_vacancies
+from rag.sharding import ShardedIndex, assign_shards, shard_areas
+
+
+def _latency_ms(fn, inputs) -> tuple[float, float]:
+    """p50 / p95 of fn(x) over inputs, in ms."""
+    ms = []
+    for x in inputs:
+        t0 = time.perf_counter()
+        fn(x)
+        ms.append((time.perf_counter() - t0) * 1000)
+
+
+    return float(np.percentile(ms, 50)), float(np.percentile(ms, 95))
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark rag.sharding scatter-gather search")
+    p.add_argument("-n", type=int, default=200_000, help="Vectors (one chunk per synthetic vacancy)")
+    p.add_argument("--dim", type=int, default=384)
+    p.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--batch", type=int, default=64, help="Queries per call for the throughput run")
+    p.add_argument("-k", type=int, default=10)
+    p.add_argument("--omp-threads", type=int, default=None,
+                   help="FAISS OpenMP threads per search (1 avoids oversubscription with many shards)")
+    args = p.parse_args()
+
+    if args.omp_threads:
+        faiss.omp_set_num_threads(args.omp_threads)
+    print(f"{args.n:,} vectors x {args.dim}, {os.cpu_count()} CPUs, FAISS OpenMP threads {faiss.omp_get_max_threads()}")
+
+    chunks = [{"vacancy_id": v["id"], "area": v["area"]}
+              for v in generate_vacancies(args.n, description_sentences=(0, 0))]
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((args.n, args.dim), dtype=np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    single_queries = [queries[i:i + 1] for i in range(args.queries)]
+    city = CITIES[0]
+
+    flat = faiss.IndexFlatIP(args.dim)
+    flat.add(vecs)
+    p50, p95 = _latency_ms(lambda q: flat.search(q, args.k), single_queries)
+    print(f"\n{'IndexFlatIP':<16} 1 query p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+
+    print(f"\n{'shards':<8}{'by':<6}{'1 query p50':>13}{'p95':>10}{'batch QPS':>12}"
+          f"{'city p50':>11}{'city shards':>13}")
+    for n_shards in args.shards:
+        for shard_by in ("hash", "area"):
+            assignment = assign_shards(chunks, n_shards, shard_by)
+            areas = shard_areas(chunks, assignment, n_shards) if shard_by == "area" else None
+            index = ShardedIndex.from_embeddings(vecs, assignment, n_shards, areas=areas)
+
+            p50, p95 = _latency_ms(lambda q: index.search(q, args.k), single_queries)
+
+            t0 = time.perf_counter()
+            for start in range(0, args.queries, args.batch):
+                index.search(queries[start:start + args.batch], args.k)
+            qps = args.queries / (time.perf_counter() - t0)
+
+            route = index.route({"city": city})
+            city_p50, _ = _latency_ms(lambda q: index.search(q, args.k, shards=route), single_queries)
+            n_route = n_shards if route is None else len(route)
+            print(f"{n_shards:<8}{shard_by:<6}{p50:10.2f} ms{p95:7.2f} ms{qps:12,.0f}{city_p50:8.2f} ms"
+                  f"{n_route:>8}/{n_shards}")
+
+
+if __name__ == "__main__":
+    main()
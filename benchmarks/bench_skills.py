@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Skill index benchmark: build time, skill filter and facet latency on N synthetic vacancies.
+
+    python benchmarks/bench_skills.py -n 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_vacancies
+from rag.skills import build_skill_matrix, skills_vacancy_mask, split_skills, top_skills
+
+
+def _timeit(fn, repeat: int) -> float:
+    """Median wall time of fn() in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+
+
+    return float(np.median(times))
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark rag.skills on synthetic vacancies")
+    p.add_argument("-n", type=int, default=1_000_000, help="Number of vacancies")
+    p.add_argument("--repeat", type=int, default=20)
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    skill_lists = [split_skills(v["key_skills"])
+                   for v in generate_vacancies(args.n, description_sentences=(0, 0))]
+    print(f"Generated {args.n:,} vacancies in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    m = build_skill_matrix(skill_lists)
+    print(f"Built skill matrix in {time.perf_counter() - t0:.1f}s: "
+          f"{len(m['skill_vocab'])} skills, {len(m['skill_indices']):,} non-zeros, "
+          f"{sum(a.nbytes for a in m.values()) / 2**20:.1f} MB")
+
+    rng = np.random.default_rng(0)
+    all_rows = np.arange(args.n)
+    for label, rows in [
+        ("top_k result set (50)", rng.choice(args.n, 50, replace=False)),
+        ("filter match (10%)", rng.choice(args.n, args.n // 10, replace=False)),
+        ("whole corpus", all_rows),
+    ]:
+        ms = _timeit(lambda: top_skills(m, rows, n=25), args.repeat)
+        print(f"facets over {label}: {ms:.2f} ms")
+
+    for skills in (["Python"], ["Python", "PostgreSQL"], ["Python", "Docker", "k8s"]):
+        ms = _timeit(lambda: skills_vacancy_mask(m, skills), args.repeat)
+        n_match = int(skills_vacancy_mask(m, skills).sum())
+        print(f"filter {skills}: {ms:.2f} ms ({n_match:,} matches)")
+
+
+if __name__ == "__main__":
+    main()
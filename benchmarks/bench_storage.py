@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Storage benchmark: size, write and load time of JSON / CSV / JSONL / Parquet for N vacancies.
+
+    python benchmarks/bench_storage.py -n 100000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_vacancies
+from parser.storage import (
+    iter_vacancies, load_csv, load_json, load_parquet, save_csv, save_json, save_jsonl, save_parquet,
+)
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+
+
+    return result, time.perf_counter() - t0
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare vacancy storage formats")
+    p.add_argument("-n", type=int, default=100_000, help="Number of vacancies")
+    args = p.parse_args()
+
+    vacancies = list(generate_vacancies(args.n))
+    print(f"{args.n:,} synthetic vacancies\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = {ext: os.path.join(tmp, f"v.{ext}") for ext in ("json", "csv", "jsonl", "parquet")}
+        writers = {
+            "json": lambda: save_json(vacancies, path["json"]),
+            "csv": lambda: save_csv(vacancies, path["csv"]),
+            "jsonl": lambda: save_jsonl(vacancies, path["jsonl"]),
+            "parquet": lambda: save_parquet(vacancies, path["parquet"]),
+        }
+        readers = {
+            "json": lambda: load_json(path["json"]),
+            "csv": lambda: load_csv(path["csv"]),
+            "jsonl": lambda: list(iter_vacancies(path["jsonl"])),
+            "parquet": lambda: load_parquet(path["parquet"]),
+        }
+
+        rows = []
+        for fmt in writers:
+            _, t_write = _timed(writers[fmt])
+            _, t_read = _timed(readers[fmt])
+            rows.append((fmt, os.path.getsize(path[fmt]) / 2**20, t_write, t_read))
+
+        print(f"\n{'format':<10}{'size, MB':>10}{'write, s':>10}{'load, s':>10}")
+        for fmt, size, t_write, t_read in rows:
+            print(f"{fmt:<10}{size:>10.1f}{t_write:>10.2f}{t_read:>10.2f}")
+
+        # What analytics / filtered loads actually need
+        cols = ["area", "employer_name", "salary_from", "salary_to", "salary_currency", "salary_gross"]
+        df, t = _timed(lambda: load_parquet(path["parquet"], columns=cols))
+        print(f"\nparquet, {len(cols)} analytics columns: {t:.3f}s ({len(df):,} rows)")
+        df, t = _timed(lambda: load_parquet(path["parquet"], columns=["id", "name"],
+                                            filters=[("area", "=", "Шымкент"), ("salary_from", ">=", 1_000_000)]))
+        print(f"parquet, projected + filtered:  {t:.3f}s ({len(df):,} rows)")
+
+
+if __name__ == "__main__":
+    main()
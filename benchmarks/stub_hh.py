@@ -0,0 +1,216 @@
+"""
+Local stub of the hh API for crawler tests and benchmarks (no network).
+
+Serves /vacancies (search with text / area / date_from / date_to, the 2000
+result cap and its 400 error), /vacancies/{id} (details with HTML description,
+"archived" once closed, 404 once removed) and /areas/{id}, built from parse_vacancy-shaped dicts (benchmarks.synthetic).
+
+    with StubHH(generate_vacancies(5000)) as stub:
+        fetch_all_vacancy_ids(area=40, base_url=stub.url)
+"""
+
+import html
+import json
+import math
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable
+from urllib.parse import parse_qs, urlparse
+
+# Kazakhstan -> cities, ids as on hh
+AREA_TREE = {
+    "id": "40", "name": "Казахстан", "areas": [
+        {"id": "160", "name": "Алматы", "areas": []},
+        {"id": "159", "name": "Астана", "areas": []},
+        {"id": "205", "name": "Шымкент", "areas": []},
+        {"id": "177", "name": "Караганда", "areas": []},
+        {"id": "154", "name": "Актобе", "areas": []},
+        {"id": "155", "name": "Атырау", "areas": []},
+        {"id": "185", "name": "Павлодар", "areas": []},
+        {"id": "194", "name": "Усть-Каменогорск", "areas": []},
+    ],
+}
+
+
+def _raw_item(v: dict, area_id: str) -> dict:
+    salary = None
+    if v.get("salary_from") or v.get("salary_to"):
+        salary = {"from": v.get("salary_from"), "to": v.get("salary_to"),
+                  "currency": v.get("salary_currency"), "gross": v.get("salary_gross")}
+    return {
+        "id": v["id"],
+        "name": v.get("name"),
+        "alternate_url": v.get("url"),
+        "employer": {"name": v.get("employer_name"), "alternate_url": v.get("employer_url")},
+        "area": {"id": area_id, "name": v.get("area")},
+        "published_at": v.get("published_at"),
+        "schedule": {"name": v.get("schedule")},
+        "employment": {"name": v.get("employment")},
+        "salary": salary,
+        "snippet": {"requirement": (v.get("description") or "")[:200]},
+    }
+
+
+def _detail(v: dict, item: dict) -> dict:
+    paragraphs = (v.get("description") or "").split("\n")
+    return {
+        **item,
+        "description": "".join(f"<p>{html.escape(p)}</p>" for p in paragraphs if p),
+        "key_skills": [{"name": s.strip()} for s in (v.get("key_skills") or "").split(",") if s.strip()],
+        "experience": {"name": v.get("experience")},
+    }
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # default 5 drops connections of concurrent crawlers
+
+
+class StubHH:
+    """
+    Threaded HTTP server on 127.0.0.1 (random port) serving the given vacancies.
+
+    Args:
+        vacancies: parse_vacancy-shaped dicts; "area" is the name of an area of area_tree, usually a
+            city (a region or country for vacancies posted to it directly)
+        cap: Max results served per query, like the real API
+        latency: Seconds every request sleeps (to emulate the network in benchmarks)
+        area_tree: Area hierarchy, default Kazakhstan -> cities
+    """
+
+    def __init__(self, vacancies: Iterable[dict], cap: int = 2000, latency: float = 0.0, area_tree: dict = AREA_TREE):
+        self.cap = cap
+        self.latency = latency
+        self.requests = Counter()  # "search" / "detail" / "areas" -> count
+        self.detail_requests = Counter()  # vacancy id -> times fetched
+        self.archived = set()  # ids whose details say "archived": true (see close())
+        self._lock = threading.Lock()
+
+        self.areas = {}
+        self.area_parent = {}
+        self._index_areas(area_tree, None)
+        area_ids = {a["name"]: a["id"] for a in self.areas.values()}
+
+        self.items, self.details, self.published = [], {}, []
+        for v in vacancies:
+            item = _raw_item(v, area_ids[v["area"]])
+            self.items.append(item)
+            self.details[v["id"]] = _detail(v, item)
+            self.published.append(datetime.fromisoformat(v["published_at"]))
+
+        self._server = StubServer(("127.0.0.1", 0), self._handler())
+        self._thread = None
+
+    def _index_areas(self, node: dict, parent: str | None) -> None:
+        self.areas[node["id"]] = node
+        self.area_parent[node["id"]] = parent
+        for child in node["areas"]:
+            self._index_areas(child, node["id"])
+
+    def _in_area(self, item_area: str, area: str) -> bool:
+        while item_area is not None:
+            if item_area == area:
+                return True
+            item_area = self.area_parent.get(item_area)
+        return False
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def close(self, ids: Iterable[str], remove: bool = False) -> None:
+        """Archive vacancies (details still served, search no longer finds them) or remove them (404)."""
+        ids = set(ids)
+        with self._lock:
+            self.items = [item for item in self.items if item["id"] not in ids]
+            self.published = [datetime.fromisoformat(item["published_at"]) for item in self.items]
+            if remove:
+                for vid in ids:
+                    self.details.pop(vid, None)
+            else:
+                self.archived |= ids
+
+    def search(self, query: dict) -> tuple[int, dict]:
+        text = query.get("text", "").lower()
+        area = query.get("area")
+        date_from = datetime.fromisoformat(query["date_from"]) if "date_from" in query else None
+        date_to = datetime.fromisoformat(query["date_to"]) if "date_to" in query else None
+        page, per_page = int(query.get("page", 0)), int(query.get("per_page", 20))
+
+        if page * per_page >= self.cap:
+            return 400, {"errors": [{"type": "bad_argument", "value": "page"}]}
+
+        matched = [
+            item for item, published in zip(self.items, self.published)
+            if (not text or text in item["name"].lower())
+            and (area is None or self._in_area(item["area"]["id"], area))
+            and (date_from is None or published >= date_from)
+            and (date_to is None or published <= date_to)
+        ]
+        reachable = min(len(matched), self.cap)
+        return 200, {
+            "found": len(matched),
+            "pages": math.ceil(reachable / per_page),
+            "page": page,
+            "per_page": per_page,
+            "items": matched[page * per_page:min((page + 1) * per_page, reachable)],
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                url = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                parts = url.path.strip("/").split("/")
+
+                if parts == ["vacancies"]:
+                    kind, (status, body) = "search", stub.search(query)
+                elif len(parts) == 2 and parts[0] == "vacancies":
+                    kind = "detail"
+                    with stub._lock:
+                        stub.detail_requests[parts[1]] += 1
+                    detail = stub.details.get(parts[1])
+                    if detail and parts[1] in stub.archived:
+                        detail = {**detail, "archived": True}
+                    status, body = (200, detail) if detail else (404, {"errors": [{"type": "not_found"}]})
+                elif len(parts) == 2 and parts[0] == "areas" and parts[1] in stub.areas:
+                    kind, status, body = "areas", 200, stub.areas[parts[1]]
+                else:
+                    kind, status, body = "other", 404, {"errors": [{"type": "not_found"}]}
+
+                with stub._lock:
+                    stub.requests[kind] += 1
+                payload = json.dumps(body, ensure_ascii=False).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubHH":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubHH":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
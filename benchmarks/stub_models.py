@@ -0,0 +1,143 @@
+"""
+Offline stand-ins for the models of the RAG pipeline, for benchmarks and tests.
+
+HashingEmbedder replaces SentenceTransformer (no download, deterministic);
+StubLLM is a local Ollama-compatible /api/chat server whose latency grows with
+the prompt, like prefill on a real CPU model.
+"""
+
+import json
+import re
+import select
+import socket
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler
+
+import numpy as np
+
+from benchmarks.stub_hh import StubServer
+
+_WORD = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """
+    Bag-of-words vectors via the hashing trick: word -> (bucket, sign) from crc32.
+
+    Same encode() interface as SentenceTransformer, so it can be passed to
+    build_index / search. Texts sharing words get similar vectors, which is
+    enough to exercise retrieval and filters end to end.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self._is_e5 = False
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, texts, batch_size: int = 64, show_progress_bar: bool = False,
+               normalize_embeddings: bool = True, **kwargs) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype="float32")
+        for i, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            if not words:
+                continue
+            h = np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.uint32, count=len(words))
+            signs = np.where(h & np.uint32(1 << 31), -1.0, 1.0).astype("float32")
+            np.add.at(out[i], h % self.dim, signs)
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out /= np.where(norms > 0, norms, 1.0)
+
+
+        return out
+
+
+class StubLLM:
+    """
+    Ollama-compatible chat server on 127.0.0.1 (random port).
+
+    Latency = base_latency + prompt_tokens / prefill_tps + answer_tokens / decode_tps,
+    prompt tokens estimated as chars / 3 (rag.pipeline.CHARS_PER_TOKEN).
+    Like Ollama it drops a request whose client hung up before the answer was
+    ready, counted in n_cancelled.
+
+        with StubLLM() as llm:
+            rag_query(q, index, model, chunks, llm_backend="ollama", base_url=llm.url)
+    """
+
+    def __init__(self, prefill_tps: float = 2000.0, decode_tps: float = 200.0, answer_tokens: int = 50,
+                 base_latency: float = 0.0):
+        self.prefill_tps = prefill_tps
+        self.decode_tps = decode_tps
+        self.answer_tokens = answer_tokens
+        self.base_latency = base_latency
+        self.n_requests = 0
+        self.n_cancelled = 0
+        self._lock = threading.Lock()
+        self._server = StubServer(("127.0.0.1", 0), self._handler())
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+                prompt_tokens = len(prompt) // 3
+                prefill = prompt_tokens / stub.prefill_tps
+                decode = stub.answer_tokens / stub.decode_tps
+                time.sleep(stub.base_latency + prefill + decode)
+                if self._client_gone():
+                    with stub._lock:
+                        stub.n_cancelled += 1
+                    return
+                with stub._lock:
+                    stub.n_requests += 1
+
+                payload = json.dumps({
+                    "model": body.get("model"),
+                    "message": {"role": "assistant", "content": "Ответ заглушки: " + "текст " * stub.answer_tokens},
+                    "done": True,
+                    "prompt_eval_count": prompt_tokens,
+                    "prompt_eval_duration": int(prefill * 1e9),
+                    "eval_count": stub.answer_tokens,
+                    "eval_duration": int(decode * 1e9),
+                }, ensure_ascii=False).encode()
+                status = 200 if self.path == "/api/chat" else 404
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _client_gone(self) -> bool:
+                readable, _, _ = select.select([self.connection], [], [], 0)
+                return bool(readable) and not self.connection.recv(1, socket.MSG_PEEK)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubLLM":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubLLM":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,105 @@
+"""
+Synthetic hh.kz-like vacancies for benchmarks (no network, deterministic by seed).
+"""
+
+import random
+from typing import Iterator
+
+CITIES = ["Алматы", "Астана", "Шымкент", "Караганда", "Актобе", "Атырау", "Павлодар", "Усть-Каменогорск"]
+CITY_WEIGHTS = [40, 30, 8, 6, 5, 5, 3, 3]
+
+TITLES = [
+    "Python-разработчик", "Backend-разработчик", "Data Scientist", "ML-инженер", "Java-разработчик",
+    "Frontend-разработчик", "DevOps-инженер", "QA-инженер", "Аналитик данных", "Системный администратор",
+    "Программист 1С", "Golang-разработчик", "Fullstack-разработчик", "Бизнес-аналитик",
+]
+LEVELS = ["Junior", "Middle", "Senior", "Lead", ""]
+COMPANIES = [f"{p} {s}" for p in ("Kaspi", "Kolesa", "Halyk", "Beeline", "Chocofamily", "ТОО Альфа", "ТОО Бета",
+                                   "Freedom", "Jusan", "Air Astana", "KazMunayGas", "Magnum")
+             for s in ("", "Tech", "Digital", "Group", "Lab")]
+
+# Skills with spelling variants on purpose — exercises rag.skills normalisation
+SKILLS = [
+    "Python", "python", "Django", "FastAPI", "Flask", "PostgreSQL", "postgres", "MySQL", "Redis", "Docker",
+    "Kubernetes", "k8s", "Git", "Linux", "REST API", "SQL", "Java", "Spring", "Kotlin", "JavaScript", "JS",
+    "TypeScript", "React", "ReactJS", "Vue.js", "Node.js", "Go", "Golang", "C#", ".NET", "Pandas", "NumPy",
+    "PyTorch", "TensorFlow", "Machine Learning", "ML", "Airflow", "Spark", "Kafka", "RabbitMQ", "CI/CD",
+    "Ansible", "Terraform", "Selenium", "Postman", "1С", "1C", "Excel", "Power BI", "Tableau", "Jira",
+    "Английский язык", "MS SQL", "Nginx", "Grafana", "Prometheus", "ClickHouse", "Elasticsearch", "gRPC",
+]
+EXPERIENCE = ["Нет опыта", "От 1 до 3 лет", "От 3 до 6 лет", "Более 6 лет"]
+SCHEDULES = ["Полный день", "Удалённая работа", "Гибкий график", "Сменный график"]
+CURRENCIES = ["KZT"] * 17 + ["USD", "RUR", "EUR"]
+
+SENTENCES = [
+    "Разработка и поддержка высоконагруженных сервисов.",
+    "Участие в проектировании архитектуры новых продуктов.",
+    "Написание unit- и интеграционных тестов.",
+    "Код-ревью и менторинг младших коллег.",
+    "Оптимизация запросов к базе данных.",
+    "Взаимодействие с аналитиками и продуктовой командой.",
+    "Автоматизация процессов сборки и деплоя.",
+    "Построение моделей машинного обучения и их вывод в продакшн.",
+    "Опыт коммерческой разработки от двух лет.",
+    "Уверенное знание SQL и принципов работы реляционных СУБД.",
+    "Понимание принципов ООП и паттернов проектирования.",
+    "Готовность разбираться в чужом коде.",
+    "Официальное трудоустройство по ТК РК.",
+    "Конкурентная заработная плата и ежегодная премия.",
+    "ДМС для сотрудника и членов семьи.",
+    "Современный офис в центре города.",
+    "Обучение за счёт компании и участие в конференциях.",
+]
+
+
+def generate_vacancies(n: int, seed: int = 0, description_sentences: tuple[int, int] = (6, 14)) -> Iterator[dict]:
+    """
+    Yield n vacancy dicts shaped like parser.hh_parser.parse_vacancy output.
+
+    Set description_sentences=(0, 0) to skip descriptions when only structured fields matter.
+    """
+    rnd = random.Random(seed)
+    lo, hi = description_sentences
+
+    for i in range(n):
+        vid = str(10_000_000 + i)
+        title = f"{rnd.choice(LEVELS)} {rnd.choice(TITLES)}".strip()
+
+        sal_from = sal_to = currency = None
+        if rnd.random() < 0.45:
+            currency = rnd.choice(CURRENCIES)
+            base = rnd.randrange(150, 2500) * 1000 if currency == "KZT" else rnd.randrange(5, 60) * 100
+            if rnd.random() < 0.7:
+                sal_from = base
+            if rnd.random() < 0.6:
+                sal_to = int(base * rnd.uniform(1.1, 1.8))
+            if sal_from is None and sal_to is None:
+                sal_from = base
+
+        n_sent = rnd.randint(lo, hi) if hi else 0
+        description = "\n".join(
+            ["Обязанности:", *rnd.sample(SENTENCES[:8], min(n_sent // 2, 8)),
+             "Требования:", *rnd.sample(SENTENCES[8:12], min(n_sent // 4, 4)),
+             "Мы предлагаем:", *rnd.sample(SENTENCES[12:], min(n_sent // 4, 5))]
+        ) if n_sent else ""
+
+        day = rnd.randint(1, 28)
+        month = rnd.randint(1, 12)
+        yield {
+            "id": vid,
+            "name": title,
+            "url": f"https://hh.kz/vacancy/{vid}",
+            "employer_name": rnd.choice(COMPANIES).strip(),
+            "employer_url": "",
+            "area": rnd.choices(CITIES, CITY_WEIGHTS)[0],
+            "published_at": f"2025-{month:02d}-{day:02d}T10:00:00+0500",
+            "schedule": rnd.choice(SCHEDULES),
+            "employment": "Полная занятость",
+            "salary_from": sal_from,
+            "salary_to": sal_to,
+            "salary_currency": currency,
+            "salary_gross": rnd.random() < 0.3 if currency else None,
+            "description": description,
+            "key_skills": ", ".join(rnd.sample(SKILLS, rnd.randint(0, 10))),
+            "experience": rnd.choice(EXPERIENCE),
+        }
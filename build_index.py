@@ -1,34 +1,91 @@
 
 import argparse
-import json
+import logging
+import shutil
+from contextlib import nullcontext
 
+from parser.storage import iter_vacancies
+from rag.analytics import AnalyticsCollector, save_analytics
+from rag.cards import save_cards, vacancy_card
 from rag.chunker import chunk_documents
 from rag.indexer import build_index
+from rag.metrics import span
+from rag.sharding import SHARD_BY
+from rag.profiling import PROFILE_DIR, Profiler, format_summary
+from rag.versioning import new_version_dir, publish, write_manifest
+
+
+def run(args, index_dir: str) -> None:
+    # Stream vacancies: filter, aggregate analytics, prepare display cards and chunk in one pass
+    collector = AnalyticsCollector()
+    cards = {}
+    counts = {"loaded": 0, "kept": 0}
+
+    def with_descriptions():
+        for v in iter_vacancies(args.input):
+            counts["loaded"] += 1
+            if len(v.get("description") or "") > 30:
+                counts["kept"] += 1
+                collector.add(v)
+                cards[v.get("id")] = vacancy_card(v)
+                yield v
+
+    with span("load_and_chunk"):
+        chunks = chunk_documents(with_descriptions(), max_chunk_length=args.max_chunk_len)
+    print(f"Loaded {counts['loaded']} vacancies from {args.input}")
+    print(f"After filtering: {counts['kept']} with descriptions")
+    print(f"Created {len(chunks)} chunks")
+
+    # Build index
+    build_index(chunks, index_dir=index_dir, shards=args.shards, shard_by=args.shard_by, multi_field=args.multi_field)
+
+    # Analytics aggregates for the UI — computed once from structured fields
+    with span("save_analytics"):
+        path = save_analytics(collector.result(), index_dir)
+    print(f"Analytics saved to {path}")
+    with span("save_cards"):
+        path = save_cards(cards, index_dir)
+    print(f"{len(cards)} vacancy cards saved to {path}")
 
 
 def main():
     p = argparse.ArgumentParser(description="Build FAISS index from vacancy data")
-    p.add_argument("--input", type=str, default="data/vacancies_all.json", help="Input JSON file")
-    p.add_argument("--index-dir", type=str, default="data/index", help="Output index directory")
+    p.add_argument("--input", type=str, default="data/vacancies_all.jsonl",
+                   help="Input .jsonl/.parquet/.json file, directory or glob of such files")
+    p.add_argument("--index-dir", type=str, default="data/index",
+                   help="Index root: each build goes to versions/<name>/, CURRENT points at the live one")
+    p.add_argument("--keep-versions", type=int, default=3, help="Versions kept on disk after publishing")
     p.add_argument("--max-chunk-len", type=int, default=1500, help="Max chunk length in chars")
+    p.add_argument("--shards", type=int, default=1, help="Split the index into N shards searched in parallel")
+    p.add_argument("--shard-by", choices=SHARD_BY, default="hash",
+                   help="hash: even sizes; area: whole cities per shard, a city filter searches only its shard")
+    p.add_argument("--multi-field", action="store_true",
+                   help="Separate title / key skills vectors per vacancy next to the chunk vectors (3x index size)")
+    p.add_argument("--profile", action="store_true",
+                   help="cProfile + sampled stacks + per-stage wall/CPU/memory into --profile-dir")
+    p.add_argument("--profile-dir", default=PROFILE_DIR, help="Where profile runs are written")
+    p.add_argument("--profile-memory", action="store_true", help="Also trace Python heap per stage (slow)")
     args = p.parse_args()
 
-    # Load vacancies
-    with open(args.input, "r", encoding="utf-8") as f:
-        vacancies = json.load(f)
-    print(f"Loaded {len(vacancies)} vacancies from {args.input}")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
-    # Filter out vacancies without description
-    vacancies = [v for v in vacancies if len(v.get("description", "")) > 30]
-    print(f"After filtering: {len(vacancies)} with descriptions")
+    profiler = Profiler("build_index", out_dir=args.profile_dir, trace_memory=args.profile_memory) \
+        if args.profile else nullcontext()
+    # Build next to the live version, publish only when complete: readers never see a partial index
+    version_dir = new_version_dir(args.index_dir)
+    try:
+        with profiler:
+            run(args, version_dir)
+        write_manifest(version_dir)
+        version = publish(args.index_dir, version_dir, keep=args.keep_versions)
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    print(f"\nDone! Published {version} in {args.index_dir}/ — running apps pick it up without a restart.")
 
-    # Chunk
-    chunks = chunk_documents(vacancies, max_chunk_length=args.max_chunk_len)
-    print(f"Created {len(chunks)} chunks")
-
-    # Build index
-    build_index(chunks, index_dir=args.index_dir)
-    print("\nDone! Index ready for RAG queries.")
+    if args.profile:
+        print("\n" + format_summary(profiler.summary))
+        print(f"Profile written to {profiler.out_dir}/")
 
 
 if __name__ == "__main__":
@@ -3,6 +3,11 @@
 BASE_URL = "https://api.hh.ru"
 VACANCIES_URL = f"{BASE_URL}/vacancies"
 
+# Shared request budget of a crawl, requests/sec (hh allows ~5)
+API_RATE_LIMIT = 4.0
+# The API serves at most this many results of one query (page * per_page < 2000)
+SEARCH_RESULT_CAP = 2000
+
 
 # Request headers — hh.ru API requires User-Agent
 HEADERS ={
@@ -30,3 +35,20 @@ DATA_DIR = "data"
 RAW_VACANCIES_FILE = f"{DATA_DIR}/vacancies_raw.json"
 PARSED_VACANCIES_FILE = f"{DATA_DIR}/vacancies.csv"
 
+
+# Salary normalisation — everything is converted to net BASE_CURRENCY.
+# Approximate exchange rates (units of BASE_CURRENCY per 1 unit), update as needed.
+BASE_CURRENCY = "KZT"
+CURRENCY_RATES = {
+    "KZT": 1.0,
+    "RUR": 6.0,     # hh.ru uses "RUR" for roubles
+    "USD": 510.0,
+    "EUR": 590.0,
+    "UZS": 0.04,
+    "KGS": 5.8,
+    "BYR": 160.0,   # hh.ru code for Belarusian rouble
+    "AZN": 300.0,
+    "GEL": 190.0,
+}
+# Gross -> net multiplier: 10% pension contribution + 10% income tax on the rest (Kazakhstan)
+GROSS_TO_NET = 0.81
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+from config import BASE_URL
+from parser.checkpoint import iter_vacancies_log
+from parser.orchestrator import load_crawl_config, run_crawl
+from parser.storage import save_vacancies
+
+
+def _print_report(report: dict) -> None:
+    print(f"\n--- Searches ---")
+    for s in report["searches"]:
+        print(f"  {s['text'] or '(all)':<20} area={s['area']:<5} found {s['found']:>6}, "
+              f"collected {s['collected']:>5}, new {s['new']:>5}")
+
+    print(f"\n--- Crawl ---")
+    print(f"Summaries from all searches: {report['summaries']}")
+    print(f"Unique vacancies: {report['unique']}")
+    if report["detail_fetches_saved"] is not None:
+        print(f"Detail fetches saved by the shared id set: {report['detail_fetches_saved']}")
+    print(f"Details fetched: {report['details_fetched']} (failed: {report['details_failed']})")
+    print(f"Vacancies in dataset: {report['vacancies']}")
+    print(f"Time: {report.get('seconds', 0)} s")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Crawl all queries of a config file into one deduplicated dataset")
+    p.add_argument("config", nargs="?", default="crawl_config.json", help="Crawl config (JSON)")
+    p.add_argument("-o", "--output", default=None,
+                   help="Dataset file, format by extension (default: 'output' of the config)")
+    p.add_argument("--checkpoint", default=None, help="Crawl log path (default: <output>.crawl.log)")
+    p.add_argument("--resume", action="store_true", help="Continue an interrupted crawl from its log")
+    p.add_argument("--api-url", default=BASE_URL, help="API root (e.g. a local benchmarks/stub_hh.py server)")
+    p.add_argument("--report", default=None, help="Also write the crawl report as JSON")
+    p.add_argument("-v", "--verbose", action="store_true", help="Verbose logging")
+    args = p.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    config = load_crawl_config(args.config)
+    output = args.output or config["output"]
+    checkpoint = args.checkpoint or os.path.splitext(output)[0] + ".crawl.log"
+    print(f"{len(config['queries'])} queries, {len(config['searches'])} searches -> {output}")
+
+    try:
+        report = run_crawl(config, checkpoint, resume=args.resume, base_url=args.api_url)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted. Progress is saved, continue with:")
+        print(f"  python crawl.py {args.config} --resume --checkpoint {checkpoint}")
+        sys.exit(130)
+    except FileNotFoundError as e:
+        print(e)
+        sys.exit(1)
+
+    n = save_vacancies(iter_vacancies_log(checkpoint), output)
+    print(f"Saved {n} vacancies to {output}")
+    _print_report(report)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+
+from parser.storage import iter_vacancies
+from rag.evaluation import (
+    DEFAULT_KS, compare_index_dirs, evaluate_index_dir, load_query_set, save_query_set, silver_query_set,
+)
+
+
+def _print_summary(label: str, summary: dict) -> None:
+    metrics = "  ".join(f"{k} {v:.3f}" for k, v in summary.items() if isinstance(v, float) and k != "qps")
+    lat = summary.get("latency_ms", {})
+    print(f"{label:<10} {metrics}")
+    print(f"{'':<10} latency p50 {lat.get('p50', 0):.2f} ms, p95 {lat.get('p95', 0):.2f} ms, "
+          f"{summary.get('qps') or 0:.0f} queries/s ({summary['n_queries']} queries)")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Retrieval quality (recall@k, MRR, nDCG) and latency of an index")
+    p.add_argument("--queries", default="data/eval_queries.jsonl", help="Labelled query set (.jsonl / .json)")
+    p.add_argument("--index-dir", default="data/index", help="Index to evaluate (the candidate)")
+    p.add_argument("--baseline", default=None, help="Second index dir to diff against")
+    p.add_argument("-k", "--k", type=int, nargs="+", default=list(DEFAULT_KS), help="Cutoffs for recall/nDCG")
+    p.add_argument("--metric", default=None,
+                   help="Metric regressed queries are judged by with --baseline (default recall@<largest k>)")
+    p.add_argument("--batch-size", type=int, default=32, help="Queries per search_batch call (1 = per-query latency)")
+    p.add_argument("--make-queries", default=None, metavar="DATASET",
+                   help="Build a silver query set from a vacancy dataset into --queries and exit")
+    p.add_argument("-n", type=int, default=200, help="Queries for --make-queries")
+    p.add_argument("--out", default=None, help="Write the full report as JSON")
+    args = p.parse_args()
+
+    if args.make_queries:
+        queries = silver_query_set(iter_vacancies(args.make_queries), n=args.n)
+        save_query_set(queries, args.queries)
+        print(f"Saved {len(queries)} queries to {args.queries}")
+        return
+
+    query_set = load_query_set(args.queries)
+    kwargs = {"ks": args.k, "batch_size": args.batch_size}
+
+    if args.baseline:
+        report = compare_index_dirs(query_set, args.baseline, args.index_dir, metric=args.metric, **kwargs)
+        _print_summary("baseline", report["baseline"])
+        _print_summary("candidate", report["candidate"])
+        print("\nDelta (candidate - baseline):")
+        for k, v in report["deltas"].items():
+            print(f"  {k:<16} {v:+.3f}")
+        print(f"{len(report['regressed_queries'])} queries got worse on {report['metric']}")
+        for q in report["regressed_queries"][:10]:
+            print(f"  {q['baseline']:.2f} -> {q['candidate']:.2f}  {q['query']}")
+    else:
+        report = evaluate_index_dir(query_set, args.index_dir, **kwargs)
+        _print_summary(args.index_dir, report["summary"])
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
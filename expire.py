@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Drop closed vacancies from the live index without a rebuild (see rag.tombstones).
+
+    python expire.py --api                      # archived / removed on hh
+    python expire.py --max-age-days 30          # published over a month ago
+    python expire.py --api --compact            # and compact right away if over the threshold
+
+Running apps hide tombstoned vacancies on their next reload check.
+"""
+
+import argparse
+import logging
+
+from config import API_RATE_LIMIT, BASE_URL
+from parser.api import RateLimiter
+from rag.indexer import build_columns, load_columns, read_index
+from rag.tombstones import (
+    COMPACT_THRESHOLD, EXPIRY_BATCH, apply_tombstones, compact, deleted_ratio, expire_by_age, expire_via_api,
+)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Tombstone closed vacancies of the live index, compact it when needed")
+    p.add_argument("--index-dir", default="data/index", help="Index root (tombstones.json lives next to CURRENT)")
+    p.add_argument("--api", action="store_true", help="Check every live vacancy's state through the hh API")
+    p.add_argument("--max-age-days", type=float, default=None, help="Tombstone vacancies published earlier")
+    p.add_argument("--base-url", default=BASE_URL, help="API root (a local stub in tests)")
+    p.add_argument("--rate", type=float, default=API_RATE_LIMIT, help="API requests per second")
+    p.add_argument("--workers", type=int, default=4, help="Threads issuing API requests")
+    p.add_argument("--batch-size", type=int, default=EXPIRY_BATCH, help="Vacancies checked between tombstone writes")
+    p.add_argument("--limit", type=int, default=None, help="Check at most this many vacancies through the API")
+    p.add_argument("--compact", action="store_true", help="Compact now if the deleted share passes --threshold")
+    p.add_argument("--threshold", type=float, default=COMPACT_THRESHOLD, help="Deleted share of chunks to compact at")
+    p.add_argument("--keep-versions", type=int, default=3, help="Versions kept after publishing a compacted one")
+    args = p.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if not (args.api or args.max_age_days is not None or args.compact):
+        p.error("nothing to do: pass --api, --max-age-days and/or --compact")
+
+    _, chunks, _ = read_index(args.index_dir)
+    if args.max_age_days is not None:
+        expired = expire_by_age(args.index_dir, chunks, args.max_age_days)
+        print(f"{len(expired)} vacancies older than {args.max_age_days:g} days tombstoned")
+    if args.api:
+        counts = expire_via_api(args.index_dir, chunks, base_url=args.base_url, limiter=RateLimiter(args.rate),
+                                workers=args.workers, batch_size=args.batch_size, limit=args.limit)
+        print(f"Checked {sum(counts.values())} vacancies: {counts['archived']} archived, {counts['gone']} removed, "
+              f"{counts['failed']} failed, {counts['open']} open")
+
+    columns = apply_tombstones(load_columns(args.index_dir) or build_columns(chunks), chunks, args.index_dir)
+    ratio = deleted_ratio(columns)
+    print(f"{ratio:.1%} of the live chunks are tombstoned (compaction threshold {args.threshold:.0%})")
+    if args.compact and ratio > args.threshold:
+        version = compact(args.index_dir, keep=args.keep_versions)
+        print(f"Published compacted version {version}" if version else "Nothing compacted")
+
+
+if __name__ == "__main__":
+    main()
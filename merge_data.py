@@ -1,63 +1,250 @@
 #!/usr/bin/env python3
 
+import argparse
 import json
 import glob
 import os
+import shutil
+import tempfile
+from multiprocessing import Pool
+from typing import Iterable, Iterator
 
+import numpy as np
 
-DATA_DIR = "data"
-OUTPUT_JSON = f"{DATA_DIR}/vacancies_all.json"
-OUTPUT_CSV = f"{DATA_DIR}/vacancies_all.csv"
-
- 
-def merge():
-    files = glob.glob(f"{DATA_DIR}/*.json")
-    # Exclude the output file itself and raw file
-    files = [f for f in files if os.path.basename(f) not in ("vacancies_all.json", "vacancies_raw.json")]
+from parser.dedup import IdSet, cluster_signatures, cluster_stats, minhash_signatures
+from parser.storage import iter_vacancies, save_vacancies
 
-    all_vacancies = []
-    seen_ids = set()
 
-    for filepath in sorted(files):
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        before = len(all_vacancies)
-        for v in data:
-            vid = v.get("id")
-            if vid and vid not in seen_ids:
-                seen_ids.add(vid)
-                all_vacancies.append(v)
+DATA_DIR = "data"
+OUTPUT_FILE = f"{DATA_DIR}/vacancies_all.jsonl"
 
-        added = len(all_vacancies) - before
-        print(f"  {filepath}: {len(data)} total, {added} new (skipped {len(data) - added} duplicates)")
+# Merge outputs and the raw dump never count as inputs
+EXCLUDED_PREFIXES = ("vacancies_all", "vacancies_raw")
 
-    # Save merged
-    os.makedirs(DATA_DIR, exist_ok=True)
 
-    with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-        json.dump(all_vacancies, f, ensure_ascii=False, indent=2)
+def input_files(data_dir: str = DATA_DIR) -> list[str]:
+    # .parquet: parse.py --parquet-out and Parquet dataset directories (append_parquet)
+    files = glob.glob(f"{data_dir}/*.json") + glob.glob(f"{data_dir}/*.jsonl") + glob.glob(f"{data_dir}/*.parquet")
 
-    import pandas as pd
-    df = pd.DataFrame(all_vacancies)
-    df.to_csv(OUTPUT_CSV, index=False, encoding="utf-8-sig")
 
-    print(f"\nMerged: {len(all_vacancies)} unique vacancies")
-    print(f"  -> {OUTPUT_JSON}")
-    print(f"  -> {OUTPUT_CSV}")  
+    return sorted(f for f in files if not os.path.basename(f).startswith(EXCLUDED_PREFIXES))
 
-    # Stats
-    with_salary = sum(1 for v in all_vacancies if v.get("salary_from") or v.get("salary_to"))
-    with_desc = sum(1 for v in all_vacancies if len(v.get("description", "")) > 50)
-    companies = len(set(v.get("employer_name", "") for v in all_vacancies))
 
+def _iter_unique(files: list[str], seen: IdSet) -> Iterator[dict]:
+    """Stream vacancies of all files, skipping ids that were already seen."""
+    for filepath in files:
+        total = added = 0
+        for v in iter_vacancies(filepath):
+            total += 1
+            vid = v.get("id")
+            if vid and seen.add(vid):
+                added += 1
+                yield v
+        print(f"  {filepath}: {total} total, {added} new (skipped {total - added} duplicates)")
+
+
+def _parse_shard(args: tuple) -> tuple[str, str, list[str]]:
+    """Worker: convert one input file to a JSONL part, return its ids in order."""
+    filepath, part_path = args
+    ids = []
+    with open(part_path, "w", encoding="utf-8") as out:
+        for v in iter_vacancies(filepath):
+            ids.append(v.get("id"))
+            out.write(json.dumps(v, ensure_ascii=False))
+            out.write("\n")
+
+
+    return filepath, part_path, ids
+
+
+def _merge_parallel(files: list[str], output: str, seen: IdSet, workers: int, tmp_dir: str) -> int:
+    """
+    Parse input shards in a process pool, dedupe ids in the main process.
+
+    Workers do the JSON parsing; the main process only walks the id lists and
+    copies the kept lines of every part into the output.
+    """
+    jobs = [(f, os.path.join(tmp_dir, f"part-{i:05d}.jsonl")) for i, f in enumerate(files)]
+    with Pool(workers) as pool:
+        shards = pool.map(_parse_shard, jobs)
+
+    def kept_lines() -> Iterator[str]:
+        for filepath, part_path, ids in shards:
+            keep = [bool(vid) and seen.add(vid) for vid in ids]
+            print(f"  {filepath}: {len(ids)} total, {sum(keep)} new (skipped {len(ids) - sum(keep)} duplicates)")
+            with open(part_path, "r", encoding="utf-8") as f:
+                for line, k in zip(f, keep):
+                    if k:
+                        yield line
+
+    if output.endswith(".jsonl"):
+        n = 0
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w", encoding="utf-8") as out:
+            for line in kept_lines():
+                out.write(line)
+                n += 1
+        return n
+
+
+    return save_vacancies((json.loads(line) for line in kept_lines()), output)
+
+
+def _repost_key(vacancy: dict) -> tuple[str, str]:
+    """A repost keeps its employer and title: boilerplate-heavy descriptions of different jobs do not."""
+    return tuple(" ".join(str(vacancy.get(field) or "").lower().split()) for field in ("employer_name", "name"))
+
+
+def _near_duplicate_labels(
+    path: str, threshold: float, workers: int, batch_size: int = 50_000,
+) -> tuple[np.ndarray, list[str]]:
+    """MinHash the descriptions of a merged file batch by batch, cluster the signatures per employer + title."""
+    sigs, valid, batch, ids, keys = [], [], [], [], []
+
+    def flush():
+        s, v = minhash_signatures(batch, workers=workers)
+        sigs.append(s)
+        valid.append(v)
+        batch.clear()
+
+    for v in iter_vacancies(path):
+        ids.append(v.get("id"))
+        keys.append(_repost_key(v))
+        batch.append(v.get("description", ""))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    if not sigs:
+        return np.zeros(0, dtype=np.int64), ids
+
+
+    return cluster_signatures(np.vstack(sigs), np.concatenate(valid), threshold=threshold, keys=keys), ids
+
+
+def apply_near_duplicates(path: str, mode: str = "drop", threshold: float = 0.8, workers: int = 1) -> int:
+    """
+    Detect reposts of the same vacancy (new id, other city) by description similarity
+    among vacancies of the same employer and title.
+
+    mode="drop" keeps only the first vacancy of every cluster, mode="cluster" keeps all
+    of them and sets "duplicate_of" to the id of the cluster's first vacancy.
+    The file is rewritten in place; returns the number of vacancies left.
+    """
+    labels, ids = _near_duplicate_labels(path, threshold, workers)
+    stats = cluster_stats(labels)
+    print(f"\nNear-duplicates (threshold={threshold}): {stats['n_duplicates']} in {stats['n_clusters']} clusters"
+          f" (largest: {stats['largest_cluster']})")
+    if stats["cluster_sizes"]:
+        print(f"  cluster sizes: {stats['cluster_sizes']}")
+
+    def rewritten() -> Iterator[dict]:
+        for i, v in enumerate(iter_vacancies(path)):
+            if labels[i] == i:
+                if mode == "cluster":
+                    v["duplicate_of"] = None
+                yield v
+            elif mode == "cluster":
+                v["duplicate_of"] = ids[labels[i]]
+                yield v
+
+    tmp_path = f"{path}.tmp{os.path.splitext(path)[1]}"
+    n = save_vacancies(rewritten(), tmp_path)
+    os.replace(tmp_path, path)
+
+
+    return n
+
+
+def _print_stats(vacancies: Iterable[dict]) -> None:
+    n = with_salary = with_desc = 0
+    companies = set()
+    for v in vacancies:
+        n += 1
+        with_salary += bool(v.get("salary_from") or v.get("salary_to"))
+        with_desc += len(v.get("description") or "") > 50
+        companies.add(v.get("employer_name", ""))
 
     print(f"\n--- Stats ---")
-    print(f"With salary: {with_salary} ({100 * with_salary // max(len(all_vacancies), 1)}%)")
-    print(f"With description: {with_desc}")  
-    print(f"Unique companies: {companies}")
-
+    print(f"With salary: {with_salary} ({100 * with_salary // max(n, 1)}%)")
+    print(f"With description: {with_desc}")
+    print(f"Unique companies: {len(companies)}")
+
+
+def merge(
+    files: list[str] | None = None,
+    output: str = OUTPUT_FILE,
+    workers: int = 1,
+    near_dup: str = "off",
+    threshold: float = 0.8,
+    max_ids_in_memory: int = 5_000_000,
+) -> int:
+    """
+    Streaming merge of per-category vacancy files into one deduplicated dataset.
+
+    Args:
+        files: Input .jsonl / .json / .parquet files (default: everything in data/ except outputs)
+        output: Output file, format by extension (.jsonl, .parquet, .json, .csv)
+        workers: Processes parsing input shards in parallel
+        near_dup: "off", "drop" or "cluster" — see apply_near_duplicates
+        threshold: Description similarity for near-duplicates
+        max_ids_in_memory: Seen-id set moves to disk (SQLite) above this size
+
+    Returns the number of merged vacancies.
+    """
+    files = input_files() if files is None else files
+    files = [f for f in files if os.path.abspath(f) != os.path.abspath(output)]
+
+    seen = IdSet(max_in_memory=max_ids_in_memory)
+    tmp_dir = tempfile.mkdtemp(prefix="merge-")
+    try:
+        if workers > 1 and len(files) > 1:
+            n = _merge_parallel(files, output, seen, workers, tmp_dir)
+        else:
+            n = save_vacancies(_iter_unique(files, seen), output)
+        if seen.on_disk:
+            print(f"  (id set spilled to disk: {len(seen)} ids)")
+    finally:
+        seen.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"\nMerged: {n} unique vacancies")
+    print(f"  -> {output}")
+
+    if near_dup != "off":
+        n = apply_near_duplicates(output, mode=near_dup, threshold=threshold, workers=workers)
+        print(f"After near-duplicate {near_dup}: {n} vacancies")
+
+    _print_stats(iter_vacancies(output))
+
+
+    return n
+
+
+def main():
+    p = argparse.ArgumentParser(description="Merge per-category vacancy files into one deduplicated dataset")
+    p.add_argument("inputs", nargs="*", help="Input files (default: data/*.json, data/*.jsonl)")
+    p.add_argument("-o", "--output", default=OUTPUT_FILE,
+                   help="Output file: .jsonl (default), .parquet, or legacy .json/.csv")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Processes for parsing input shards and MinHash signatures")
+    p.add_argument("--max-ids-in-memory", type=int, default=5_000_000,
+                   help="Spill the seen-id set to disk above this many ids")
+    p.add_argument("--near-dup", choices=["off", "drop", "cluster"], default="off",
+                   help="Near-duplicate detection: drop reposts or only mark them with duplicate_of")
+    p.add_argument("--threshold", type=float, default=0.8,
+                   help="Min description similarity (Jaccard of word 3-shingles) for near-duplicates")
+    args = p.parse_args()
+
+    merge(
+        files=args.inputs or None,
+        output=args.output,
+        workers=args.workers,
+        near_dup=args.near_dup,
+        threshold=args.threshold,
+        max_ids_in_memory=args.max_ids_in_memory,
+    )
 
 
 if __name__ == "__main__":
-    merge()
+    main()
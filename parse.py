@@ -2,11 +2,13 @@
 
 import argparse
 import logging
+import os
 import sys
 
 from config import AREAS, RAW_VACANCIES_FILE, PARSED_VACANCIES_FILE
-from parser.hh_parser import collect_vacancies
-from parser.storage import save_json, save_csv
+from parser.checkpoint import CrawlInterrupted, CrawlLog, iter_vacancies_log
+from parser.hh_parser import crawl_vacancies
+from parser.storage import save_json, save_csv, save_parquet
 
 
 def main():
@@ -20,8 +22,19 @@ def main():
                    help="Experience filter")
     p.add_argument("--no-details", action="store_true",
                    help="Skip fetching full descriptions (faster but less data)")
+    p.add_argument("--partition", action="store_true",
+                   help="Split broad searches by area / date to get past the 2000-result API cap")
+    p.add_argument("--search-workers", type=int, default=4,
+                   help="Threads fetching search slices with --partition (shared rate limit)")
+    p.add_argument("--clean-workers", type=int, default=0,
+                   help="Processes cleaning description HTML in the background (0 = inline)")
     p.add_argument("--json-out", type=str, default=RAW_VACANCIES_FILE, help="Output JSON path")
     p.add_argument("--csv-out", type=str, default=PARSED_VACANCIES_FILE, help="Output CSV path")
+    p.add_argument("--parquet-out", type=str, default=None, help="Optional typed, compressed Parquet output")
+    p.add_argument("--checkpoint", type=str, default=None,
+                   help="Crawl log path (default: next to --json-out, *.crawl.log)")
+    p.add_argument("--resume", action="store_true",
+                   help="Continue an interrupted crawl from its checkpoint log (query options are taken from it)")
     p.add_argument("-v", "--verbose", action="store_true", help="Verbose logging")
 
     args = p.parse_args()
@@ -32,44 +45,77 @@ def main():
         datefmt="%H:%M:%S",
     )
 
-    # Resolve area
-    if args.area.isdigit():
-        area_id = int(args.area)
-    else:
-        area_id = AREAS.get(args.area.lower())
-        if area_id is None:
-            print(f"Unknown area '{args.area}'. Available: {', '.join(AREAS.keys())}")
+    checkpoint = args.checkpoint or os.path.splitext(args.json_out)[0] + ".crawl.log"
+    if args.resume:
+        try:
+            log = CrawlLog(checkpoint, resume=True)
+        except FileNotFoundError as e:
+            print(e)
             sys.exit(1)
- 
+        params = log.params
+        print(f"Resuming {checkpoint}: {log.n_vacancies} vacancies done, "
+              f"search {'done' if log.search_done else f'at page {log.next_page}'}")
+    else:
+        # Resolve area
+        if args.area.isdigit():
+            area_id = int(args.area)
+        else:
+            area_id = AREAS.get(args.area.lower())
+            if area_id is None:
+                print(f"Unknown area '{args.area}'. Available: {', '.join(AREAS.keys())}")
+                sys.exit(1)
+        params = {
+            "text": args.query,
+            "area": area_id,
+            "max_vacancies": args.max,
+            "fetch_details": not args.no_details,
+            "experience": args.experience,
+            "partition": args.partition,
+        }
+        log = CrawlLog(checkpoint, params)
+
     print(f"\n{'='*60}")
     print(f"  hh.kz Vacancy Parser")
-    print(f"  Query: '{args.query}' | Area: {args.area} ({area_id})")
-    print(f"  Max: {args.max} | Details: {not args.no_details}")
+    print(f"  Query: '{params['text']}' | Area: {params['area']}")
+    print(f"  Max: {params['max_vacancies']} | Details: {params['fetch_details']}")
+    print(f"  Checkpoint: {checkpoint}")
     print(f"{'='*60}\n")
 
-    vacancies = collect_vacancies (
-        text=args.query,
-        area=area_id,
-        max_vacancies=args.max,
-        fetch_details=not args.no_details,
-        experience=args.experience,
-    )
-    if not vacancies:
+    # Vacancies go straight to the checkpoint log; nothing is accumulated here
+    try:
+        with log:
+            for _ in crawl_vacancies(
+                **params, clean_workers=args.clean_workers, search_workers=args.search_workers, log=log,
+            ):
+                pass
+            n_done = log.n_vacancies
+    except (KeyboardInterrupt, CrawlInterrupted) as e:
+        print(f"\nStopped ({e or 'interrupted'}). Progress is saved, continue with:")
+        print(f"  python parse.py --resume --checkpoint {checkpoint}")
+        sys.exit(130)
+
+    if not n_done:
         print("No vacancies found!")
         sys.exit(0)
 
-    save_json(vacancies, args.json_out)
-    save_csv(vacancies, args.csv_out)
+    save_json(iter_vacancies_log(checkpoint), args.json_out)
+    save_csv(list(iter_vacancies_log(checkpoint)), args.csv_out)
+    if args.parquet_out:
+        save_parquet(iter_vacancies_log(checkpoint), args.parquet_out)
+        print(f"Saved {n_done} vacancies to {args.parquet_out}")
 
     # Quick stats
-    with_salary = sum(1 for v in vacancies if v.get("salary_from") or v.get("salary_to"))
-    companies = len(set(v.get("employer_name", "") for v in vacancies))
+    with_salary = 0
+    companies = set()
+    for v in iter_vacancies_log(checkpoint):
+        with_salary += bool(v.get("salary_from") or v.get("salary_to"))
+        companies.add(v.get("employer_name", ""))
 
 
     print(f"\n--- Stats ---")
-    print(f"Total vacancies: {len(vacancies)}")
-    print(f"With salary: {with_salary} ({100 * with_salary // len(vacancies)}%)")
-    print(f"Unique companies: {companies}")
+    print(f"Total vacancies: {n_done}")
+    print(f"With salary: {with_salary} ({100 * with_salary // n_done}%)")
+    print(f"Unique companies: {len(companies)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+"""
+Thin hh API client shared by concurrent crawlers: one request budget for all threads.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+import requests
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import API_RATE_LIMIT, BASE_URL, HEADERS
+
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limited or a transient server error
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """
+    Spaces calls at least 1 / rate seconds apart, across all threads sharing it.
+
+    Every request of a crawl (search pages, area lookups, details) goes through
+    one limiter, so adding worker threads never exceeds the API budget.
+    """
+
+    def __init__(self, rate: float = API_RATE_LIMIT):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next)
+            self._next = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+
+def get_json(
+    url: str,
+    params: Optional[dict] = None,
+    limiter: Optional[RateLimiter] = None,
+    session: Optional[requests.Session] = None,
+    retries: int = 3,
+    missing: Optional[dict] = None,
+) -> Optional[dict]:
+    """
+    GET url within the rate limit, retrying 429/5xx with backoff. None on failure.
+
+    missing: returned for a 404 instead of None, to tell "does not exist" from "request failed".
+    """
+    http = session or requests
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.wait()
+        try:
+            resp = http.get(url, params=params, headers=HEADERS, timeout=15)
+            if resp.status_code == 404 and missing is not None:
+                return missing
+            if resp.status_code in RETRY_STATUSES and attempt < retries:
+                time.sleep(0.5 * 2 ** attempt)
+                continue
+            resp.raise_for_status()
+            return resp.json()
+        except requests.RequestException as e:
+            if attempt < retries and not isinstance(e, requests.HTTPError):
+                time.sleep(0.5 * 2 ** attempt)
+                continue
+            logger.error(f"Error fetching {url} {params or ''}: {e}")
+            return None
+
+
+def fetch_area(area_id: int, base_url: str = BASE_URL, limiter: Optional[RateLimiter] = None,
+               session: Optional[requests.Session] = None) -> Optional[dict]:
+    """Area node {"id", "name", "areas": [children...]} from /areas/{id}."""
+    return get_json(f"{base_url}/areas/{area_id}", limiter=limiter, session=session)
+
+
+def fetch_vacancy_state(vacancy_id: str, base_url: str = BASE_URL, limiter: Optional[RateLimiter] = None,
+                        session: Optional[requests.Session] = None) -> Optional[str]:
+    """
+    "open", "archived" (closed by the employer, still served) or "gone" (404); None if the request failed.
+    """
+    detail = get_json(f"{base_url}/vacancies/{vacancy_id}", limiter=limiter, session=session,
+                      missing={"_gone": True})
+    if detail is None:
+        return None
+    if detail.get("_gone"):
+        return "gone"
+
+
+    return "archived" if detail.get("archived") else "open"
@@ -0,0 +1,128 @@
+"""
+Append-only checkpoint log of a crawl, so an interrupted parse.py run can resume.
+
+One JSON event per line, flushed as soon as it happens:
+
+    {"event": "start", "params": {...}}                      crawl parameters
+    {"event": "page", "page": 3, "pages": 20, "items": [...]}  search page (cursor = last page)
+    {"event": "search_done", "items": [...]?}                  search finished (partitioned: all items)
+    {"event": "vacancy", "vacancy": {...}}                     parsed vacancy with details
+
+The log is also the streamed partial result: vacancies are never held in a list,
+final outputs are written by replaying "vacancy" events (iter_vacancies_log).
+"""
+
+import json
+import os
+from typing import Iterator, Optional
+
+
+class CrawlInterrupted(RuntimeError):
+    """The crawl stopped early (network error); the log holds everything done so far."""
+
+
+class CrawlLog:
+    """
+    Crawl state rebuilt from the log on open, extended by append-only writes.
+
+    State: params, items (search results in order), next_page, search_done,
+    done_ids (vacancies with details already written), n_vacancies.
+    """
+
+    def __init__(self, path: str, params: Optional[dict] = None, resume: bool = False):
+        """
+        resume=False starts a new log (an existing file is replaced) with params;
+        resume=True replays an existing log, its params win over the given ones.
+        """
+        self.path = path
+        self.params = params or {}
+        self.items = []
+        self.next_page = 0
+        self.pages = None
+        self.search_done = False
+        self.done_ids = set()
+        self.n_vacancies = 0
+
+        if resume:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No crawl log to resume: {path}")
+            self._replay()
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, "w", encoding="utf-8")
+            self._append({"event": "start", "params": self.params})
+
+    def _replay(self) -> None:
+        good_end = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    break  # torn last line of a killed run
+                good_end += len(line)
+                self._apply(event)
+        if good_end < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(good_end)
+
+    def _apply(self, event: dict) -> None:
+        kind = event["event"]
+        if kind == "start":
+            self.params = event["params"]
+        elif kind == "page":
+            self.items.extend(event["items"])
+            self.next_page = event["page"] + 1
+            self.pages = event["pages"]
+        elif kind == "search_done":
+            if "items" in event:
+                self.items = event["items"]
+            self.search_done = True
+        elif kind == "vacancy":
+            self.done_ids.add(event["vacancy"]["id"])
+            self.n_vacancies += 1
+
+    def _append(self, event: dict) -> None:
+        self._file.write(json.dumps(event, ensure_ascii=False))
+        self._file.write("\n")
+        self._file.flush()
+
+    def page(self, page: int, pages: int, items: list[dict]) -> None:
+        event = {"event": "page", "page": page, "pages": pages, "items": items}
+        self._append(event)
+        self._apply(event)
+
+    def finish_search(self, items: Optional[list[dict]] = None) -> None:
+        """Mark the search as complete; items replaces paged items (partitioned search)."""
+        event = {"event": "search_done"}
+        if items is not None:
+            event["items"] = items
+        self._append(event)
+        self._apply(event)
+
+    def vacancy(self, vacancy: dict) -> None:
+        event = {"event": "vacancy", "vacancy": vacancy}
+        self._append(event)
+        self._apply(event)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_vacancies_log(path: str) -> Iterator[dict]:
+    """Stream the vacancies written to a crawl log (all runs of the job)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                break  # torn last line
+            if event["event"] == "vacancy":
+                yield event["vacancy"]
@@ -0,0 +1,277 @@
+"""
+Near-duplicate vacancy detection: MinHash signatures over word shingles + LSH banding.
+
+Employers repost the same vacancy under new ids or in several cities; exact id
+dedup in merge_data does not catch that. Signatures are computed per description,
+LSH buckets give candidate pairs in ~linear time, candidates are verified by the
+estimated Jaccard similarity and merged into clusters with union-find.
+"""
+
+import os
+import re
+import sqlite3
+import tempfile
+import zlib
+from collections import Counter
+from multiprocessing import Pool
+from typing import Optional
+
+import numpy as np
+
+
+_WORD = re.compile(r"\w+")
+
+
+class IdSet:
+    """
+    Set of seen vacancy ids for exact dedup.
+
+    Lives in memory until it holds max_in_memory ids, then moves to a temporary
+    on-disk SQLite table, so merging millions of vacancies does not need the
+    whole id set in RAM.
+    """
+
+    def __init__(self, max_in_memory: int = 5_000_000, tmp_dir: Optional[str] = None):
+        self.max_in_memory = max_in_memory
+        self.tmp_dir = tmp_dir
+        self._mem = set()
+        self._db = None
+        self._path = None
+        self._size = 0
+
+    def add(self, vid: str) -> bool:
+        """Add an id, return True if it was not seen before."""
+        if self._db is None:
+            if vid in self._mem:
+                return False
+            self._mem.add(vid)
+            self._size += 1
+            if len(self._mem) > self.max_in_memory:
+                self._spill()
+            return True
+
+        added = self._db.execute("INSERT OR IGNORE INTO ids VALUES (?)", (vid,)).rowcount == 1
+        self._size += added
+        return added
+
+    def _spill(self) -> None:
+        fd, self._path = tempfile.mkstemp(prefix="ids-", suffix=".sqlite", dir=self.tmp_dir)
+        os.close(fd)
+        self._db = sqlite3.connect(self._path)
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("CREATE TABLE ids (id TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._db.executemany("INSERT INTO ids VALUES (?)", ((v,) for v in self._mem))
+        self._mem = set()
+
+    @property
+    def on_disk(self) -> bool:
+        return self._db is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            os.remove(self._path)
+            self._db = None
+
+
+def text_shingles(text: str, k: int = 3) -> np.ndarray:
+    """Hashes (uint64) of the distinct word k-shingles of text."""
+    words = _WORD.findall((text or "").lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    tokens = np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.uint64, count=len(words))
+    if len(tokens) < k:
+        k = len(tokens)
+
+    # Polynomial rolling combination of k consecutive token hashes (wraps around in uint64)
+    h = np.zeros(len(tokens) - k + 1, dtype=np.uint64)
+    for i in range(k):
+        h = h * np.uint64(1_000_003) + tokens[i:len(tokens) - k + 1 + i]
+
+
+    return np.unique(h)
+
+
+class MinHasher:
+    """num_perm universal hash functions h(x) = (a*x + b) >> 32, deterministic by seed."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1, shingle_size: int = 3):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """uint32 signature, None for texts without words."""
+        shingles = text_shingles(text, self.shingle_size)
+        if len(shingles) == 0:
+            return None
+        hashed = (self.a[:, None] * shingles[None, :] + self.b[:, None]) >> np.uint64(32)
+
+
+        return hashed.min(axis=1).astype(np.uint32)
+
+
+def _signature_batch(args: tuple) -> tuple[np.ndarray, np.ndarray]:
+    texts, num_perm, seed, shingle_size = args
+    hasher = MinHasher(num_perm, seed, shingle_size)
+    sigs = np.zeros((len(texts), num_perm), dtype=np.uint32)
+    valid = np.zeros(len(texts), dtype=bool)
+    for i, text in enumerate(texts):
+        sig = hasher.signature(text)
+        if sig is not None:
+            sigs[i] = sig
+            valid[i] = True
+
+
+    return sigs, valid
+
+
+def minhash_signatures(
+    texts: list[str],
+    num_perm: int = 128,
+    seed: int = 1,
+    shingle_size: int = 3,
+    workers: int = 1,
+    batch_size: int = 10_000,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Signatures of all texts: (n x num_perm uint32 matrix, bool mask of texts that have words).
+
+    With workers > 1 batches are hashed in a process pool.
+    """
+    batches = [(texts[i:i + batch_size], num_perm, seed, shingle_size) for i in range(0, len(texts), batch_size)]
+    if workers > 1 and len(batches) > 1:
+        with Pool(workers) as pool:
+            parts = pool.map(_signature_batch, batches)
+    else:
+        parts = [_signature_batch(b) for b in batches]
+
+    if not parts:
+        return np.zeros((0, num_perm), dtype=np.uint32), np.zeros(0, dtype=bool)
+
+
+    return np.vstack([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def lsh_candidate_pairs(signatures: np.ndarray, bands: int, valid: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Candidate pairs (m x 2, i < j) of rows that share at least one LSH band.
+
+    Each band is hashed into one uint64 key; rows are sorted by key and every
+    member of a bucket is paired with the bucket's first row (star), which keeps
+    the pair count linear in the bucket size.
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    ids = np.arange(n) if valid is None else np.flatnonzero(valid)
+    if len(ids) < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    multipliers = np.random.default_rng(0).integers(1, 2**63, size=rows, dtype=np.uint64) | np.uint64(1)
+    pairs = []
+    for b in range(bands):
+        band = signatures[ids, b * rows:(b + 1) * rows].astype(np.uint64)
+        keys = (band * multipliers).sum(axis=1)
+
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        new_bucket = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        first = order[np.maximum.accumulate(np.where(new_bucket, np.arange(len(order)), 0))]
+        members = ~new_bucket
+        pairs.append(np.column_stack([ids[first[members]], ids[order[members]]]))
+
+    pairs = np.vstack(pairs)
+    pairs.sort(axis=1)
+
+
+    return np.unique(pairs, axis=0)
+
+
+def _cluster_labels(n: int, pairs: np.ndarray) -> np.ndarray:
+    """Union-find over pairs; label = smallest row index in the cluster."""
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in pairs.tolist():
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+
+    return np.array([find(i) for i in range(n)], dtype=np.int64)
+
+
+def find_near_duplicates(
+    texts: list[str],
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    bands: int = 16,
+    shingle_size: int = 3,
+    workers: int = 1,
+    keys: Optional[list] = None,
+) -> np.ndarray:
+    """
+    Cluster near-duplicate texts.
+
+    Args:
+        texts: Vacancy descriptions, row i = vacancy i
+        threshold: Min estimated Jaccard similarity of shingle sets to call two texts duplicates
+        num_perm: Signature length (more = more accurate, memory is n * num_perm * 4 bytes)
+        bands: LSH bands; num_perm / bands rows per band. 16 x 8 catches pairs above ~0.7 similarity
+        shingle_size: Words per shingle
+        workers: Processes for signature computation
+        keys: Optional key per text (e.g. employer + title); only texts with equal keys are clustered
+
+    Returns labels: labels[i] = index of the first text of i's cluster (labels[i] == i for unique texts
+    and cluster representatives). Empty texts are never clustered.
+    """
+    sigs, valid = minhash_signatures(texts, num_perm=num_perm, shingle_size=shingle_size, workers=workers)
+
+
+    return cluster_signatures(sigs, valid, threshold=threshold, bands=bands, keys=keys)
+
+
+def cluster_signatures(
+    signatures: np.ndarray,
+    valid: np.ndarray,
+    threshold: float = 0.8,
+    bands: int = 16,
+    keys: Optional[list] = None,
+) -> np.ndarray:
+    """find_near_duplicates on precomputed signatures (e.g. collected batch by batch from a stream)."""
+    pairs = lsh_candidate_pairs(signatures, bands, valid)
+
+    if len(pairs):
+        similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        pairs = pairs[similarity >= threshold]
+    if keys is not None and len(pairs):
+        pairs = pairs[[keys[i] == keys[j] for i, j in pairs]]
+
+
+    return _cluster_labels(len(signatures), pairs)
+
+
+def cluster_stats(labels: np.ndarray) -> dict:
+    """Summary of near-duplicate clusters for reporting."""
+    sizes = np.bincount(labels, minlength=len(labels)) if len(labels) else np.zeros(0, dtype=np.int64)
+    sizes = sizes[sizes > 1]
+
+
+    return {
+        "n_docs": int(len(labels)),
+        "n_clusters": int(len(sizes)),
+        "n_duplicates": int(sizes.sum() - len(sizes)),
+        "largest_cluster": int(sizes.max()) if len(sizes) else 0,
+        "cluster_sizes": dict(sorted(Counter(sizes.tolist()).items())),
+    }
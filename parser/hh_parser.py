@@ -6,8 +6,12 @@ hh.ru API docs: https://github.com/hhru/api
 import time
 import logging
 import requests
-from typing import Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
 from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 
 import sys
 import os
@@ -15,12 +19,35 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import VACANCIES_URL, HEADERS, DEFAULT_SEARCH_PARAMS
+from parser.checkpoint import CrawlInterrupted, CrawlLog
+from parser.partition import fetch_all_vacancy_ids
 
 
 logger = logging.getLogger(__name__)
 
 
+# Text nodes outside invisible elements, in document order — what BeautifulSoup.get_text returns
+_VISIBLE_TEXT = etree.XPath("//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+
 def clean_html(html_text: Optional[str]) -> str:
+    """
+    Strip tags, one text node per line (same output as _clean_html_bs4, ~7x faster).
+
+    lxml parses in C; inputs lxml refuses (encoding declarations, control chars)
+    go through the BeautifulSoup path.
+    """
+    if not html_text:
+        return ""
+    try:
+        root = lxml.html.fragment_fromstring(html_text, create_parent="div")
+    except (etree.ParserError, ValueError):
+        return _clean_html_bs4(html_text)
+    return "\n".join(s for s in (t.strip() for t in _VISIBLE_TEXT(root)) if s)
+
+
+def _clean_html_bs4(html_text: Optional[str]) -> str:
+    """Reference implementation: pure-Python html.parser tree via BeautifulSoup."""
     if not html_text:
         return ""
     return BeautifulSoup(html_text, "html.parser").get_text(separator="\n", strip=True)
@@ -37,6 +64,31 @@ def parse_salary(salary: Optional[dict]) -> dict:
     }
 
 
+def search_params(
+    text: str = "",
+    area: Optional[int] = None,
+    experience: Optional[str] = None,
+    per_page: int = 100,
+    search_fields: Optional[list] = None,
+) -> dict:
+    """Query parameters of a vacancy search."""
+    params = {
+        **DEFAULT_SEARCH_PARAMS,
+        "per_page": per_page,
+    }
+
+    if text:
+        params["text"] = text
+    if area is not None:
+        params["area"] = area
+    if experience:
+        params["experience"] = experience
+    if search_fields:
+        params["search_field"] = search_fields
+
+    return params
+
+
 def fetch_vacancy_ids(
     text: str = "",
     area: Optional[int] = None,
@@ -57,23 +109,21 @@ def fetch_vacancy_ids(
         search_fields: Where to search - ["name", "description", "company_name"]
     """
 
-    params = {
-        **DEFAULT_SEARCH_PARAMS,
-        "per_page": per_page,
-    }
-
-    if text:
-        params["text"] = text
-    if area is not None:
-        params["area"] = area
-    if experience:
-        params["experience"] = experience
-    if search_fields:
-        params["search_field"] = search_fields
+    params = search_params(text, area, experience, per_page, search_fields)
 
     all_items = []
+    for page, total_pages, items in iter_search_pages(params, max_pages=max_pages):
+        all_items.extend(items)
+        logger.info(f"Page {page + 1}/{min(max_pages, total_pages)}: got {len(items)} items (total: {len(all_items)})")
+
+    return all_items
+
+
+def iter_search_pages(params: dict, max_pages: int = 20, start_page: int = 0) -> Iterator[tuple[int, int, list]]:
+    """Yield (page, total_pages, items) of a search, starting at start_page (resume cursor)."""
+    params = dict(params)
 
-    for page in range(max_pages):
+    for page in range(start_page, max_pages):
         params["page"] = page
 
         try:
@@ -88,11 +138,10 @@ def fetch_vacancy_ids(
         total_pages = data.get("pages", 0)
         found = data.get("found", 0)
 
-        if page == 0:
+        if page == start_page:
             logger.info(f"Found {found} vacancies, {total_pages} pages")
 
-        all_items.extend(items)
-        logger.info(f"Page {page + 1}/{min(max_pages, total_pages)}: got {len(items)} items (total: {len(all_items)})")
+        yield page, total_pages, items
 
         if page + 1 >= total_pages:
             break
@@ -100,8 +149,6 @@ def fetch_vacancy_ids(
         # Rate limiting — be polite to API
         time.sleep(0.25)
 
-    return all_items
-
  
 def fetch_vacancy_detail(vacancy_id: str) -> Optional[dict]:
 
@@ -116,7 +163,13 @@ def fetch_vacancy_detail(vacancy_id: str) -> Optional[dict]:
         return None
 
 
-def parse_vacancy(raw: dict, detail: Optional[dict] = None) -> dict:
+def parse_vacancy(raw: dict, detail: Optional[dict] = None, description: Optional[str] = None) -> dict:
+    """
+    Flatten a search item (+ optional detail) into a vacancy dict.
+
+    description: already cleaned detail description (e.g. from a worker pool),
+    skips clean_html on detail["description"].
+    """
 
     salary = parse_salary(raw.get("salary")) 
 
@@ -140,7 +193,7 @@ def parse_vacancy(raw: dict, detail: Optional[dict] = None) -> dict:
 
     # If we have full detail — add description & skills
     if detail:
-        result["description"] = clean_html(detail.get("description"))
+        result["description"] = description if description is not None else clean_html(detail.get("description"))
         result["key_skills"] = ", ".join(
             skill["name"] for skill in detail.get("key_skills", [])
         )
@@ -161,7 +214,9 @@ def collect_vacancies(
     max_vacancies: int = 500,
     fetch_details: bool = True,
     detail_delay: float = 0.3,
-
+    clean_workers: int = 0,
+    partition: bool = False,
+    search_workers: int = 4,
 ) -> list[dict]:
     """
     Main function: search vacancies and optionally fetch full details for each.
@@ -173,34 +228,137 @@ def collect_vacancies(
         max_vacancies: Max number of vacancies to collect
         fetch_details: If True, fetch full description for each vacancy (slower but richer data)
         detail_delay: Delay between detail requests (seconds)
+        clean_workers: Processes for HTML cleaning; > 0 cleans descriptions in the background
+            while the next details are being fetched
+        partition: Split the search by area / date so results beyond the 2000 API cap are reachable
+        search_workers: Threads fetching search slices when partitioning
 
     Returns:
         List of parsed vacancy dicts
     """
+    parsed = list(crawl_vacancies(
+        text=text, area=area, experience=experience, max_vacancies=max_vacancies, fetch_details=fetch_details,
+        detail_delay=detail_delay, clean_workers=clean_workers, partition=partition, search_workers=search_workers,
+    ))
+    logger.info(f"Done! Parsed {len(parsed)} vacancies total")
+
+
+    return parsed
+
+
+def _search_items(
+    text: str,
+    area: Optional[int],
+    experience: Optional[str],
+    max_vacancies: int,
+    partition: bool,
+    search_workers: int,
+    log: Optional[CrawlLog],
+) -> list[dict]:
+    """Search results, continued from the log's page cursor; every page is checkpointed."""
+    if log is not None and log.search_done:
+        logger.info(f"Search already done: {len(log.items)} summaries in the log")
+        return log.items
+
+    if partition:
+        items = fetch_all_vacancy_ids(text=text, area=area, experience=experience, workers=search_workers)
+        if log is not None:
+            log.finish_search(items)
+        return items
+
     max_pages = (max_vacancies // 100) + 1
+    items = list(log.items) if log is not None else []
+    start_page = log.next_page if log is not None else 0
+    last_page = total_pages = log.pages if log is not None and log.pages is not None else None
+    if start_page and total_pages is not None and start_page >= min(max_pages, total_pages):
+        last_page = start_page - 1  # cursor already at the end, only search_done is missing
 
-    logger.info(f"Searching: text='{text}', area={area}, max={max_vacancies}")
-    raw_items = fetch_vacancy_ids(text=text, area=area, experience=experience, max_pages=max_pages)
+    for page, total_pages, page_items in iter_search_pages(
+        search_params(text, area, experience), max_pages=max_pages, start_page=start_page,
+    ):
+        items.extend(page_items)
+        last_page = page
+        if log is not None:
+            log.page(page, total_pages, page_items)
+        logger.info(f"Page {page + 1}/{min(max_pages, total_pages)}: got {len(page_items)} items (total: {len(items)})")
 
-    # Trim to requested max
-    raw_items = raw_items[:max_vacancies]
-    logger.info(f"Collected {len(raw_items)} vacancy summaries")
+    complete = last_page is not None and last_page + 1 >= min(max_pages, total_pages)
+    if log is not None:
+        if not complete and len(items) < max_vacancies:
+            raise CrawlInterrupted(f"Search stopped after page {last_page}; run again with --resume")
+        log.finish_search()
 
-    parsed = []
-    for i, item in enumerate(raw_items):
-        detail = None
-        if fetch_details:
-            detail = fetch_vacancy_detail(item["id"])
-            if detail_delay > 0:
-                time.sleep(detail_delay)
 
-        vacancy = parse_vacancy(item, detail)
-        parsed.append(vacancy)
+    return items
 
-        if (i + 1) % 50 == 0:
-            logger.info(f"Parsed {i + 1}/{len(raw_items)} vacancies")
 
-    logger.info(f"Done! Parsed {len(parsed)} vacancies total")
+def crawl_vacancies(
+    text: str = "",
+    area: Optional[int] = None,
+    experience: Optional[str] = None,
+    max_vacancies: int = 500,
+    fetch_details: bool = True,
+    detail_delay: float = 0.3,
+    clean_workers: int = 0,
+    partition: bool = False,
+    search_workers: int = 4,
+    log: Optional[CrawlLog] = None,
+) -> Iterator[dict]:
+    """
+    collect_vacancies as a stream: yields parsed vacancies as soon as their details arrive.
 
+    With a CrawlLog every search page and parsed vacancy is checkpointed; on a resumed
+    log vacancies already written are skipped (not yielded again) and the search
+    continues from the page cursor. Details that fail to download stay pending for
+    the next resume instead of being saved without a description.
+    """
+    logger.info(f"Searching: text='{text}', area={area}, max={max_vacancies}")
+    raw_items = _search_items(text, area, experience, max_vacancies, partition, search_workers, log)
 
-    return parsed
+    # Trim to requested max
+    raw_items = raw_items[:max_vacancies]
+    done = log.done_ids if log is not None else set()
+    todo = [item for item in raw_items if item["id"] not in done]
+    logger.info(f"Collected {len(raw_items)} vacancy summaries, {len(todo)} to fetch")
+
+    pool = ProcessPoolExecutor(clean_workers) if clean_workers > 0 and fetch_details else None
+    pending = deque()  # (item, detail, cleaned future) in input order
+    missing = 0
+
+    def finish(item, detail, cleaned):
+        vacancy = parse_vacancy(item, detail, description=cleaned.result() if cleaned else None)
+        if log is not None:
+            log.vacancy(vacancy)
+        return vacancy
+
+    try:
+        for i, item in enumerate(todo):
+            detail = None
+            if fetch_details:
+                detail = fetch_vacancy_detail(item["id"])
+                if detail_delay > 0:
+                    time.sleep(detail_delay)
+                if detail is None and log is not None:
+                    missing += 1
+                    continue
+
+            # CPU-bound cleaning goes to the pool so it overlaps with network I/O
+            cleaned = None
+            if pool is not None and detail:
+                cleaned = pool.submit(clean_html, detail.get("description"))
+            pending.append((item, detail, cleaned))
+            # Keep a few cleanings in flight, emit the rest in order
+            while len(pending) > 2 * clean_workers:
+                yield finish(*pending.popleft())
+
+            if (i + 1) % 50 == 0:
+                logger.info(f"Fetched {i + 1}/{len(todo)} vacancies")
+
+        while pending:
+            yield finish(*pending.popleft())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if missing:
+        logger.warning(f"{missing} details failed to download, run again with --resume to retry them")
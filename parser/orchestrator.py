@@ -0,0 +1,213 @@
+"""
+Multi-query crawl: every search of a config file, one shared id set, each detail fetched once.
+
+Replaces running parse.py per category and merging afterwards. Searches run
+concurrently (partitioned past the 2000 cap), their results are deduplicated
+by id before any detail is requested, details are fetched by a thread pool,
+and all requests share one RateLimiter. Progress goes to a CrawlLog, so an
+interrupted crawl resumes like parse.py --resume.
+"""
+
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator, Optional
+
+import requests
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import AREAS, BASE_URL, DEFAULT_SEARCH_PARAMS
+from parser.api import RateLimiter, get_json
+from parser.checkpoint import CrawlLog
+from parser.hh_parser import parse_vacancy
+from parser.partition import SearchPartitioner
+
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DEFAULTS = {
+    "areas": ["kazakhstan"],
+    "max_per_query": None,
+    "experience": None,
+    "fetch_details": True,
+    "search_workers": 4,
+    "detail_workers": 4,
+    "output": "data/vacancies_all.jsonl",
+}
+
+
+def _area_id(area) -> int:
+    if isinstance(area, int) or str(area).isdigit():
+        return int(area)
+    if area.lower() not in AREAS:
+        raise ValueError(f"Unknown area '{area}'. Available: {', '.join(AREAS)} or a numeric id")
+    return AREAS[area.lower()]
+
+
+def load_crawl_config(path: str) -> dict:
+    """
+    Read a crawl config (JSON): queries plus defaults every query may override.
+
+        {"areas": ["kazakhstan"], "max_per_query": 2000,
+         "queries": [{"text": "Python"}, {"text": "1С", "areas": ["almaty"]}]}
+
+    Returns the config with defaults filled in and one search per (query, area).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        config = {**CONFIG_DEFAULTS, **json.load(f)}
+    if not config.get("queries"):
+        raise ValueError(f"{path}: no queries")
+
+    searches = []
+    for q in config["queries"]:
+        q = {"text": q} if isinstance(q, str) else q
+        for area in q.get("areas", config["areas"]):
+            searches.append({
+                "text": q.get("text", ""),
+                "area": _area_id(area),
+                "experience": q.get("experience", config["experience"]),
+                "max": q.get("max", config["max_per_query"]),
+            })
+    config["searches"] = searches
+
+
+    return config
+
+
+def _search_params(search: dict) -> dict:
+    params = {k: v for k, v in DEFAULT_SEARCH_PARAMS.items() if k not in ("page", "per_page")}
+    params["area"] = search["area"]
+    if search["text"]:
+        params["text"] = search["text"]
+    if search["experience"]:
+        params["experience"] = search["experience"]
+    return params
+
+
+class CrawlOrchestrator:
+    """
+    Args:
+        config: load_crawl_config() result
+        base_url: API root (a local stub in tests and benchmarks)
+        limiter: Request budget shared by all searches and detail fetches
+        date_range: Window for date splits of over-cap searches (see SearchPartitioner)
+    """
+
+    def __init__(self, config: dict, base_url: str = BASE_URL, limiter: Optional[RateLimiter] = None,
+                 date_range: Optional[tuple[datetime, datetime]] = None):
+        self.config = config
+        self.base_url = base_url
+        self.limiter = limiter or RateLimiter()
+        self.date_range = date_range
+        self.session = requests.Session()
+        self.report = {"searches": [], "summaries": 0, "unique": 0, "detail_fetches_saved": 0,
+                       "details_fetched": 0, "details_failed": 0, "vacancies": 0}
+
+    def _run_search(self, search: dict) -> tuple[list[dict], int]:
+        partitioner = SearchPartitioner(_search_params(search), base_url=self.base_url, limiter=self.limiter,
+                                        workers=2, date_range=self.date_range)
+        items = partitioner.run()
+        if search["max"]:
+            items = items[:search["max"]]
+        logger.info(f"'{search['text']}' area={search['area']}: found {partitioner.stats['found']}, "
+                    f"collected {len(items)}")
+        return items, partitioner.stats["found"]
+
+    def search(self) -> list[dict]:
+        """All searches concurrently; unique summaries in config order."""
+        with ThreadPoolExecutor(self.config["search_workers"]) as pool:
+            results = list(pool.map(self._run_search, self.config["searches"]))
+
+        seen = set()
+        unique = []
+        for search, (items, found) in zip(self.config["searches"], results):
+            new = 0
+            for item in items:
+                if item["id"] not in seen:
+                    seen.add(item["id"])
+                    unique.append(item)
+                    new += 1
+            self.report["searches"].append({**search, "found": found, "collected": len(items), "new": new})
+
+        self.report["summaries"] = sum(len(items) for items, _ in results)
+        self.report["unique"] = len(unique)
+        self.report["detail_fetches_saved"] = self.report["summaries"] - len(unique)
+
+
+        return unique
+
+    def _detail(self, vacancy_id: str) -> Optional[dict]:
+        return get_json(f"{self.base_url}/vacancies/{vacancy_id}", limiter=self.limiter, session=self.session)
+
+    def crawl(self, log: CrawlLog) -> Iterator[dict]:
+        """Search (unless the log has it) and yield parsed vacancies, each detail fetched once."""
+        t0 = time.perf_counter()
+        if log.search_done:
+            items = log.items
+            self.report["unique"] = len(items)
+            self.report["detail_fetches_saved"] = None  # per-query counts are not in the log
+            logger.info(f"Search already done: {len(items)} unique summaries in the log")
+        else:
+            items = self.search()
+            log.finish_search(items)
+
+        todo = [item for item in items if item["id"] not in log.done_ids]
+        logger.info(f"{len(items)} unique vacancies, {len(todo)} to fetch")
+
+        if self.config["fetch_details"]:
+            workers = self.config["detail_workers"]
+            with ThreadPoolExecutor(workers) as pool:
+                # Bounded window of in-flight details, emitted in input order
+                pending = deque()
+                for item in todo:
+                    pending.append((item, pool.submit(self._detail, item["id"])))
+                    if len(pending) >= 4 * workers:
+                        yield from self._finish(*pending.popleft(), log)
+                while pending:
+                    yield from self._finish(*pending.popleft(), log)
+        else:
+            for item in todo:
+                vacancy = parse_vacancy(item)
+                log.vacancy(vacancy)
+                yield vacancy
+
+        self.report["vacancies"] = log.n_vacancies
+        self.report["seconds"] = round(time.perf_counter() - t0, 2)
+
+    def _finish(self, item: dict, future, log: CrawlLog) -> Iterator[dict]:
+        detail = future.result()
+        if detail is None:
+            # Stays pending in the log, retried on resume
+            self.report["details_failed"] += 1
+            return
+        self.report["details_fetched"] += 1
+        vacancy = parse_vacancy(item, detail)
+        log.vacancy(vacancy)
+        yield vacancy
+        if self.report["details_fetched"] % 100 == 0:
+            logger.info(f"Fetched {self.report['details_fetched']} details")
+
+
+def run_crawl(
+    config: dict,
+    log_path: str,
+    resume: bool = False,
+    base_url: str = BASE_URL,
+    limiter: Optional[RateLimiter] = None,
+    date_range: Optional[tuple[datetime, datetime]] = None,
+) -> dict:
+    """Crawl everything in config into the log at log_path, return the report."""
+    orchestrator = CrawlOrchestrator(config, base_url=base_url, limiter=limiter, date_range=date_range)
+    with CrawlLog(log_path, {"config": config}, resume=resume) as log:
+        for _ in orchestrator.crawl(log):
+            pass
+
+
+    return orchestrator.report
@@ -0,0 +1,220 @@
+"""
+Search-space partitioning around the hh API result cap.
+
+The API returns at most SEARCH_RESULT_CAP (2000) items of one query, whatever
+`found` says. A query over that cap is split into slices that each fit:
+first by area (children from /areas/{id}, down to cities), then by
+published-date windows. Vacancies posted to a region or country itself match
+none of its children: when the children's `found` add up to less than the
+parent's, the parent is also split by date windows. Slices are probed level by level in a thread pool,
+the remaining pages of every fitting slice are fetched concurrently, all
+requests share one RateLimiter, and items are deduplicated by id.
+"""
+
+import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import requests
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import BASE_URL, DEFAULT_SEARCH_PARAMS, SEARCH_RESULT_CAP
+from parser.api import RateLimiter, fetch_area, get_json
+
+
+logger = logging.getLogger(__name__)
+
+# hh searches vacancies of the last 30 days by default
+SEARCH_PERIOD_DAYS = 30
+# Date windows are not split below this; such a slice is fetched up to the cap
+MIN_WINDOW = timedelta(minutes=1)
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat(timespec="seconds")
+
+
+class SearchPartitioner:
+    """
+    Collects every item of a search, splitting it until each slice fits the cap.
+
+    Args:
+        params: Search parameters (text, area, experience, ...), without page / per_page
+        base_url: API root (a local stub in tests and benchmarks)
+        limiter: Shared request budget; a new RateLimiter() by default
+        workers: Threads issuing requests
+        date_range: (from, to) window for date splits, default: the last SEARCH_PERIOD_DAYS
+        cap: Max results the API serves per query
+        per_page: Items per page (max 100)
+    """
+
+    def __init__(
+        self,
+        params: dict,
+        base_url: str = BASE_URL,
+        limiter: Optional[RateLimiter] = None,
+        workers: int = 4,
+        date_range: Optional[tuple[datetime, datetime]] = None,
+        cap: int = SEARCH_RESULT_CAP,
+        per_page: int = 100,
+    ):
+        self.params = {k: v for k, v in params.items() if k not in ("page", "per_page")}
+        self.base_url = base_url
+        self.limiter = limiter or RateLimiter()
+        self.workers = workers
+        if date_range is None:
+            now = datetime.now(timezone.utc).replace(microsecond=0)
+            date_range = (now - timedelta(days=SEARCH_PERIOD_DAYS), now)
+        self.date_range = date_range
+        self.cap = cap
+        self.per_page = per_page
+        self.session = requests.Session()
+        self._areas = {}
+        self._lock = threading.Lock()
+        self.stats = {"found": 0, "slices": 0, "capped_slices": 0, "failed_slices": 0, "requests": 0, "items": 0}
+
+    def _page(self, params: dict, page: int) -> Optional[dict]:
+        with self._lock:
+            self.stats["requests"] += 1
+        return get_json(f"{self.base_url}/vacancies", {**params, "page": page, "per_page": self.per_page},
+                        limiter=self.limiter, session=self.session)
+
+    def _area_children(self, area_id) -> list[dict]:
+        with self._lock:
+            if area_id in self._areas:
+                return self._areas[area_id]
+        node = fetch_area(area_id, self.base_url, self.limiter, self.session)
+        children = (node or {}).get("areas") or []
+        with self._lock:
+            self._areas[area_id] = children
+
+
+        return children
+
+    def _split(self, params: dict, found: int) -> list[dict]:
+        """Child slices of an over-cap slice, [] if it cannot be split further."""
+        area = params.get("area")
+        if area is not None and "date_from" not in params:
+            children = self._area_children(area)
+            if children:
+                return [{**params, "area": c["id"]} for c in children]
+
+
+        return self._date_windows(params, found)
+
+    def _date_windows(self, params: dict, found: int) -> list[dict]:
+        """Published-date slices of params, [] if its window is already MIN_WINDOW."""
+        start = datetime.fromisoformat(params["date_from"]) if "date_from" in params else self.date_range[0]
+        end = datetime.fromisoformat(params["date_to"]) if "date_to" in params else self.date_range[1]
+        if end - start <= MIN_WINDOW:
+            return []
+
+        # Enough windows that an even spread would fit, so most slices settle in one round
+        n = max(2, math.ceil(found / self.cap) + 1)
+        step = max((end - start) / n, MIN_WINDOW / 2)
+        bounds = [start + step * i for i in range(n)] + [end]
+
+
+        return [{**params, "date_from": _iso(a), "date_to": _iso(b)} for a, b in zip(bounds, bounds[1:]) if a < b]
+
+    def run(self) -> list[dict]:
+        """All unique items of the search, in slice / page order."""
+        leaves = []  # (params, first page data)
+        frontier = [self.params]
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            root = True
+            area_splits = []  # (params, found, child slices) split by area in the previous round
+            while frontier:
+                probes = list(pool.map(lambda p: self._page(p, 0), frontier))
+                next_frontier = []
+
+                # Results of an area missing from its children were posted to the area itself
+                child_found = {id(params): (data or {}).get("found", 0) for params, data in zip(frontier, probes)}
+                for params, found, children in area_splits:
+                    direct = found - sum(child_found[id(c)] for c in children)
+                    if direct > 0:
+                        logger.info(f"{direct} results of area {params['area']} are outside its child areas, "
+                                    f"splitting it by date")
+                        next_frontier.extend(self._date_windows(params, found))
+                area_splits = []
+
+                for params, data in zip(frontier, probes):
+                    if data is None:
+                        self.stats["failed_slices"] += 1
+                        continue
+                    found = data.get("found", 0)
+                    if root:
+                        self.stats["found"] = found
+                    if found <= self.cap:
+                        leaves.append((params, data))
+                        continue
+                    children = self._split(params, found)
+                    if children:
+                        next_frontier.extend(children)
+                        if "date_from" not in children[0]:
+                            area_splits.append((params, found, children))
+                    else:
+                        logger.warning(f"Slice {params} still has {found} results, only {self.cap} reachable")
+                        self.stats["capped_slices"] += 1
+                        leaves.append((params, data))
+                if next_frontier:
+                    logger.info(f"Split into {len(next_frontier)} slices")
+                frontier = next_frontier
+                root = False
+
+            jobs = [(params, page) for params, data in leaves for page in range(1, data.get("pages", 0))]
+            pages = list(pool.map(lambda job: self._page(*job), jobs))
+
+        self.stats["slices"] = len(leaves)
+        self.stats["failed_slices"] += sum(p is None for p in pages)
+
+        by_slice = {id(params): [data] for params, data in leaves}
+        for (params, _), data in zip(jobs, pages):
+            if data is not None:
+                by_slice[id(params)].append(data)
+
+        seen = set()
+        items = []
+        for params, _ in leaves:
+            for data in by_slice[id(params)]:
+                for item in data.get("items", []):
+                    if item.get("id") not in seen:
+                        seen.add(item.get("id"))
+                        items.append(item)
+        self.stats["items"] = len(items)
+
+        logger.info(f"Found {self.stats['found']}: collected {len(items)} unique items from "
+                    f"{len(leaves)} slices in {self.stats['requests']} requests")
+
+
+        return items
+
+
+def fetch_all_vacancy_ids(
+    text: str = "",
+    area: Optional[int] = None,
+    experience: Optional[str] = None,
+    workers: int = 4,
+    limiter: Optional[RateLimiter] = None,
+    base_url: str = BASE_URL,
+    date_range: Optional[tuple[datetime, datetime]] = None,
+) -> list[dict]:
+    """fetch_vacancy_ids without the 2000-result cap: partitions the search until every slice fits."""
+    params = {k: v for k, v in DEFAULT_SEARCH_PARAMS.items() if k not in ("page", "per_page")}
+    if text:
+        params["text"] = text
+    if area is not None:
+        params["area"] = area
+    if experience:
+        params["experience"] = experience
+
+
+    return SearchPartitioner(params, base_url=base_url, limiter=limiter, workers=workers, date_range=date_range).run()
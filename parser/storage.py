@@ -1,15 +1,53 @@
+import glob
 import json
 import os
+import re
 import pandas as pd
-from typing import Optional
+from typing import Iterable, Iterator
 
 
-def save_json(vacancies: list[dict], filepath: str) -> None:
+# Flat vacancy fields as produced by parser.hh_parser.parse_vacancy (+ merge_data extras)
+VACANCY_FIELDS = [
+    "id", "name", "url", "employer_name", "employer_url", "area", "published_at",
+    "schedule", "employment", "salary_from", "salary_to", "salary_currency", "salary_gross",
+    "description", "key_skills", "experience", "duplicate_of",
+]
 
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+VACANCY_EXTENSIONS = (".jsonl", ".json", ".parquet")
+
+# Part files of a Parquet dataset directory (append_parquet)
+_PART = re.compile(r"part-(\d+)\.parquet")
+
+
+def vacancy_schema():
+    """Explicit Arrow schema so salaries stay integers and empty batches keep their types."""
+    import pyarrow as pa
+
+    types = {
+        "salary_from": pa.int64(),
+        "salary_to": pa.int64(),
+        "salary_gross": pa.bool_(),
+    }
+
+
+    return pa.schema([(name, types.get(name, pa.string())) for name in VACANCY_FIELDS])
+
+
+def save_json(vacancies: Iterable[dict], filepath: str) -> int:
+    """Same file as json.dump(list, indent=2), written item by item (accepts a stream)."""
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    n = 0
     with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(vacancies, f, ensure_ascii=False, indent=2)
-    print(f"Saved {len(vacancies)} vacancies to {filepath}")
+        f.write("[")
+        for v in vacancies:
+            item = json.dumps(v, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            f.write(("," if n else "") + "\n  " + item)
+            n += 1
+        f.write("\n]" if n else "]")
+    print(f"Saved {n} vacancies to {filepath}")
+
+
+    return n
 
 
 def save_csv(vacancies: list[dict], filepath: str) -> None:
@@ -20,12 +58,236 @@ def save_csv(vacancies: list[dict], filepath: str) -> None:
     print(f"Saved {len(vacancies)} vacancies to {filepath}")
 
 
+def save_jsonl(vacancies: Iterable[dict], filepath: str) -> int:
+    """Stream vacancies to JSON Lines (one compact object per line). Returns the count."""
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    n = 0
+    with open(filepath, "w", encoding="utf-8") as f:
+        for v in vacancies:
+            f.write(json.dumps(v, ensure_ascii=False))
+            f.write("\n")
+            n += 1
+
+
+    return n
+
+
+class VacancyParquetWriter:
+    """
+    Parquet writer with the vacancy schema: every write() call appends one row group.
+
+        with VacancyParquetWriter("data/v.parquet") as w:
+            for batch in batches:
+                w.write(batch)
+    """
+
+    def __init__(self, filepath: str, compression: str = "zstd", compression_level: int | None = None):
+        import pyarrow.parquet as pq
+
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        self.schema = vacancy_schema()
+        self.rows = 0
+        self._writer = pq.ParquetWriter(
+            filepath, self.schema, compression=compression, compression_level=compression_level,
+        )
+
+    def write(self, vacancies: list[dict]) -> None:
+        import pyarrow as pa
+
+        if vacancies:
+            self._writer.write_table(pa.Table.from_pylist(vacancies, schema=self.schema))
+            self.rows += len(vacancies)
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_parquet(
+    vacancies: Iterable[dict],
+    filepath: str,
+    batch_size: int = 10_000,
+    compression: str = "zstd",
+) -> int:
+    """Stream vacancies to Parquet, one row group per batch. Returns the count."""
+    batch = []
+    with VacancyParquetWriter(filepath, compression=compression) as writer:
+        for v in vacancies:
+            batch.append(v)
+            if len(batch) >= batch_size:
+                writer.write(batch)
+                batch = []
+        writer.write(batch)
+
+
+    return writer.rows
+
+
+def append_parquet(vacancies: Iterable[dict], dataset_dir: str, **kwargs) -> str:
+    """
+    Append vacancies to a Parquet dataset directory as a new part file.
+
+    Closed Parquet files cannot grow, so a dataset is a directory of parts; readers
+    (load_parquet, iter_vacancies) treat the directory as one table. The part is
+    numbered after the highest existing one and created exclusively, so an append
+    never overwrites a part (even with earlier parts removed or a concurrent writer).
+    """
+    os.makedirs(dataset_dir, exist_ok=True)
+    parts = [int(m[1]) for f in os.listdir(dataset_dir) if (m := _PART.fullmatch(f))]
+    n = max(parts, default=-1) + 1
+    while True:
+        path = os.path.join(dataset_dir, f"part-{n:05d}.parquet")
+        try:
+            open(path, "xb").close()  # reserve the name
+            break
+        except FileExistsError:
+            n += 1
+    try:
+        save_parquet(vacancies, path, **kwargs)
+    except BaseException:
+        os.remove(path)
+        raise
+
+
+    return path
+
+
+def save_vacancies(vacancies: Iterable[dict], filepath: str) -> int:
+    """Write vacancies in the format given by the file extension (.jsonl, .parquet, .json, .csv)."""
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext == ".jsonl":
+        return save_jsonl(vacancies, filepath)
+    if ext == ".parquet":
+        return save_parquet(vacancies, filepath)
+
+    vacancies = list(vacancies)
+    if ext == ".csv":
+        save_csv(vacancies, filepath)
+    else:
+        save_json(vacancies, filepath)
+
+
+    return len(vacancies)
+
+
 def load_json(filepath: str) -> list[dict]:
 
     with open(filepath, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+def iter_jsonl(filepath: str) -> Iterator[dict]:
+
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _parquet_dataset(path: str):
+    import pyarrow.dataset as ds
+
+    return ds.dataset(path, format="parquet", schema=vacancy_schema())
+
+
+def iter_parquet(
+    filepath: str,
+    columns: list[str] | None = None,
+    filters: list[tuple] | None = None,
+    batch_size: int = 10_000,
+) -> Iterator[dict]:
+    """
+    Stream rows of a Parquet file or dataset directory.
+
+    Only the requested columns are decoded, and filters — a list of
+    (column, op, value) tuples ANDed together, e.g. [("area", "=", "Алматы"),
+    ("salary_from", ">=", 500000)] — are pushed down: row groups whose
+    statistics rule them out are not read at all.
+    """
+    import pyarrow.parquet as pq
+
+    expression = pq.filters_to_expression(filters) if filters else None
+    for batch in _parquet_dataset(filepath).to_batches(columns=columns, filter=expression, batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def load_parquet(
+    filepath: str,
+    columns: list[str] | None = None,
+    filters: list[tuple] | None = None,
+) -> pd.DataFrame:
+    """Column-projected, predicate-pushdown read of a Parquet file or dataset into a DataFrame."""
+    import pyarrow.parquet as pq
+
+    expression = pq.filters_to_expression(filters) if filters else None
+    table = _parquet_dataset(filepath).to_table(columns=columns, filter=expression)
+
+
+    # Nullable integer dtypes keep salaries as ints instead of float + NaN
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+_OPS = {
+    "=": lambda a, b: a == b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "in": lambda a, b: a in b,
+    "not in": lambda a, b: a not in b,
+}
+
+
+def _matches(vacancy: dict, filters: list[tuple]) -> bool:
+    return all(_OPS[op](vacancy.get(col), value) for col, op, value in filters)
+
+
+def vacancy_files(path: str) -> list[str]:
+    """Vacancy files behind a path: a file, a directory or a glob pattern."""
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if os.path.splitext(name)[1].lower() in VACANCY_EXTENSIONS
+        )
+    if os.path.exists(path):
+        return [path]
+
+
+    return sorted(glob.glob(path))
+
+
+def iter_vacancies(
+    path: str,
+    columns: list[str] | None = None,
+    filters: list[tuple] | None = None,
+) -> Iterator[dict]:
+    """
+    Stream vacancies from .jsonl / .parquet / .json files.
+
+    JSON Lines and Parquet are read incrementally; legacy .json arrays are loaded whole.
+    columns / filters (see iter_parquet) are pushed down into Parquet reads and
+    applied in Python for the JSON formats.
+    """
+    for filepath in vacancy_files(path):
+        ext = os.path.splitext(filepath)[1].lower()
+        if ext == ".parquet":
+            yield from iter_parquet(filepath, columns=columns, filters=filters)
+            continue
+
+        rows = iter_jsonl(filepath) if ext == ".jsonl" else load_json(filepath)
+        for v in rows:
+            if filters and not _matches(v, filters):
+                continue
+            yield {c: v.get(c) for c in columns} if columns else v
+
+
 def load_csv(filepath: str) -> pd.DataFrame:
 
 
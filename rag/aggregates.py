@@ -0,0 +1,265 @@
+"""
+Aggregate questions answered exactly from the structured vacancy table, without retrieval.
+
+"средняя зарплата Python в Алматы" or "какие компании нанимают DevOps" are not
+about a handful of similar chunks: search + LLM sees at most 8 vacancies and
+guesses. answer_aggregate() recognises such questions and counts over every
+matching vacancy instead:
+
+    table = vacancy_table(chunks, columns)      # once per index version
+    answer_aggregate("средняя зарплата Python в Алматы", table)
+    -> {"intent": "salary", "topic": "Python", "filters": {"city": "Алматы"}, "n": 124,
+        "salary": {"median": ..., ...}, "employers": [...], "skills": [...], "answer": "...", "table": "..."}
+
+Intents are keyword rules; city / salary / experience come from
+rag.query_parser, the words left (minus the intent vocabulary) are the topic,
+matched by word stem against vacancy titles and key skills. "answer" is
+Markdown for the user, "table" a compact text block for the LLM prompt.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from config import BASE_CURRENCY
+from rag.freshness import freshness_mask, published_column
+from rag.query_parser import parse_query
+from rag.salary import salary_columns
+from rag.skills import skill_key, split_skills
+
+# Intent -> (what is asked about, how it is asked); both must occur. First match wins.
+INTENTS = (
+    ("salary", r"зарплат\w*|зп|з/п|оклад\w*|доход\w*|плат(?:ят|ит)|зарабатыва\w*|получа\w*|salary",
+     r"средн\w*|медиан\w*|сколько|как(?:ая|ие|ой)|уровень|вилк\w*|диапазон\w*|разброс\w*|типичн\w*|average|median"),
+    ("employers", r"компани\w*|работодател\w*|фирм\w*|нанима\w*|ищ(?:ут|ет)|набира\w*|hiring",
+     r"как(?:ие|их|ая)|кто|топ\w*|больше\s+всего|список|сколько|где|which|top"),
+    ("skills", r"навык\w*|скилл?\w*|технологи\w*|стек\w*|требовани\w*|требуют|skills?",
+     r"как(?:ие|их|ая)|топ\w*|част\w*|популярн\w*|востребованн\w*|нужн\w*|чаще|для|which|top"),
+    ("cities", r"город\w*|регион\w*",
+     r"как(?:ие|их|ом)|в\s+каких|топ\w*|больше\s+всего|где|which|top"),
+    ("count", r"вакансий|вакансии|предложени\w*|позици\w*",
+     r"сколько|количеств\w*|число|how\s+many"),
+)
+_INTENTS = [(name, re.compile(rf"(?<!\w)(?:{subject})(?!\w)", re.I), re.compile(rf"(?<!\w)(?:{cue})(?!\w)", re.I))
+            for name, subject, cue in INTENTS]
+
+# Words that carry no topic besides the intent vocabulary
+_STOPWORDS = {
+    "в", "во", "на", "по", "для", "у", "с", "со", "и", "или", "из", "от", "до", "за", "о", "об", "а", "the", "of",
+    "in", "for", "среди", "всего", "больше", "меньше", "сейчас", "самые", "самый", "самая", "чаще", "всех",
+    "нужно", "надо", "есть", "ли", "это", "какой", "какую", "нанимают", "ищут", "вакансии", "вакансий",
+    "вакансиях", "вакансиям", "требуется", "требуются", "специалистов", "специалистам", "людей", "сотрудников",
+}
+_TOKEN = re.compile(r"[\w#+.]+")
+
+TOP_N = 10
+
+
+def vacancy_table(chunks: list[dict], columns: dict[str, np.ndarray] | None = None) -> pd.DataFrame:
+    """
+    One row per vacancy: name, employer, area, experience, salary_min / salary_max / salary_mid
+    (net BASE_CURRENCY, NaN = not given), published_ts, skills (skill_key list) and haystack
+    (lowercased title + skills, what topics are matched against).
+
+    columns with a "deleted" bitmap (rag.tombstones) drop the closed vacancies.
+    """
+    first = {}
+    for i, c in enumerate(chunks):
+        first.setdefault(c.get("vacancy_id"), i)
+    rows = list(first.values())
+    if columns is not None and "deleted" in columns:
+        rows = [i for i in rows if not columns["deleted"][i]]
+    vacancies = [chunks[i] for i in rows]
+
+    spellings = {}
+    skills = []
+    for v in vacancies:
+        names = split_skills(v.get("key_skills"))
+        for name in names:
+            spellings.setdefault(skill_key(name), {}).setdefault(name, 0)
+            spellings[skill_key(name)][name] += 1
+        skills.append(list(dict.fromkeys(skill_key(name) for name in names)))
+
+    table = pd.DataFrame({
+        "vacancy_id": [v.get("vacancy_id") for v in vacancies],
+        "name": [v.get("vacancy_name") or "" for v in vacancies],
+        "employer": [v.get("employer") or "" for v in vacancies],
+        "area": [v.get("area") or "" for v in vacancies],
+        "experience": [v.get("experience") or "" for v in vacancies],
+        **salary_columns(vacancies),
+        "published_ts": published_column(vacancies),
+        "skills": skills,
+    })
+    table["haystack"] = (table["name"] + " | " + table["skills"].map(" | ".join)).str.lower()
+    # Display spelling of every skill key: its most common form
+    table.attrs["skill_names"] = {key: max(forms, key=forms.get) for key, forms in spellings.items()}
+
+
+    return table
+
+
+def detect_intent(question: str) -> str | None:
+    """First INTENTS entry whose subject and cue both occur in question."""
+    for name, subject, cue in _INTENTS:
+        if subject.search(question) and cue.search(question):
+            return name
+
+
+    return None
+
+
+def _topic_tokens(text: str) -> list[str]:
+    """Words of text besides the intent vocabulary and stopwords, lowercased."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower().replace("-", " ")):
+        token = token.strip(".")
+        if not token or token in _STOPWORDS:
+            continue
+        if any(subject.fullmatch(token) or cue.fullmatch(token) for _, subject, cue in _INTENTS):
+            continue
+        tokens.append(token)
+
+
+    return tokens
+
+
+def _stem(token: str) -> str:
+    """token without its (Russian) ending: "разработчика" -> "разработчи"."""
+    return token if len(token) <= 4 or not token.isalpha() else token[:max(4, len(token) - 2)]
+
+
+def _contains_word(haystack: pd.Series, token: str) -> np.ndarray:
+    """Boolean mask of the haystack rows with a word starting with token's stem."""
+    stem = _stem(token)
+    # Plain substring search first, the word-start regex (slow, per row) only on the hits
+    mask = haystack.str.contains(stem, regex=False).to_numpy(dtype=bool, copy=True)
+    if mask.any():
+        pattern = rf"(?<![\w#+]){re.escape(stem)}"
+        mask[mask] = haystack[mask].str.contains(pattern, regex=True).to_numpy()
+
+
+    return mask
+
+
+def match_vacancies(table: pd.DataFrame, topic: list[str], filters: dict) -> np.ndarray:
+    """Boolean mask of the vacancies with every topic word in title / skills and passing filters."""
+    mask = np.ones(len(table), dtype=bool)
+    for token in topic:
+        mask &= _contains_word(table["haystack"], token)
+    if filters.get("city"):
+        mask &= (table["area"].str.lower() == filters["city"].lower().strip()).to_numpy()
+    if filters.get("salary_min"):
+        mask &= (table["salary_max"] >= filters["salary_min"]).to_numpy()
+    if filters.get("salary_max"):
+        mask &= (table["salary_min"] <= filters["salary_max"]).to_numpy()
+    if filters.get("experience"):
+        levels = filters["experience"]
+        mask &= table["experience"].isin([levels] if isinstance(levels, str) else levels).to_numpy()
+    if filters.get("skills"):
+        wanted = {skill_key(name) for name in filters["skills"]}
+        mask &= table["skills"].map(wanted.issubset).to_numpy()
+    mask &= freshness_mask(table["published_ts"].to_numpy(), filters)
+
+
+    return mask
+
+
+def aggregate(table: pd.DataFrame, mask: np.ndarray, top_n: int = TOP_N) -> dict:
+    """Exact counts, salary statistics and top employers / skills / cities over table[mask]."""
+    matched = table[mask]
+    mid = matched["salary_mid"].to_numpy()
+    mid = mid[~np.isnan(mid)]
+    salary = None
+    if len(mid):
+        p25, median, p75 = np.percentile(mid, [25, 50, 75])
+        salary = {"n": int(len(mid)), "median": float(median), "mean": float(mid.mean()), "p25": float(p25),
+                  "p75": float(p75), "min": float(np.nanmin(matched["salary_min"])),
+                  "max": float(np.nanmax(matched["salary_max"])), "currency": BASE_CURRENCY}
+
+    skill_counts = matched["skills"].explode().dropna().value_counts(sort=False)
+    skill_counts = skill_counts.sort_values(ascending=False, kind="stable").head(top_n)
+    names = table.attrs.get("skill_names", {})
+
+    def top(column: str) -> list[tuple[str, int]]:
+        counts = matched.loc[matched[column] != "", column].value_counts(sort=False)
+        return [(k, int(n)) for k, n in counts.sort_values(ascending=False, kind="stable").head(top_n).items()]
+
+
+    return {
+        "n": int(mask.sum()),
+        "salary": salary,
+        "employers": top("employer"),
+        "skills": [(names.get(k, k), int(n)) for k, n in skill_counts.items()],
+        "cities": top("area"),
+    }
+
+
+def _money(value: float) -> str:
+    return f"{value:,.0f}".replace(",", " ")
+
+
+def _describe(topic: str, filters: dict) -> str:
+    parts = [topic] if topic else ["все вакансии"]
+    if filters.get("city"):
+        parts.append(filters["city"])
+    if filters.get("salary_min"):
+        parts.append(f"от {_money(filters['salary_min'])} {BASE_CURRENCY}")
+    if filters.get("salary_max"):
+        parts.append(f"до {_money(filters['salary_max'])} {BASE_CURRENCY}")
+    if filters.get("experience"):
+        exp = filters["experience"]
+        parts.append(f"опыт: {exp if isinstance(exp, str) else ' / '.join(exp)}")
+
+
+    return ", ".join(parts)
+
+
+def format_aggregate(result: dict) -> tuple[str, str]:
+    """(Markdown answer with the asked-for section first, compact text table for the LLM)."""
+    sections = {}
+    salary = result["salary"]
+    if salary:
+        sections["salary"] = (f"Зарплата на руки, {salary['currency']} (указана в {salary['n']} из {result['n']}): "
+                              f"медиана {_money(salary['median'])}, средняя {_money(salary['mean'])}, "
+                              f"половина — от {_money(salary['p25'])} до {_money(salary['p75'])}")
+    for key, label in (("employers", "Компании"), ("skills", "Навыки"), ("cities", "Города")):
+        if result[key]:
+            sections[key] = f"{label}: " + ", ".join(f"{name} ({n})" for name, n in result[key])
+    order = [result["intent"]] + [k for k in ("salary", "employers", "skills", "cities") if k != result["intent"]]
+
+    title = f"**{_describe(result['topic'], result['filters'])} — {result['n']} вакансий в базе**"
+    if not result["n"]:
+        return title, f"Точная статистика по базе ({_describe(result['topic'], result['filters'])}): вакансий 0"
+    lines = [title, ""] + [f"- {sections[k]}" for k in order if k in sections]
+    table = [f"Точная статистика по всем подходящим вакансиям базы ({_describe(result['topic'], result['filters'])}):",
+             f"вакансий: {result['n']}"] + [sections[k] for k in order if k in sections]
+
+
+    return "\n".join(lines), "\n".join(table)
+
+
+def answer_aggregate(question: str, table: pd.DataFrame, filters: dict | None = None,
+                     top_n: int = TOP_N) -> dict | None:
+    """
+    Exact answer to an aggregate question over the vacancy table, None if question is not one.
+
+    filters: explicit filters (sidebar), they win over the ones stated in the question.
+    Returns dict with 'intent', 'topic', 'filters', 'n', 'salary', 'employers', 'skills',
+    'cities', 'answer' (Markdown) and 'table' (text for the LLM prompt).
+    """
+    intent = detect_intent(question)
+    if intent is None:
+        return None
+    text, stated = parse_query(question, table["area"].unique())
+    filters = {**stated, **(filters or {})}
+    tokens = _topic_tokens(text)
+    # The topic keeps the user's spelling
+    topic = " ".join(t for t in _TOKEN.findall(question.replace("-", " ")) if t.lower().strip(".") in tokens)
+
+    result = {"intent": intent, "topic": topic, "filters": filters,
+              **aggregate(table, match_vacancies(table, tokens, filters), top_n=top_n)}
+    result["answer"], result["table"] = format_aggregate(result)
+
+
+    return result
@@ -0,0 +1,144 @@
+import json
+import os
+from collections import Counter
+from typing import Iterable
+
+import numpy as np
+
+from config import BASE_CURRENCY
+from rag.indexer import INDEX_DIR
+from rag.salary import salary_columns
+from rag.skills import skill_key, split_skills
+from rag.versioning import resolve_index_dir
+
+ANALYTICS_FILE = "analytics.json"
+
+
+class FieldCounter:
+    """Counts values of a single vacancy field (city, company, ...)."""
+
+    def __init__(self, field: str, top_n: int | None = None, default: str = "Не указан"):
+        self.field = field
+        self.top_n = top_n
+        self.default = default
+        self.counts = Counter()
+
+    def add(self, vacancy: dict) -> None:
+        self.counts[vacancy.get(self.field) or self.default] += 1
+
+    def result(self) -> dict:
+        return {"n_distinct": len(self.counts), "top": [[k, c] for k, c in self.counts.most_common(self.top_n)]}
+
+
+class SkillCounter:
+    """
+    Counts key_skills across vacancies under their matching key (rag.skills.skill_key),
+    so "Python" / "python" / "PYTHON" are one skill, shown in its most common spelling.
+    """
+
+    def __init__(self, top_n: int | None = 100):
+        self.top_n = top_n
+        self.counts = Counter()
+        self.spellings = {}
+
+    def add(self, vacancy: dict) -> None:
+        names = {}
+        for name in split_skills(vacancy.get("key_skills")):
+            names.setdefault(skill_key(name), name)
+        for key, name in names.items():
+            self.counts[key] += 1
+            self.spellings.setdefault(key, Counter())[name] += 1
+
+    def result(self) -> dict:
+        return {"n_distinct": len(self.counts),
+                "top": [[self.spellings[k].most_common(1)[0][0], c] for k, c in self.counts.most_common(self.top_n)]}
+
+
+class SalaryStats:
+    """Min / median / max and a histogram of the net salary midpoint in BASE_CURRENCY."""
+
+    FIELDS = ("salary_from", "salary_to", "salary_currency", "salary_gross")
+
+    def __init__(self, bins: int = 30):
+        self.bins = bins
+        self.rows = []
+
+    def add(self, vacancy: dict) -> None:
+        if vacancy.get("salary_from") or vacancy.get("salary_to"):
+            self.rows.append({k: vacancy.get(k) for k in self.FIELDS})
+
+    def result(self) -> dict:
+        mid = salary_columns(self.rows)["salary_mid"]
+        mid = mid[~np.isnan(mid)]  # unknown currencies
+
+        out = {"currency": BASE_CURRENCY, "n_with_salary": len(self.rows), "n": int(mid.size)}
+        if mid.size:
+            counts, edges = np.histogram(mid, bins=self.bins)
+            out.update({
+                "min": float(mid.min()),
+                "median": float(np.median(mid)),
+                "max": float(mid.max()),
+                "histogram": {"edges": edges.tolist(), "counts": counts.tolist()},
+            })
+
+
+        return out
+
+
+# Slice name -> factory of an accumulator with add(vacancy) / result().
+# All slices are filled in one pass over the vacancies, so a new slice is one more entry here.
+ANALYTICS_SLICES = {
+    "cities": lambda: FieldCounter("area"),
+    "companies": lambda: FieldCounter("employer_name", top_n=50),
+    "salaries": SalaryStats,
+    "skills": SkillCounter,
+}
+
+
+class AnalyticsCollector:
+    """Feeds every vacancy to all slices; lets a caller aggregate while streaming vacancies elsewhere."""
+
+    def __init__(self, slices: dict | None = None):
+        self.accumulators = {name: factory() for name, factory in (slices or ANALYTICS_SLICES).items()}
+        self.n = 0
+
+    def add(self, vacancy: dict) -> None:
+        self.n += 1
+        for acc in self.accumulators.values():
+            acc.add(vacancy)
+
+    def result(self) -> dict:
+        result = {"n_vacancies": self.n}
+        for name, acc in self.accumulators.items():
+            result[name] = acc.result()
+
+
+        return result
+
+
+def compute_analytics(vacancies: Iterable[dict], slices: dict | None = None) -> dict:
+    """Aggregate structured vacancy fields in a single pass (works on streams too)."""
+    collector = AnalyticsCollector(slices)
+    for v in vacancies:
+        collector.add(v)
+
+
+    return collector.result()
+
+
+def save_analytics(analytics: dict, index_dir: str = INDEX_DIR) -> str:
+    os.makedirs(index_dir, exist_ok=True)
+    path = os.path.join(index_dir, ANALYTICS_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(analytics, f, ensure_ascii=False)
+
+
+    return path
+
+
+def load_analytics(index_dir: str = INDEX_DIR) -> dict | None:
+    path = os.path.join(resolve_index_dir(index_dir), ANALYTICS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
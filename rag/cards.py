@@ -0,0 +1,96 @@
+"""
+Display-ready vacancy cards, computed once at build time.
+
+The search tab showed chunk fragments and formatted every salary on each
+Streamlit rerun. build_index.py now stores one card per vacancy in cards.pkl
+next to the index:
+
+    {"vacancy_id", "name", "employer", "area", "salary", "url", "subtitle", "text"}
+
+salary is the formatted string ("от 300,000 до 500,000 KZT"), subtitle the
+Markdown line under the title and text the whole vacancy document
+(rag.chunker.vacancy_to_document), not one of its chunks. Indexes built before
+cards existed fall back to chunk_card(), which is what the app showed before.
+"""
+
+import os
+import pickle
+
+from rag.chunker import vacancy_to_document
+from rag.versioning import resolve_index_dir
+
+CARDS_FILE = "cards.pkl"
+
+
+def format_salary(salary_from, salary_to, currency) -> str:
+    """"от 300,000 до 500,000 KZT", "" if no bounds are given."""
+    parts = []
+    if salary_from:
+        parts.append(f"от {salary_from:,}")
+    if salary_to:
+        parts.append(f"до {salary_to:,}")
+    s = " ".join(parts)
+    if s and currency:
+        s += f" {currency}"
+
+
+    return s
+
+
+def _card(vacancy_id, name, employer, area, salary, url, text) -> dict:
+    subtitle = f"🏢 **{employer}** &nbsp;|&nbsp; 📍 {area}" + (f" &nbsp;|&nbsp; 💰 {salary}" if salary else "")
+    return {"vacancy_id": vacancy_id, "name": name, "employer": employer, "area": area, "salary": salary,
+            "url": url or "", "subtitle": subtitle, "text": text}
+
+
+def vacancy_card(vacancy: dict) -> dict:
+    """Card of a parsed vacancy (parser fields, as passed to chunk_documents)."""
+    return _card(vacancy.get("id"), vacancy.get("name", ""), vacancy.get("employer_name", ""), vacancy.get("area", ""),
+                 format_salary(vacancy.get("salary_from"), vacancy.get("salary_to"), vacancy.get("salary_currency")),
+                 vacancy.get("url"), vacancy_to_document(vacancy))
+
+
+def chunk_card(chunk: dict) -> dict:
+    """Card from a chunk's metadata and text (indexes without cards.pkl)."""
+    return _card(chunk.get("vacancy_id"), chunk.get("vacancy_name", ""), chunk.get("employer", ""),
+                 chunk.get("area", ""),
+                 format_salary(chunk.get("salary_from"), chunk.get("salary_to"), chunk.get("salary_currency")),
+                 chunk.get("url"), chunk.get("text", ""))
+
+
+def save_cards(cards: dict[str, dict], index_dir: str) -> str:
+    os.makedirs(index_dir, exist_ok=True)
+    path = os.path.join(index_dir, CARDS_FILE)
+    with open(path, "wb") as f:
+        pickle.dump(cards, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+    return path
+
+
+def load_cards(index_dir: str) -> dict[str, dict] | None:
+    """vacancy_id -> card of index_dir (live version of a versioned root), None if it has no cards."""
+    path = os.path.join(resolve_index_dir(index_dir), CARDS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def result_cards(results: list[dict], cards: dict[str, dict] | None) -> list[dict]:
+    """
+    One card per vacancy of ranked search results, in rank order.
+
+    Each card is a copy with the best chunk's "score" added.
+    """
+    out, seen = [], set()
+    for r in results:
+        vid = r.get("vacancy_id")
+        if vid in seen:
+            continue
+        seen.add(vid)
+        card = (cards or {}).get(vid) or chunk_card(r)
+        out.append({**card, "score": r.get("score", 0.0)})
+
+
+    return out
@@ -72,7 +72,10 @@ def chunk_documents(
             "salary_from": v.get("salary_from"),
             "salary_to": v.get("salary_to"),
             "salary_currency" : v.get("salary_currency"),
+            "salary_gross": v.get("salary_gross"),
             "experience": v.get("experience", ""),
+            "key_skills": v.get("key_skills", ""),
+            "published_at": v.get("published_at"),
         }
 
         if len(full_text) <= max_chunk_length:
@@ -0,0 +1,87 @@
+"""
+Maximal marginal relevance (MMR): a diverse top-k out of the retrieved candidates.
+
+Plain top-k is often several near-identical postings of one employer (or
+several chunks of one vacancy), which wastes the result list and the LLM
+context. MMR picks greedily
+
+    argmax  λ·score(c) − (1 − λ)·max cos(c, s) over the already selected s
+
+with the candidates' stored vectors (FAISS reconstruct, nothing is re-encoded).
+Every step is one (n, d) @ (d,) product updating the running max similarity,
+so top-10 out of 200 candidates costs well under a millisecond. λ = 1 is the
+plain ranking; max_per_group additionally caps the results of one employer.
+"""
+
+import numpy as np
+
+DEFAULT_LAMBDA = 0.7
+DEFAULT_CANDIDATES = 200
+
+
+def mmr(scores: np.ndarray, vectors: np.ndarray, k: int, lambda_: float = DEFAULT_LAMBDA,
+        groups: list | np.ndarray | None = None, max_per_group: int | None = None) -> np.ndarray:
+    """
+    Positions of the k candidates MMR selects, in selection order.
+
+    scores: relevance of each candidate (search scores, higher is better)
+    vectors: their embeddings, (n, d); normalised here, so multi-field rows work too
+    groups: group key per candidate (employer); with max_per_group at most that
+        many candidates of one group are selected, even if fewer than k come out
+    """
+    if not 0 <= lambda_ <= 1:
+        raise ValueError(f"lambda_ must be in [0, 1], got {lambda_}")
+    n = len(scores)
+    k = min(k, n)
+    selected = []
+    if k <= 0:
+        return np.array(selected, dtype=np.int64)
+
+    vectors = np.asarray(vectors, dtype="float32")
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms > 0, norms, 1)
+    relevance = lambda_ * np.asarray(scores, dtype="float32")
+    max_sim = np.full(n, -np.inf, dtype="float32")
+    available = np.ones(n, dtype=bool)
+
+    codes = counts = None
+    if groups is not None and max_per_group:
+        _, codes = np.unique(np.asarray(groups, dtype=object).astype(str), return_inverse=True)
+        counts = np.zeros(codes.max() + 1, dtype=np.int64)
+
+    while len(selected) < k:
+        # Nothing selected yet: pure relevance
+        mmr_scores = relevance - (1 - lambda_) * max_sim if selected else relevance.copy()
+        mmr_scores[~available] = -np.inf
+        i = int(np.argmax(mmr_scores))
+        if not available[i]:
+            break
+        selected.append(i)
+        available[i] = False
+        if codes is not None:
+            counts[codes[i]] += 1
+            if counts[codes[i]] >= max_per_group:
+                available[codes == codes[i]] = False
+        max_sim = np.maximum(max_sim, vectors @ vectors[i])
+
+
+    return np.array(selected, dtype=np.int64)
+
+
+def diversify(results: list[dict], vectors: np.ndarray, top_k: int, lambda_: float = DEFAULT_LAMBDA,
+              max_per_employer: int | None = None) -> list[dict]:
+    """
+    MMR over search results (ranked chunk dicts) with their vectors, row i = results[i].
+
+    Chunks without an employer are never capped together.
+    """
+    if not results:
+        return results
+    groups = None
+    if max_per_employer:
+        groups = [r.get("employer") or f"vacancy:{r.get('vacancy_id')}" for r in results]
+    keep = mmr(np.array([r["score"] for r in results]), vectors, top_k, lambda_=lambda_, groups=groups,
+               max_per_group=max_per_employer)
+
+
+    return [results[i] for i in keep]
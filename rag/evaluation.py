@@ -0,0 +1,189 @@
+"""
+Retrieval quality guardrail: recall@k, MRR and nDCG of a labelled query set, next to latency.
+
+A query set is JSON Lines (or a JSON list) of
+    {"query": "python разработчик алматы", "relevant": ["12345", "67890"], "filters": {...}}
+where relevant are vacancy ids. Results are ranked by vacancy (the first chunk
+of a vacancy counts), so chunking changes do not skew the metrics.
+"""
+
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from typing import Iterable
+
+import numpy as np
+
+from rag.indexer import load_columns, load_index, search_batch
+from rag.skills import skill_key, split_skills
+from rag.versioning import resolve_index_dir
+
+DEFAULT_KS = (1, 5, 10)
+
+
+def load_query_set(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            queries = [json.loads(line) for line in f if line.strip()]
+        else:
+            queries = json.load(f)
+
+
+    return [q for q in queries if q.get("relevant")]
+
+
+def save_query_set(queries: list[dict], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for q in queries:
+            f.write(json.dumps(q, ensure_ascii=False))
+            f.write("\n")
+
+
+def silver_query_set(vacancies: Iterable[dict], n: int = 200, seed: int = 0) -> list[dict]:
+    """
+    Labels without annotators: query = vacancy title + one of its skills,
+    relevant = every vacancy with the same title and that skill.
+
+    Good enough to compare two indexes of the same data (regressions show up as
+    drops), not as an absolute quality number.
+    """
+    groups = defaultdict(list)
+    for v in vacancies:
+        title = " ".join((v.get("name") or "").lower().split())
+        for skill in {skill_key(s) for s in split_skills(v.get("key_skills"))}:
+            groups[(title, skill)].append(str(v.get("id")))
+
+    keys = sorted(k for k, ids in groups.items() if k[0] and len(ids) <= 50)
+    rnd = random.Random(seed)
+
+
+    return [{"query": f"{title} {skill}", "relevant": groups[(title, skill)]}
+            for title, skill in rnd.sample(keys, min(n, len(keys)))]
+
+
+def ranked_vacancies(results: list[dict]) -> list[str]:
+    """Vacancy ids in rank order, each once."""
+    seen = []
+    for r in results:
+        vid = str(r.get("vacancy_id"))
+        if vid not in seen:
+            seen.append(vid)
+
+
+    return seen
+
+
+def query_metrics(ranked: list[str], relevant: set[str], ks: Iterable[int] = DEFAULT_KS) -> dict:
+    """recall@k, binary nDCG@k and reciprocal rank of one query."""
+    hits = [vid in relevant for vid in ranked]
+    first = next((i for i, h in enumerate(hits) if h), None)
+    out = {"rr": 1.0 / (first + 1) if first is not None else 0.0}
+    for k in ks:
+        dcg = sum(1.0 / math.log2(i + 2) for i, h in enumerate(hits[:k]) if h)
+        idcg = sum(1.0 / math.log2(i + 2) for i in range(min(len(relevant), k)))
+        out[f"recall@{k}"] = sum(hits[:k]) / len(relevant)
+        out[f"ndcg@{k}"] = dcg / idcg if idcg else 0.0
+
+
+    return out
+
+
+def evaluate(
+    query_set: list[dict],
+    index,
+    model,
+    chunks: list[dict],
+    columns: dict | None = None,
+    ks: Iterable[int] = DEFAULT_KS,
+    batch_size: int = 32,
+) -> dict:
+    """
+    Run every query through search_batch and aggregate the metrics.
+
+    Latency per query is its batch's wall time divided by the batch size
+    (batch_size=1 gives true single-query latency).
+
+    Returns {"summary": {metric: mean, "latency_ms": {...}, "qps"}, "queries": [per-query rows]}.
+    """
+    ks = tuple(ks)
+    top_k = max(ks) * 3  # headroom: several chunks of one vacancy collapse into one rank
+    rows, latencies = [], []
+
+    for start in range(0, len(query_set), batch_size):
+        batch = query_set[start:start + batch_size]
+        t0 = time.perf_counter()
+        results = search_batch([q["query"] for q in batch], index, model, chunks, top_k=top_k,
+                               filters=[q.get("filters") for q in batch], columns=columns, batch_size=batch_size)
+        per_query_ms = (time.perf_counter() - t0) * 1000 / len(batch)
+
+        for q, res in zip(batch, results):
+            ranked = ranked_vacancies(res)[:max(ks)]
+            rows.append({"query": q["query"], "ranked": ranked,
+                         **query_metrics(ranked, {str(v) for v in q["relevant"]}, ks)})
+            latencies.append(per_query_ms)
+
+    metrics = [k for k in rows[0] if k not in ("query", "ranked")] if rows else []
+    summary = {("mrr" if m == "rr" else m): float(np.mean([r[m] for r in rows])) for m in metrics}
+    if latencies:
+        lat = np.asarray(latencies)
+        summary["latency_ms"] = {"p50": float(np.percentile(lat, 50)), "p95": float(np.percentile(lat, 95)),
+                                 "p99": float(np.percentile(lat, 99)), "mean": float(lat.mean())}
+        summary["qps"] = float(1000 / lat.mean()) if lat.mean() else None
+    summary["n_queries"] = len(rows)
+
+
+    return {"summary": summary, "queries": rows}
+
+
+def evaluate_index_dir(query_set: list[dict], index_dir: str, model=None, **kwargs) -> dict:
+    index_dir = resolve_index_dir(index_dir)  # one version for index and columns
+    index, model, chunks = load_index(index_dir, model=model)
+
+
+    return evaluate(query_set, index, model, chunks, columns=load_columns(index_dir), **kwargs)
+
+
+def diff_reports(baseline: dict, candidate: dict, metric: str | None = None, tolerance: float = 0.0) -> dict:
+    """
+    Metric deltas (candidate - baseline) and the queries that got worse on `metric`.
+
+    Both reports must come from the same query set, in the same order. metric defaults
+    to recall at the largest cutoff the reports have.
+    """
+    base, cand = baseline["summary"], candidate["summary"]
+    if metric is None:
+        recalls = [m for m in base if m.startswith("recall@")]
+        metric = max(recalls, key=lambda m: int(m.split("@")[1])) if recalls else "mrr"
+    if metric not in base or metric not in cand:
+        raise ValueError(f"Metric {metric!r} is not in both reports (have: {', '.join(sorted(base))})")
+    deltas = {m: cand[m] - base[m] for m in base if isinstance(base[m], float) and m in cand}
+    if "latency_ms" in base and "latency_ms" in cand:
+        deltas.update({f"latency_{p}_ms": cand["latency_ms"][p] - base["latency_ms"][p] for p in ("p50", "p95")})
+
+    row = "rr" if metric == "mrr" else metric  # per-query rows keep the reciprocal rank as "rr"
+    worse = [
+        {"query": b["query"], "baseline": b[row], "candidate": c[row]}
+        for b, c in zip(baseline["queries"], candidate["queries"])
+        if c[row] < b[row] - tolerance
+    ]
+
+
+    return {"deltas": deltas, "regressed_queries": worse, "metric": metric}
+
+
+def compare_index_dirs(query_set: list[dict], baseline_dir: str, candidate_dir: str, model=None,
+                       metric: str | None = None, **kwargs) -> dict:
+    """
+    Evaluate two index directories on one query set and diff them.
+
+    metric: what regressed queries are judged by, default recall@<largest of ks>.
+    """
+    metric = metric or f"recall@{max(kwargs.get('ks', DEFAULT_KS))}"
+    baseline = evaluate_index_dir(query_set, baseline_dir, model=model, **kwargs)
+    candidate = evaluate_index_dir(query_set, candidate_dir, model=model, **kwargs)
+
+
+    return {"baseline": baseline["summary"], "candidate": candidate["summary"],
+            **diff_reports(baseline, candidate, metric=metric)}
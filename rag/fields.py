@@ -0,0 +1,76 @@
+"""
+Multi-field vectors: title, key skills and description chunks embedded separately.
+
+A single text per chunk dilutes the title and skills in long descriptions. With
+build_index(..., multi_field=True) every chunk row stores
+
+    [ chunk vector | title vector of its vacancy | skills vector of its vacancy ]
+
+(FIELDS order, each part unit length, skills all-zero when a vacancy has none),
+so the index is FIELDS times as wide. A query vector q is expanded into
+[w_text·q | w_title·q | w_skills·q]: one inner-product search then scores every
+chunk with w_text·cos(q, chunk) + w_title·cos(q, title) + w_skills·cos(q, skills),
+and the weights stay a per-query knob without touching the index.
+"""
+
+import numpy as np
+
+FIELDS = ("text", "title", "skills")
+DEFAULT_FIELD_WEIGHTS = {"text": 0.6, "title": 0.25, "skills": 0.15}
+
+
+def vacancy_field_texts(chunks: list[dict]) -> tuple[np.ndarray, list[str], list[str]]:
+    """(vacancy_row per chunk, title per vacancy, skills text per vacancy)."""
+    rows, titles, skills = {}, [], []
+    for c in chunks:
+        if c.get("vacancy_id") not in rows:
+            rows[c.get("vacancy_id")] = len(rows)
+            titles.append(c.get("vacancy_name") or "")
+            skills.append(c.get("key_skills") or "")
+    vacancy_row = np.array([rows[c.get("vacancy_id")] for c in chunks], dtype=np.int32)
+
+
+    return vacancy_row, titles, skills
+
+
+def encode_fields(model, chunks: list[dict], text_embeddings: np.ndarray, prefix: str = "",
+                  batch_size: int = 64) -> np.ndarray:
+    """
+    FIELDS-wide row per chunk from its text embedding plus its vacancy's title / skills embeddings.
+
+    Titles and skills are encoded once per vacancy, not per chunk.
+    """
+    vacancy_row, titles, skills = vacancy_field_texts(chunks)
+    dim = text_embeddings.shape[1]
+    title_vecs = np.asarray(model.encode([prefix + t for t in titles], batch_size=batch_size,
+                                         normalize_embeddings=True), dtype="float32")
+    skill_vecs = np.zeros((len(skills), dim), dtype="float32")
+    has_skills = [i for i, s in enumerate(skills) if s.strip()]
+    if has_skills:
+        skill_vecs[has_skills] = model.encode([prefix + skills[i] for i in has_skills], batch_size=batch_size,
+                                              normalize_embeddings=True)
+
+
+    return np.hstack([text_embeddings, title_vecs[vacancy_row], skill_vecs[vacancy_row]]).astype("float32")
+
+
+def field_weights(weights: dict | None = None) -> np.ndarray:
+    """FIELDS-ordered weights (DEFAULT_FIELD_WEIGHTS overridden by weights), scaled to sum to 1."""
+    merged = {**DEFAULT_FIELD_WEIGHTS, **(weights or {})}
+    unknown = set(merged) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields {sorted(unknown)}. Available: {', '.join(FIELDS)}")
+    w = np.array([merged[f] for f in FIELDS], dtype="float32")
+    if w.sum() <= 0:
+        raise ValueError("Field weights must not all be zero")
+
+
+    return w / w.sum()
+
+
+def expand_queries(query_vecs: np.ndarray, weights: dict | None = None) -> np.ndarray:
+    """Query vectors (n, d) -> (n, len(FIELDS) * d) for a multi-field index."""
+    w = field_weights(weights)
+
+
+    return np.hstack([wi * query_vecs for wi in w]).astype("float32")
@@ -0,0 +1,113 @@
+"""
+published_at as a numeric column: date-range pre-filter and time-decay re-scoring.
+
+published_ts holds epoch seconds per chunk (NaN = unknown), aligned with the
+FAISS ids like the salary columns. Filters
+
+    {"published_after": "2025-06-01", "published_before": date(2025, 7, 1), "max_age_days": 30}
+
+become part of the column mask that FAISS applies while searching. A time
+decay re-scores the candidates of a query in one vectorised pass:
+
+    score' = score * ((1 - weight) + weight * 0.5 ** (age_days / half_life_days))
+
+so a vacancy half_life_days old loses weight / 2 of its score and one of
+unknown age loses weight.
+"""
+
+from datetime import date, datetime, time as dtime, timezone
+
+import numpy as np
+
+FRESHNESS_FILTERS = ("published_after", "published_before", "max_age_days")
+
+DEFAULT_HALF_LIFE_DAYS = 30.0
+DEFAULT_DECAY_WEIGHT = 0.3
+
+# Candidates re-scored per requested result: a fresh hit may sit below top_k by similarity
+DECAY_CANDIDATES = 5
+
+_DAY = 86400.0
+
+
+def to_timestamp(value) -> float:
+    """Epoch seconds of an hh published_at string, ISO date / datetime, date or number (NaN if empty).
+
+    Naive values are taken as UTC: hh always sends an offset, date-only filters
+    are a day granular anyway.
+    """
+    if value is None or value == "":
+        return np.nan
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime.combine(value, dtime())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+
+    return value.timestamp()
+
+
+def published_column(records: list[dict]) -> np.ndarray:
+    """float64 epoch seconds of every record's published_at (chunks of a vacancy share one parse)."""
+    parsed = {}
+    out = np.empty(len(records), dtype="float64")
+    for i, r in enumerate(records):
+        raw = r.get("published_at")
+        if raw not in parsed:
+            try:
+                parsed[raw] = to_timestamp(raw)
+            except (TypeError, ValueError):
+                parsed[raw] = np.nan
+        out[i] = parsed[raw]
+
+
+    return out
+
+
+def freshness_mask(published_ts: np.ndarray, filters: dict, now: float | None = None) -> np.ndarray:
+    """FRESHNESS_FILTERS over the column -> boolean mask (unknown dates never pass)."""
+    mask = np.ones(len(published_ts), dtype=bool)
+    lo = -np.inf
+    if filters.get("published_after") is not None:
+        lo = to_timestamp(filters["published_after"])
+    if filters.get("max_age_days") is not None:
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        lo = max(lo, now - float(filters["max_age_days"]) * _DAY)
+    if lo > -np.inf:
+        mask &= published_ts >= lo
+    if filters.get("published_before") is not None:
+        mask &= published_ts < to_timestamp(filters["published_before"])
+
+
+    return mask
+
+
+def decay_factor(published_ts: np.ndarray, half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+                 weight: float = DEFAULT_DECAY_WEIGHT, now: float | None = None) -> np.ndarray:
+    """Score multiplier per timestamp, in [1 - weight, 1]."""
+    now = datetime.now(timezone.utc).timestamp() if now is None else now
+    age_days = np.maximum(now - published_ts, 0.0) / _DAY
+    fresh = np.exp2(-age_days / half_life_days)
+
+
+    return (1.0 - weight) + weight * np.nan_to_num(fresh, nan=0.0)
+
+
+def rescore(scores: np.ndarray, ids: np.ndarray, published_ts: np.ndarray, half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+            weight: float = DEFAULT_DECAY_WEIGHT, now: float | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decay one query's FAISS hits and re-sort them.
+
+    Returns (decayed scores, ids, original scores) in the new order; missing ids (-1) stay last.
+    """
+    valid = ids >= 0
+    factor = decay_factor(published_ts[np.where(valid, ids, 0)], half_life_days, weight, now)
+    decayed = np.where(valid, scores * factor, -np.inf)
+    order = np.argsort(-decayed, kind="stable")
+
+
+    return decayed[order], ids[order], scores[order]
@@ -1,14 +1,83 @@
 
 import json
+import logging
 import os
 import pickle
+import time
 import numpy as np
 import faiss
 from sentence_transformers import SentenceTransformer
 
+from rag.diversity import DEFAULT_CANDIDATES, DEFAULT_LAMBDA, diversify
+from rag.fields import FIELDS, encode_fields, expand_queries
+from rag.freshness import (
+    DECAY_CANDIDATES, DEFAULT_DECAY_WEIGHT, DEFAULT_HALF_LIFE_DAYS, FRESHNESS_FILTERS, freshness_mask,
+    published_column, rescore,
+)
+from rag.query_parser import parse_query
+from rag.metrics import enabled as metrics_enabled, inc, observe, span, RATIO_BUCKETS
+from rag.salary import normalize_salary, salary_columns
+from rag.sharding import ShardedIndex, assign_shards, shard_areas
+from rag.versioning import resolve_index_dir
+from rag.skills import build_skill_matrix, skill_key, skills_vacancy_mask, split_skills, top_skills
+
 # Model: truly multilingual, excellent for Russian/Kazakh text
 MODEL_NAME = "intfloat/multilingual-e5-small"
 INDEX_DIR = "data/index"
+COLUMNS_FILE = "columns.npz"
+
+# Filters answered by the numeric columns (vectorised pre-filter), the rest are checked per chunk
+COLUMN_FILTERS = ("salary_min", "salary_max", "skills", *FRESHNESS_FILTERS)
+# Also pre-filtered when the columns have their codes (indexes built before them check per chunk)
+CODED_FILTERS = {"city": "area", "experience": "experience"}
+
+logger = logging.getLogger(__name__)
+
+
+def build_columns(chunks: list[dict]) -> dict[str, np.ndarray]:
+    """
+    Numeric side tables of the index.
+
+    Per-chunk columns are aligned with the FAISS ids (row i = chunks[i]):
+    salary_* (see rag.salary), published_ts (see rag.freshness), vacancy_row —
+    the vacancy the chunk belongs to — and area_code / experience_code, indexes
+    into area_vocab / experience_vocab.
+    skill_* arrays hold the vacancy x skill matrix (see rag.skills.build_skill_matrix).
+    """
+    rows = {}
+    skill_lists = []
+    for c in chunks:
+        if c.get("vacancy_id") not in rows:
+            rows[c.get("vacancy_id")] = len(rows)
+            skill_lists.append(split_skills(c.get("key_skills")))
+    vacancy_row = np.array([rows[c.get("vacancy_id")] for c in chunks], dtype=np.int32)
+
+
+    return {
+        **salary_columns(chunks),
+        "published_ts": published_column(chunks),
+        "vacancy_row": vacancy_row,
+        **_coded(chunks, "area"),
+        **_coded(chunks, "experience"),
+        **build_skill_matrix(skill_lists),
+    }
+
+
+def _coded(chunks: list[dict], field: str) -> dict[str, np.ndarray]:
+    """Dictionary-encoded string field: <field>_code per chunk (int32) and <field>_vocab."""
+    vocab = {}
+    codes = np.array([vocab.setdefault((c.get(field) or "").strip(), len(vocab)) for c in chunks], dtype=np.int32)
+
+
+    return {f"{field}_code": codes, f"{field}_vocab": np.array(list(vocab), dtype=str)}
+
+
+def load_columns(index_dir: str = INDEX_DIR) -> dict[str, np.ndarray] | None:
+    path = os.path.join(resolve_index_dir(index_dir), COLUMNS_FILE)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
 
 
 def build_index(
@@ -16,53 +85,141 @@ def build_index(
     model_name: str = MODEL_NAME,
     index_dir: str = INDEX_DIR,
     batch_size: int= 64,
+    model: SentenceTransformer | None = None,
+    shards: int = 1,
+    shard_by: str = "hash",
+    multi_field: bool = False,
 ) -> tuple:
+    """
+    Embed chunks, build the FAISS index and save it with chunks and columns to index_dir.
 
-    os.makedirs(index_dir, exist_ok=True)
-
-    print(f"Loading model: {model_name}...")
-    model = SentenceTransformer(model_name)
+    model: already loaded encoder (anything with SentenceTransformer.encode), model_name is
+    only recorded then — benchmarks pass an offline stand-in.
+    shards > 1: partition into a rag.sharding.ShardedIndex (shard_by "hash" or "area").
+    multi_field: also embed each vacancy's title and key skills (see rag.fields).
+    """
+    if model is None:
+        logger.info(f"Loading model: {model_name}...")
+        with span("load_model"):
+            model = SentenceTransformer(model_name)
 
     # multilingual-e5 requires "passage: " prefix for documents
     is_e5 = "e5" in model_name.lower()
     texts = [("passage: " + c["text"] if is_e5 else c["text"]) for c in chunks]
-    print(f"Encoding {len(texts)} chunks (batch_size={batch_size})...")
-    embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=True, normalize_embeddings=True)
-    embeddings = np.array(embeddings, dtype="float32")
+    logger.info(f"Encoding {len(texts)} chunks (batch_size={batch_size})...")
+    with span("encode_passages"):
+        embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=True, normalize_embeddings=True)
+        embeddings = np.array(embeddings, dtype="float32")
+    if multi_field:
+        with span("encode_fields"):
+            embeddings = encode_fields(model, chunks, embeddings, prefix="passage: " if is_e5 else "",
+                                       batch_size=batch_size)
+
+    index = save_index(embeddings, chunks, index_dir, model_name=model_name, is_e5=is_e5, shards=shards,
+                       shard_by=shard_by, fields=FIELDS if multi_field else None)
+
+
+    return index, model, chunks
+
+
+def save_index(
+    embeddings: np.ndarray,
+    chunks: list[dict],
+    index_dir: str,
+    model_name: str = MODEL_NAME,
+    is_e5: bool = True,
+    shards: int = 1,
+    shard_by: str = "hash",
+    fields: tuple[str, ...] | None = None,
+):
+    """
+    FAISS index over already computed embeddings (row i = chunks[i]) saved with chunks, columns and config.
+
+    build_index after encoding; rag.tombstones compaction with the vectors of the live index.
+    fields: the rows are multi-field vectors (rag.fields), recorded in the config.
+    """
+    os.makedirs(index_dir, exist_ok=True)
 
     # FAISS index — Inner Product (cosine similarity since embeddings are normalized)
     dim = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dim)
-    index.add(embeddings)
-
-    print(f"FAISS index built: {index.ntotal} vectors, dim={dim}")
+    config = {"model_name": model_name, "dim": dim, "n_chunks": len(chunks), "is_e5": is_e5}
+    if fields:
+        config["fields"] = list(fields)
+    with span("faiss_add"):
+        if shards > 1:
+            assignment = assign_shards(chunks, shards, shard_by)
+            areas = shard_areas(chunks, assignment, shards) if shard_by == "area" else None
+            index = ShardedIndex.from_embeddings(embeddings, assignment, shards, areas=areas)
+            config.update({"shards": shards, "shard_by": shard_by, "shard_areas": areas})
+        else:
+            index = faiss.IndexFlatIP(dim)
+            index.add(embeddings)
+
+    logger.info(f"FAISS index built: {index.ntotal} vectors, dim={dim}"
+                + (f", {shards} shards by {shard_by}" if shards > 1 else ""))
 
     # Save to disk
-    faiss.write_index(index, os.path.join(index_dir, "vacancies.index"))
-    with open(os.path.join(index_dir, "chunks.pkl"), "wb") as f:
-        pickle.dump(chunks, f)
+    with span("save_index"):
+        if shards > 1:
+            index.write(index_dir)
+        else:
+            faiss.write_index(index, os.path.join(index_dir, "vacancies.index"))
+        with open(os.path.join(index_dir, "chunks.pkl"), "wb") as f:
+            pickle.dump(chunks, f)
+    with span("build_columns"):
+        np.savez(os.path.join(index_dir, COLUMNS_FILE), **build_columns(chunks))
     with open(os.path.join(index_dir, "config.json"), "w") as f:
-        json.dump({"model_name": model_name, "dim": dim, "n_chunks": len(chunks), "is_e5": is_e5}, f)
+        json.dump(config, f)
 
-    print(f"Index saved to {index_dir}/")
+    logger.info(f"Index saved to {index_dir}/")
 
 
-    return index, model, chunks
+    return index
 
 
-def load_index(index_dir: str = INDEX_DIR) -> tuple:
+def read_index(index_dir: str = INDEX_DIR) -> tuple:
+    """(index, chunks, config) of index_dir without loading the encoder."""
+    index_dir = resolve_index_dir(index_dir)
     with open(os.path.join(index_dir, "config.json"), "r") as f:
         config = json.load(f)
 
-    index = faiss.read_index(os.path.join(index_dir, "vacancies.index"))
+    if config.get("shards", 1) > 1:
+        index = ShardedIndex.read(index_dir, config["shards"], areas=config.get("shard_areas"))
+    else:
+        index = faiss.read_index(os.path.join(index_dir, "vacancies.index"))
     with open(os.path.join(index_dir, "chunks.pkl"), "rb") as f:
         chunks = pickle.load(f)
 
-    model = SentenceTransformer(config["model_name"])
+
+    return index, chunks, config
+
+
+def index_vectors(index: faiss.Index | ShardedIndex) -> np.ndarray:
+    """All stored vectors in global id order (flat indexes keep them exactly)."""
+    if not isinstance(index, ShardedIndex):
+        return index.reconstruct_n(0, index.ntotal)
+    vectors = np.empty((index.ntotal, index.d), dtype="float32")
+    for shard, ids in zip(index.shards, index.ids):
+        vectors[ids] = shard.reconstruct_n(0, shard.ntotal)
+
+
+    return vectors
+
+
+def load_index(index_dir: str = INDEX_DIR, model: SentenceTransformer | None = None) -> tuple:
+    """
+    (index, model, chunks) of index_dir; model: reuse an already loaded encoder.
+
+    index_dir may be a versioned root (rag.versioning), its live version is loaded.
+    """
+    index, chunks, config = read_index(index_dir)
+
+    if model is None:
+        model = SentenceTransformer(config["model_name"])
     # Store e5 flag on model for search to use
     model._is_e5 = config.get("is_e5", False)
 
-    print(f"Loaded index: {index.ntotal}vectors, model={config['model_name']}")
+    logger.info(f"Loaded index: {index.ntotal} vectors, model={config['model_name']}")
 
 
     return index, model, chunks
@@ -75,6 +232,11 @@ def search(
     chunks: list[dict],
     top_k: int = 10,
     filters: dict | None = None,
+    columns: dict[str, np.ndarray] | None = None,
+    freshness: dict | None = None,
+    parse_queries: bool = False,
+    field_weights: dict | None = None,
+    diversity: dict | None = None,
 ) -> list[dict]:
     """
     Search FAISS index with a text query + optional metadata filters.
@@ -83,65 +245,321 @@ def search(
         query: Natural language query
         index, model, chunks: From load_index()
         top_k: Number of results to return
-        filters: Optional dict with keys: city, salary_min, experience
+        filters: Optional dict with keys: city, salary_min, salary_max, experience, skills,
+            published_after, published_before, max_age_days
             - city: str - filter by area name (e.g."Алматы")
-            - salary_min: int - minimum salary_from or salary_to
-            - experience: str - filter by experience field substring
+            - salary_min: int - minimum net salary in BASE_CURRENCY (KZT)
+            - salary_max: int - the vacancy's lowest offer is at most this ("до 500к")
+            - experience: str or list[str] - experience field contains it (any of them)
+            - skills: list[str] - vacancy must have all these key skills (aliases allowed)
+            - published_after / published_before: date, datetime or ISO string - publication date range
+            - max_age_days: float - published at most this many days ago
+        columns: Numeric columns from load_columns(); built from chunks if not given.
+            A boolean "deleted" column (rag.tombstones.apply_tombstones) hides those chunks
+        freshness: Optional time decay of the scores, keys (all optional):
+            - half_life_days: float - age at which a vacancy loses half of the decay weight (30)
+            - weight: float - share of the score subject to decay, 0..1 (0.3)
+            - now: float - reference epoch seconds (current time)
+        parse_queries: Take city / salary / experience stated in the query as filters
+            (rag.query_parser.parse_query) and embed the query without them; explicit filters win
+        field_weights: Multi-field index only — weights of "text", "title", "skills"
+            (rag.fields.DEFAULT_FIELD_WEIGHTS for the ones not given)
+        diversity: Optional MMR re-ranking of the candidates (rag.diversity), keys (all optional):
+            - lambda: float - relevance vs novelty, 1 = plain ranking (0.7)
+            - max_per_employer: int - at most this many results of one employer
+            - candidates: int - candidates MMR chooses from (200)
 
     Returns top_k chunks with similarity scores, after applying filters.
+    With freshness, "score" is the decayed score and "similarity" the cosine similarity.
+    With diversity, the chunks come in MMR order, "score" is still the search score.
+    """
+    return search_batch([query], index, model, chunks, top_k=top_k, filters=[filters], columns=columns,
+                        freshness=freshness, parse_queries=parse_queries, field_weights=field_weights,
+                        diversity=diversity)[0]
+
+
+def search_batch(
+    queries: list[str],
+    index: faiss.Index,
+    model: SentenceTransformer,
+    chunks: list[dict],
+    top_k: int = 10,
+    filters: list[dict | None] | None = None,
+    columns: dict[str, np.ndarray] | None = None,
+    batch_size: int = 64,
+    freshness: dict | None = None,
+    parse_queries: bool = False,
+    field_weights: dict | None = None,
+    diversity: dict | None = None,
+) -> list[list[dict]]:
     """
+    search() for many queries: one encode call per batch of queries and one FAISS call
+    for the unfiltered queries of a batch (filtered ones need their own bitmap).
+
+    filters: per-query filters, aligned with queries (None = no filters for any query)
+    freshness: time decay applied to every query, see search()
+    parse_queries, field_weights, diversity: see search()
+    """
+    filters = filters or [None] * len(queries)
+    if parse_queries:
+        with span("parse_query"):
+            if columns is None:
+                inc("rag_columns_cache_misses_total")
+                columns = build_columns(chunks)
+            cities = columns["area_vocab"].tolist() if "area_vocab" in columns else sorted({c.get("area") or "" for c in chunks})
+            parsed = [parse_query(q, cities) for q in queries]
+        queries = [text for text, _ in parsed]
+        filters = [{**stated, **(f or {})} for (_, stated), f in zip(parsed, filters)]
+
     # e5 models need "query: " prefix
     is_e5 = getattr(model, "_is_e5", False)
-    q = f"query: {query}" if is_e5 else query
+    texts = [f"query: {q}" if is_e5 else q for q in queries]
+
+    inc("rag_queries_total", len(queries))
 
-    # If filters are active, retrieve more candidates then filter
-    fetch_k = top_k * 5 if filters else top_k
+    if freshness is not None:
+        if columns is None:
+            inc("rag_columns_cache_misses_total")
+            columns = build_columns(chunks)
+        columns = _with_published(columns, chunks)
+        decay = {"half_life_days": freshness.get("half_life_days", DEFAULT_HALF_LIFE_DAYS),
+                 "weight": freshness.get("weight", DEFAULT_DECAY_WEIGHT),
+                 "now": freshness.get("now") or time.time()}
 
-    query_vec = model.encode([q], normalize_embeddings=True).astype("float32")
-    scores, indices = index.search(query_vec, min(fetch_k, index.ntotal))
+    # MMR chooses top_k out of a wider candidate pool
+    pool = top_k
+    if diversity is not None:
+        pool = max(top_k, diversity.get("candidates", DEFAULT_CANDIDATES))
+
+    # Tombstoned chunks are masked out of every query, filtered or not
+    live = None
+    if columns is not None and "deleted" in columns and columns["deleted"].any():
+        live = ~columns["deleted"]
 
     results = []
-    for score, idx in zip(scores[0], indices[0]):
+    for start in range(0, len(texts), batch_size):
+        batch_filters = [f or {} for f in filters[start:start + batch_size]]
+        with span("encode"):
+            query_vecs = model.encode(texts[start:start + batch_size], normalize_embeddings=True).astype("float32")
+            # A multi-field index is FIELDS times wider than the encoder: weight the query per field
+            if index.d != query_vecs.shape[1]:
+                query_vecs = expand_queries(query_vecs, field_weights)
+
+        plans = []  # (row filters, mask, fetch_k, shards) per query
+        with span("prefilter"):
+            for f in batch_filters:
+                # Column filters become a bitmap that FAISS applies while searching
+                if any(f.get(k) for k in COLUMN_FILTERS):
+                    if columns is None:
+                        inc("rag_columns_cache_misses_total")
+                        columns = build_columns(chunks)
+                    columns = _with_published(columns, chunks)
+                column_keys = _column_filters(columns)
+                row_filters = {k: v for k, v in f.items() if k not in column_keys}
+                mask = None
+                if any(f.get(k) for k in column_keys):
+                    mask = _filter_mask(columns, f)
+                    if metrics_enabled():
+                        observe("rag_prefilter_pass_ratio", float(mask.mean()), buckets=RATIO_BUCKETS)
+                # If per-chunk filters are active, retrieve more candidates then filter
+                fetch_k = pool * 5 if row_filters else pool
+                # A decayed fresh hit can overtake older ones ranked a little higher
+                if freshness is not None:
+                    fetch_k *= DECAY_CANDIDATES
+                fetch_k = min(fetch_k, index.ntotal)
+                # A sharded index skips shards the filters rule out (city when sharded by area)
+                shards = index.route(f) if isinstance(index, ShardedIndex) else None
+                plans.append((row_filters, mask, fetch_k, shards))
+
+        hits = [None] * len(plans)
+        with span("faiss_search"):
+            # Unfiltered queries share one FAISS call per fetch_k (same k keeps tie order identical to search)
+            for k, shards in {(fetch_k, shards) for _, mask, fetch_k, shards in plans if mask is None}:
+                if live is not None and not live.any():
+                    break
+                plain = [i for i, plan in enumerate(plans) if plan[1] is None and plan[2:] == (k, shards)]
+                scores, indices = _search_index(index, query_vecs[plain], k, live, shards)
+                for j, i in enumerate(plain):
+                    hits[i] = (scores[j], indices[j])
+            for i, (_, mask, fetch_k, shards) in enumerate(plans):
+                if mask is not None and mask.any():
+                    scores, indices = _search_index(index, query_vecs[i:i + 1], fetch_k, mask, shards)
+                    hits[i] = (scores[0], indices[0])
+
+        if freshness is not None:
+            with span("decay"):
+                hits = [rescore(*hit, columns["published_ts"], **decay) if hit is not None else None for hit in hits]
+
+        with span("collect"):
+            for (row_filters, *_), hit in zip(plans, hits):
+                results.append(_collect_results(hit, chunks, row_filters, pool) if hit is not None else [])
+
+        if diversity is not None:
+            with span("diversify"):
+                for i in range(len(results) - len(plans), len(results)):
+                    results[i] = _diversify(results[i], index, top_k, diversity)
+
+
+    return results
+
+
+def _collect_results(hit: tuple, chunks: list[dict], row_filters: dict, top_k: int) -> list[dict]:
+    """
+    FAISS hits of one query -> chunk dicts with score / chunk_id, per-chunk filters applied.
+
+    hit: (scores, ids) or, re-scored by rag.freshness.rescore, (scores, ids, similarities)
+    """
+    results = []
+    rejected = 0
+    for i, (score, idx) in enumerate(zip(hit[0], hit[1])):
         if idx < 0:
             continue
         chunk = chunks[idx].copy()
         chunk["score"] = float(score)
+        chunk["chunk_id"] = int(idx)
+        if len(hit) > 2:
+            chunk["similarity"] = float(hit[2][i])
 
         # Apply filters
-        if filters:
-            if not _passes_filters(chunk, filters):
+        if row_filters:
+            if not _passes_filters(chunk, row_filters):
+                rejected += 1
                 continue
 
         results.append(chunk)
         if len(results) >= top_k:
             break
 
+    if row_filters:
+        inc("rag_row_filter_checked_total", len(results) + rejected)
+        inc("rag_row_filter_rejected_total", rejected)
+    if not results:
+        inc("rag_empty_results_total")
 
     return results
 
 
+def _diversify(results: list[dict], index: faiss.Index | ShardedIndex, top_k: int, diversity: dict) -> list[dict]:
+    """MMR over the collected candidates of one query with their vectors from the index."""
+    if not results:
+        return results
+    vectors = index.reconstruct_batch(np.array([r["chunk_id"] for r in results], dtype=np.int64))
+
+
+    return diversify(results, vectors, top_k, lambda_=diversity.get("lambda", DEFAULT_LAMBDA),
+                     max_per_employer=diversity.get("max_per_employer"))
+
+
+def _search_index(index: faiss.Index | ShardedIndex, query_vec: np.ndarray, k: int, mask: np.ndarray | None = None,
+                  shards: tuple[int, ...] | None = None):
+    """index.search restricted to ids where mask is True (None = no restriction) and, if sharded, to shards."""
+    if isinstance(index, ShardedIndex):
+        return index.search(query_vec, k, mask=mask, shards=shards)
+    if mask is None:
+        return index.search(query_vec, k)
+
+    bitmap = np.packbits(mask, bitorder="little")
+    selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap))
+
+
+    return index.search(query_vec, k, params=faiss.SearchParameters(sel=selector))
+
+
+def _with_published(columns: dict[str, np.ndarray], chunks: list[dict]) -> dict[str, np.ndarray]:
+    """columns of an index built before published_ts was a column get it from the chunks."""
+    if "published_ts" in columns:
+        return columns
+    return {**columns, "published_ts": published_column(chunks)}
+
+
+def _column_filters(columns: dict[str, np.ndarray] | None) -> tuple[str, ...]:
+    """Filter keys the columns answer (None: no columns yet, everything is checked per chunk)."""
+    if columns is None:
+        return ()
+    return COLUMN_FILTERS + tuple(k for k, field in CODED_FILTERS.items() if f"{field}_code" in columns)
+
+
+def _vocab_mask(columns: dict[str, np.ndarray], field: str, keep) -> np.ndarray:
+    """Chunks whose <field> passes keep(value), evaluated once per distinct value."""
+    ok = np.array([keep(v) for v in columns[f"{field}_vocab"].tolist()], dtype=bool)
+    return ok[columns[f"{field}_code"]] if len(ok) else np.zeros(len(columns[f"{field}_code"]), dtype=bool)
+
+
+def _filter_mask(columns: dict[str, np.ndarray], filters: dict) -> np.ndarray:
+    """Vectorised COLUMN_FILTERS (and city / experience when coded) over all chunks -> boolean mask."""
+    mask = np.ones(len(columns["vacancy_row"]), dtype=bool)
+
+    city = filters.get("city")
+    if city and "area_code" in columns:
+        mask &= _vocab_mask(columns, "area", lambda v: v.lower() == city.lower().strip())
+
+    exp = filters.get("experience")
+    if exp and "experience_code" in columns:
+        wanted = [e.lower() for e in ([exp] if isinstance(exp, str) else exp)]
+        mask &= _vocab_mask(columns, "experience", lambda v: any(e in v.lower() for e in wanted))
+
+    salary_min = filters.get("salary_min")
+    if salary_min:
+        # NaN (no salary / unknown currency) compares False
+        mask &= columns["salary_max"] >= salary_min
+    salary_max = filters.get("salary_max")
+    if salary_max:
+        mask &= columns["salary_min"] <= salary_max
+
+    skills = filters.get("skills")
+    if skills:
+        mask &= skills_vacancy_mask(columns, skills)[columns["vacancy_row"]]
+
+    if any(filters.get(k) is not None for k in FRESHNESS_FILTERS):
+        mask &= freshness_mask(columns["published_ts"], filters)
+
+    if "deleted" in columns:
+        mask &= ~columns["deleted"]
+
+
+    return mask
+
+
 def _passes_filters(chunk: dict, filters: dict) -> bool:
     # City filter — exact match (case-insensitive)
     city = filters.get("city")
     if city and city.lower().strip() != (chunk.get("area") or "").lower().strip():
         return False
 
-    # Salary filter
+    # Salary filter — net salary in the base currency
     salary_min = filters.get("salary_min")
     if salary_min:
-        sal_from = chunk.get("salary_from") or 0
-        sal_to = chunk.get("salary_to") or 0
-        best_salary = max(sal_from, sal_to)
-        if best_salary == 0 or best_salary < salary_min:
+        best_salary = normalize_salary(chunk)["salary_max"]
+        if not best_salary >= salary_min:
+            return False
+    salary_max = filters.get("salary_max")
+    if salary_max:
+        lowest_salary = normalize_salary(chunk)["salary_min"]
+        if not lowest_salary <= salary_max:
+            return False
+
+    # Skills filter — all requested skills must be among the vacancy key_skills
+    skills = filters.get("skills")
+    if skills:
+        have = {skill_key(s) for s in split_skills(chunk.get("key_skills"))}
+        if not {skill_key(s) for s in skills} <= have:
             return False
 
     # Experience filter — check metadata field first, fallback to text
     exp = filters.get("experience")
     if exp:
-        chunk_exp = chunk.get("experience") or ""
-        chunk_text = chunk.get("text") or ""
-        if exp.lower() not in chunk_exp.lower() and exp.lower() not in chunk_text.lower():
+        chunk_exp = (chunk.get("experience") or "").lower()
+        chunk_text = (chunk.get("text") or "").lower()
+        if not any(e.lower() in chunk_exp or e.lower() in chunk_text for e in ([exp] if isinstance(exp, str) else exp)):
             return False
 
 
     return True
+
+
+def skill_facets(results: list[dict], columns: dict[str, np.ndarray], n: int = 20) -> list[tuple[str, int]]:
+    """Top key skills among the vacancies of a search result set."""
+    chunk_ids = np.array([r["chunk_id"] for r in results], dtype=np.int64)
+
+
+    return top_skills(columns, columns["vacancy_row"][chunk_ids], n=n)
@@ -0,0 +1,321 @@
+"""
+Stage timers, counters and latency histograms for rag.indexer and rag.pipeline.
+
+    with span("encode"):
+        vecs = model.encode(...)
+    inc("rag_llm_prompt_tokens_total", n, backend="ollama")
+    observe("rag_prefilter_pass_ratio", kept / total, buckets=RATIO_BUCKETS)
+
+Off by default and near free then: span() returns a shared no-op and inc() /
+observe() return after one flag check. enable() turns on the process-wide
+registry, exported by prometheus_text() / write_prometheus() (for the
+node_exporter textfile collector); enable(otel=True) also opens an
+OpenTelemetry span per stage (needs opentelemetry-api, not a requirement).
+
+trace() collects the spans of one request whether the registry is on or not,
+so the app can show a per-query timing breakdown:
+
+    with trace() as t:
+        rag_query(...)
+    t.stages  # [{"name": "rag_query", "ms": ..., "depth": 0}, {"name": "search", ...}, ...]
+"""
+
+import bisect
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator
+
+# Seconds, from a FAISS call on a small index to an LLM answer on CPU
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RATIO_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+STAGE_HISTOGRAM = "rag_stage_seconds"
+
+_enabled = False
+_tracer = None  # OpenTelemetry tracer when enabled with otel=True
+_current_trace = contextvars.ContextVar("rag_trace", default=None)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """Cumulative-bucket histogram, the Prometheus layout."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (None if empty or in +Inf)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+
+class Registry:
+    """Counters and histograms keyed by (name, labels); thread-safe."""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: tuple = LATENCY_BUCKETS, **labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram(buckets)
+            hist.observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> dict:
+        """Plain-dict copy: {"counters": {name: {labels: value}}, "histograms": {name: {labels: {...}}}}."""
+        out = {"counters": {}, "histograms": {}}
+        with self._lock:
+            for (name, labels), value in self.counters.items():
+                out["counters"].setdefault(name, {})[labels] = value
+            for (name, labels), h in self.histograms.items():
+                out["histograms"].setdefault(name, {})[labels] = {
+                    "count": h.count, "sum": h.sum, "p50": h.quantile(0.5), "p95": h.quantile(0.95),
+                }
+        return out
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        def fmt(labels: tuple, extra: tuple = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            for name in sorted({n for n, _ in self.counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (n, labels), value in sorted(self.counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{fmt(labels)} {value:g}")
+            for name in sorted({n for n, _ in self.histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (n, labels), h in sorted(self.histograms.items(), key=lambda kv: kv[0]):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(h.buckets + (float("inf"),), h.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{name}_bucket{fmt(labels, (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{fmt(labels)} {h.sum:.6f}")
+                    lines.append(f"{name}_count{fmt(labels)} {h.count}")
+
+
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (NaN where the resource module is missing: Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Registry()
+
+
+class Trace:
+    """
+    Spans of one request, in start order.
+
+    resources=True also records per stage the process CPU time (cpu_ms), the
+    peak RSS so far (peak_rss_mb) and, while tracemalloc is tracing, the net
+    Python heap growth (alloc_mb) — what rag.profiling reports.
+    """
+
+    def __init__(self, resources: bool = False):
+        self.stages = []
+        self.depth = 0
+        self.resources = resources
+
+    def breakdown(self) -> dict[str, float]:
+        """Milliseconds per stage name (repeated stages summed)."""
+        out = {}
+        for s in self.stages:
+            out[s["name"]] = out.get(s["name"], 0.0) + s["ms"]
+        return out
+
+    @property
+    def total_ms(self) -> float:
+        return sum(s["ms"] for s in self.stages if s["depth"] == 0)
+
+
+class _Span:
+    __slots__ = ("name", "labels", "trace", "entry", "t0", "cpu0", "mem0", "otel")
+
+    def __init__(self, name: str, labels: dict, trace: Trace | None):
+        self.name = name
+        self.labels = labels
+        self.trace = trace
+
+    def __enter__(self):
+        if self.trace is not None:
+            self.entry = {"name": self.name, "ms": 0.0, "depth": self.trace.depth}
+            self.trace.stages.append(self.entry)
+            self.trace.depth += 1
+            if self.trace.resources:
+                self.cpu0 = time.process_time()
+                self.mem0 = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self.otel = None
+        if _tracer is not None:
+            self.otel = _tracer.start_as_current_span(self.name, attributes=self.labels or None)
+            self.otel.__enter__()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.t0
+        if self.otel is not None:
+            self.otel.__exit__(*exc)
+        if self.trace is not None:
+            self.entry["ms"] = seconds * 1000
+            self.trace.depth -= 1
+            if self.trace.resources:
+                self.entry["cpu_ms"] = (time.process_time() - self.cpu0) * 1000
+                self.entry["peak_rss_mb"] = peak_rss_mb()
+                if self.mem0 is not None and tracemalloc.is_tracing():
+                    self.entry["alloc_mb"] = (tracemalloc.get_traced_memory()[0] - self.mem0) / 2**20
+        if _enabled:
+            REGISTRY.observe(STAGE_HISTOGRAM, seconds, stage=self.name, **self.labels)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **labels):
+    """Time a stage: recorded in STAGE_HISTOGRAM{stage=name} and in the active trace()."""
+    trace = _current_trace.get()
+    if not _enabled and trace is None:
+        return _NOOP
+    return _Span(name, labels, trace)
+
+
+def traced(name: str):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    if _enabled:
+        REGISTRY.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, buckets: tuple = LATENCY_BUCKETS, **labels) -> None:
+    if _enabled:
+        REGISTRY.observe(name, value, buckets=buckets, **labels)
+
+
+def enabled() -> bool:
+    """True if the registry records; check before computing an expensive metric value."""
+    return _enabled
+
+
+def enable(otel: bool = False) -> None:
+    """Start recording into REGISTRY; otel=True also emits OpenTelemetry spans (tracer "rag")."""
+    global _enabled, _tracer
+    if otel:
+        from opentelemetry import trace as otel_trace
+        _tracer = otel_trace.get_tracer("rag")
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled, _tracer
+    _enabled = False
+    _tracer = None
+
+
+@contextmanager
+def trace(resources: bool = False) -> Iterator[Trace]:
+    """
+    Collect the spans opened in this block (this thread / context only).
+
+    Inside another trace() the outer one keeps collecting and is returned, so a
+    caller's breakdown and an enclosing rag.profiling.Profiler see the same spans.
+    """
+    current = _current_trace.get()
+    if current is not None:
+        yield current
+        return
+    t = Trace(resources)
+    token = _current_trace.set(t)
+    try:
+        yield t
+    finally:
+        _current_trace.reset(token)
+
+
+def prometheus_text() -> str:
+    return REGISTRY.prometheus_text()
+
+
+def write_prometheus(path: str) -> None:
+    """Write prometheus_text() to path atomically (scrapers never see a half-written file)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
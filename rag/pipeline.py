@@ -1,7 +1,47 @@
 
+import logging
+import math
 import os
+import re
+import time
+from collections import Counter
+
+import numpy as np
 import requests
+from config import BASE_CURRENCY
+from rag.aggregates import _money, answer_aggregate
 from rag.indexer import search
+from rag.metrics import inc, span, traced
+from rag.salary import salary_columns
+from rag.skills import skill_key, split_skills
+
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio of BPE tokenizers (Qwen, GPT) on Russian text
+CHARS_PER_TOKEN = 3
+
+# Default context budget for rag_query — prompt prefill dominates latency on CPU
+CONTEXT_TOKEN_BUDGET = 1500
+
+# Below this many tokens a vacancy is not worth adding to the context
+MIN_VACANCY_TOKENS = 60
+
+# Description sections that rarely help to answer a question (perks, company blurb).
+# "Условия:" stays: it carries the schedule, remote / office and employment format.
+BOILERPLATE_HEADERS = (
+    "мы предлагаем", "что мы предлагаем", "о компании",
+    "бонусы", "преимущества", "почему мы", "у нас", "we offer", "benefits", "about us",
+)
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+_WORD = re.compile(r"\w+")
+
+# Metadata lines of rag.chunker.vacancy_to_document — not sentences worth quoting
+_METADATA_PREFIXES = ("Вакансия:", "Компания:", "Город:", "Зарплата:", "Опыт:", "График:", "Занятость:",
+                      "Ключевые навыки:", "Описание:")
+# Words are compared by this many leading letters: a crude stemmer for Russian inflection
+_STEM = 5
 
 
 # --- Prompt templates ---
@@ -22,27 +62,255 @@ RAG_PROMPT_TEMPLATE = """Вот релевантные вакансии из б
 Ответь на вопрос, опираясь ТОЛЬКО на вакансии выше. Приводи конкретные примеры (названия компаний, зарплаты, навыки)."""
 
 
-def format_context(results: list[dict], max_chunks: int = 5) -> str:
-    parts = []
-    seen_ids = set()
+def estimate_tokens(text: str) -> int:
+    """Cheap token count estimate, good enough for budgeting the prompt."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _is_header(line: str) -> bool:
+    return line.endswith(":") and len(line) <= 60
+
+
+def _strip_boilerplate(text: str) -> str:
+    """Drop description sections like "Мы предлагаем:" up to the next header."""
+    kept = []
+    skipping = False
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if _is_header(stripped):
+            skipping = stripped[:-1].strip().lower() in BOILERPLATE_HEADERS
+        if not skipping:
+            kept.append(line)
+
+
+    return "\n".join(kept)
+
 
-    for r in results[:max_chunks]:
+def _trim_text(text: str, max_tokens: int, question: str = "") -> str:
+    """
+    Fit a vacancy text into max_tokens.
+
+    Metadata lines (everything before "Описание:") are kept as is, description
+    sentences are ranked by word overlap with the question and the best ones are
+    kept in their original order.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    head, sep, desc = text.partition("\nОписание:\n")
+    if not sep:
+        head, desc = "", text
+    budget = max_tokens - estimate_tokens(head + sep)
+    if budget <= 0:
+        return head[: max_tokens * CHARS_PER_TOKEN]
+
+    sentences = [s.strip() for s in _SENTENCE_SPLIT.split(desc) if s.strip()]
+    q_words = set(_WORD.findall(question.lower()))
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: -len(q_words & set(_WORD.findall(sentences[i].lower()))),
+    )
+
+    chosen = set()
+    for i in ranked:
+        cost = estimate_tokens(sentences[i]) + 1
+        if cost > budget:
+            continue
+        chosen.add(i)
+        budget -= cost
+
+    return head + sep + "\n".join(sentences[i] for i in sorted(chosen))
+
+
+def format_context(
+    results: list[dict],
+    max_chunks: int = 5,
+    max_tokens: int | None = None,
+    question: str = "",
+) -> str:
+    """
+    Build the LLM context from search results.
+
+    Takes the highest-scoring unique vacancies (at most max_chunks). With max_tokens
+    set, the context is packed into that budget: boilerplate description sections
+    are dropped and every vacancy is trimmed to its share of the remaining budget.
+    """
+    picked = []
+    seen_ids = set()
+    for r in sorted(results, key=lambda r: -(r.get("score") or 0.0)):
         vid = r.get("vacancy_id") 
         if vid in seen_ids:
             continue
         seen_ids.add(vid)
-        parts.append(f"[Вакансия: {r.get('vacancy_name')} | {r.get('employer')} | {r.get('area')}]\n{r['text']}\n")
+        picked.append(r)
+        if len(picked) >= max_chunks:
+            break
+
+    parts = []
+    remaining = max_tokens
+    for i, r in enumerate(picked):
+        header = f"[Вакансия: {r.get('vacancy_name')} | {r.get('employer')} | {r.get('area')}]\n"
+        text = r["text"]
+
+        if remaining is not None:
+            share = remaining // (len(picked) - i) - estimate_tokens(header)
+            if share < MIN_VACANCY_TOKENS:
+                break
+            text = _trim_text(_strip_boilerplate(text), share, question)
+            remaining -= estimate_tokens(header + text) + 2
+
+        parts.append(f"{header}{text}\n")
 
 
     return "\n---\n".join(parts)
 
- 
+
+def _stems(text: str) -> set[str]:
+    return {w[:_STEM] for w in _WORD.findall(text.lower()) if len(w) > 1}
+
+
+def _sentences(chunk: dict) -> list[str]:
+    """Quotable description sentences of a chunk: no metadata lines, boilerplate or cut-off fragments."""
+    out = []
+    pieces = _SENTENCE_SPLIT.split(_strip_boilerplate(chunk.get("text") or ""))
+    for i, sentence in enumerate(pieces):
+        sentence = sentence.strip(" -•*\t")
+        if not 30 <= len(sentence) <= 300 or sentence.startswith(_METADATA_PREFIXES):
+            continue
+        # Overlapping chunks start mid-sentence and may end mid-word
+        if sentence[0].islower() or (i == len(pieces) - 1 and sentence[-1] not in ".!?;"):
+            continue
+        out.append(sentence)
+
+
+    return out
+
+
+def extractive_answer(
+    question: str,
+    results: list[dict],
+    max_sentences: int = 5,
+    max_vacancies: int = 8,
+    embed_model=None,
+) -> dict:
+    """
+    Answer from the search results alone, in about a millisecond: the best sentences of
+    the retrieved vacancies plus salary / skill / employer aggregates over them.
+
+    Sentences are scored by the IDF-weighted share of the question's word stems they
+    contain plus half the search score of their chunk (its similarity to the query
+    embedding); at most two per vacancy. embed_model: score them by cosine with the
+    query embedding instead — one encoder pass over the sentences, tens of ms on CPU.
+
+    Returns dict with 'answer' (Markdown), 'sentences', 'salary', 'skills', 'employers',
+    'cities', 'n_vacancies'.
+    """
+    vacancies, picked_ids = [], set()
+    for r in sorted(results, key=lambda r: -(r.get("score") or 0.0)):
+        if r.get("vacancy_id") not in picked_ids and len(vacancies) < max_vacancies:
+            picked_ids.add(r.get("vacancy_id"))
+            vacancies.append(r)
+
+    candidates, owners, seen = [], [], set()
+    for r in results:
+        if r.get("vacancy_id") not in picked_ids:
+            continue
+        for sentence in _sentences(r):
+            if sentence.lower() not in seen:
+                seen.add(sentence.lower())
+                candidates.append(sentence)
+                owners.append(r)
+
+    scores = np.zeros(len(candidates))
+    if candidates and embed_model is not None:
+        is_e5 = getattr(embed_model, "_is_e5", False)
+        vecs = embed_model.encode([("query: " if is_e5 else "") + question]
+                                  + [("passage: " if is_e5 else "") + c for c in candidates], normalize_embeddings=True)
+        scores = np.asarray(vecs[1:]) @ np.asarray(vecs[0])
+    elif candidates:
+        q_stems = _stems(question)
+        stems = [_stems(c) & q_stems for c in candidates]
+        df = Counter(t for st in stems for t in st)
+        idf = {t: math.log((len(candidates) + 1) / (df[t] + 1)) + 1 for t in q_stems}
+        total = sum(idf.values()) or 1.0
+        overlap = np.array([sum(idf[t] for t in st) for st in stems]) / total
+        scores = overlap + 0.5 * np.array([r.get("score") or 0.0 for r in owners])
+
+    sentences, per_vacancy = [], Counter()
+    for i in np.argsort(-scores, kind="stable"):
+        owner = owners[i]
+        if per_vacancy[owner.get("vacancy_id")] >= 2:
+            continue
+        per_vacancy[owner.get("vacancy_id")] += 1
+        sentences.append({"text": candidates[i], "vacancy_name": owner.get("vacancy_name"),
+                          "employer": owner.get("employer"), "url": owner.get("url"), "score": float(scores[i])})
+        if len(sentences) >= max_sentences:
+            break
+
+    salary = None
+    if vacancies:
+        cols = salary_columns(vacancies)
+        has = ~np.isnan(cols["salary_mid"])
+        if has.any():
+            salary = {"n": int(has.sum()), "median": float(np.median(cols["salary_mid"][has])),
+                      "min": float(cols["salary_min"][has].min()), "max": float(cols["salary_max"][has].max()),
+                      "currency": BASE_CURRENCY}
+
+    # Counted per vacancy under skill_key, shown in the most common spelling
+    skill_counts, spellings = Counter(), Counter()
+    for v in vacancies:
+        names = split_skills(v.get("key_skills"))
+        spellings.update(names)
+        skill_counts.update(list(dict.fromkeys(skill_key(name) for name in names)))
+    skill_names = {}
+    for name, _ in spellings.most_common():
+        skill_names.setdefault(skill_key(name), name)
+
+    summary = {
+        "n_vacancies": len(vacancies),
+        "sentences": sentences,
+        "salary": salary,
+        "skills": [(skill_names[k], n) for k, n in skill_counts.most_common(10)],
+        "employers": Counter(v.get("employer") for v in vacancies if v.get("employer")).most_common(5),
+        "cities": Counter(v.get("area") for v in vacancies if v.get("area")).most_common(5),
+    }
+    summary["answer"] = format_extractive_answer(summary)
+
+
+    return summary
+
+
+def format_extractive_answer(summary: dict) -> str:
+    """Markdown of an extractive_answer() summary."""
+    if not summary["n_vacancies"]:
+        return "Подходящих вакансий не найдено."
+
+    lines = [f"**По {summary['n_vacancies']} найденным вакансиям** (быстрый ответ без LLM):", ""]
+    salary = summary["salary"]
+    if salary:
+        lines.append(f"- Зарплата на руки, {salary['currency']}: медиана {_money(salary['median'])}, "
+                     f"от {_money(salary['min'])} до {_money(salary['max'])} "
+                     f"(указана в {salary['n']} из {summary['n_vacancies']})")
+    for label, key in (("Частые навыки", "skills"), ("Компании", "employers"), ("Города", "cities")):
+        if summary[key]:
+            lines.append(f"- {label}: " + ", ".join(f"{name} ({n})" for name, n in summary[key]))
+    if summary["sentences"]:
+        lines += ["", "Из описаний вакансий:"]
+        lines += [f"- «{s['text']}» — *{s['vacancy_name']}*, {s['employer']}" for s in summary["sentences"]]
+
+
+    return "\n".join(lines)
+
+
 def answer_with_ollama(
     question: str, 
     context: str,
     model: str = "qwen2.5:3b",
     base_url: str = "http://localhost:11434",
+    timeout: float = 300,
 ) -> str:
+    # Not streamed: Ollama sends nothing until the answer is done, so the read timeout bounds the
+    # whole generation, and closing the connection on timeout makes Ollama stop generating
     prompt = RAG_PROMPT_TEMPLATE.format(context=context, question=question)
 
     resp = requests.post(
@@ -55,11 +323,22 @@ def answer_with_ollama(
             ],
             "stream": False,
         },
-        timeout=300,
+        timeout=timeout,
     )
     resp.raise_for_status()
     data = resp.json()
 
+    # Ollama reports exact token counts and durations (in ns) — log them for budget tuning
+    if isinstance(data, dict) and "prompt_eval_count" in data:
+        logger.info(
+            "Ollama %s: prompt %s tokens (%.1fs), generated %s tokens (%.1fs)",
+            model,
+            data.get("prompt_eval_count"),
+            (data.get("prompt_eval_duration") or 0) / 1e9,
+            data.get("eval_count"),
+            (data.get("eval_duration") or 0) / 1e9,
+        )
+
 
     try:
         return data["message"]["content"]
@@ -72,6 +351,7 @@ def answer_with_openai(
     context: str,
     model: str = "gpt-4o-mini",
     api_key: str | None = None,
+    timeout: float = 60,
 ) -> str:
     api_key = api_key or os.environ.get("OPENAI_API_KEY")
     if not api_key:
@@ -90,17 +370,25 @@ def answer_with_openai(
             ],
             "temperature": 0.3,
         },
-        timeout=60,
+        timeout=timeout,
     )
     resp.raise_for_status()
     data = resp.json()
 
+    usage = data.get("usage") if isinstance(data, dict) else None
+    if usage:
+        logger.info(
+            "OpenAI %s: prompt %s tokens, generated %s tokens",
+            model, usage.get("prompt_tokens"), usage.get("completion_tokens"),
+        )
+
     try:
         return data["choices"][0]["message"]["content"]
     except (KeyError, TypeError, IndexError):
         raise ValueError(f"Unexpected OpenAI response format: {str(data)[:200]}")
 
 
+@traced("rag_query")
 def rag_query(
     question: str,
     index,
@@ -109,6 +397,18 @@ def rag_query(
     llm_backend: str = "ollama",
     llm_model: str = "qwen2.5:3b",
     top_k: int = 10,
+    context_tokens: int | None = CONTEXT_TOKEN_BUDGET,
+    max_context_vacancies: int = 8,
+    columns: dict | None = None,
+    filters: dict | None = None,
+    parse_queries: bool = False,
+    field_weights: dict | None = None,
+    diversity: dict | None = None,
+    freshness: dict | None = None,
+    llm_deadline: float | None = None,
+    table=None,
+    results: list[dict] | None = None,
+    aggregate: dict | None = None,
     **kwargs,
 ) -> dict:
     """
@@ -122,25 +422,77 @@ def rag_query(
         llm_backend: "ollama" or "openai"
         llm_model: Model name for the chosen backend
         top_k: Number of chunks to retrieve
+        context_tokens: Token budget for the context (None = no budget)
+        max_context_vacancies: Max unique vacancies packed into the context
+        columns: Numeric columns of the index (load_columns / IndexSnapshot.columns); carries the
+            "deleted" bitmap, so closed vacancies never reach the context
+        filters, parse_queries, field_weights, diversity, freshness: Passed to search() for retrieval,
+            so the context, summary and sources are ranked like the result list; the LLM still sees
+            the full question
+        llm_deadline: Seconds to wait for the LLM, the HTTP timeout of its request; after that the
+            request is closed (Ollama stops generating) and the extractive answer is returned
+        table: Vacancy table (rag.aggregates.vacancy_table); aggregate questions ("средняя зарплата
+            Python") get the exact statistics over all matching vacancies prepended to the context,
+            and as the answer when there is no LLM or it misses the deadline
+        results: search() results the caller already has for this question and these options;
+            the search is skipped
+        aggregate: answer_aggregate() the caller already computed; used instead of table
 
     Returns:
-        dict with 'answer', 'sources', 'context'
+        dict with 'answer', 'sources', 'context', 'prompt_tokens', 'llm_seconds', 'summary'
+        (extractive_answer), 'aggregate' (answer_aggregate, None if not an aggregate question),
+        'answer_source' ("llm", "aggregate" or "extractive") and 'llm_timed_out'
     """
     # 1. Retrieve relevant chunks
-    results = search(question, index, embed_model, chunks, top_k=top_k)
+    if results is None:
+        with span("search"):
+            results = search(question, index, embed_model, chunks, top_k=top_k, filters=filters, columns=columns,
+                             parse_queries=parse_queries, field_weights=field_weights, diversity=diversity,
+                             freshness=freshness)
 
     # 2. Format context
-    context = format_context(results )
-
-    # 3. Generate answer
-    if llm_backend == "ollama":
-        answer = answer_with_ollama(question, context, model=llm_model, **kwargs)
-    elif llm_backend == "openai":
-        answer = answer_with_openai(question, context, model=llm_model, **kwargs)
-    else:
-        # Fallback: just return search results without LLM
-        answer = f"(LLM not configured — showing raw search results)\n\n{context}"
-
+    with span("format_context"):
+        context = format_context(
+            results, max_chunks=max_context_vacancies, max_tokens=context_tokens, question=question,
+        )
+    if aggregate is None and table is not None:
+        with span("aggregate"):
+            aggregate = answer_aggregate(question, table, filters=filters)
+    if aggregate is not None:
+        context = aggregate["table"] + "\n\n---\n\n" + context
+    prompt_tokens = estimate_tokens(
+        SYSTEM_PROMPT + RAG_PROMPT_TEMPLATE.format(context=context, question=question)
+    )
+    logger.info("Prompt ~%d tokens (context ~%d tokens)", prompt_tokens, estimate_tokens(context))
+
+    # 3. Generate answer (the exact or extractive one is ready first, as a fallback)
+    with span("extractive"):
+        summary = extractive_answer(question, results, max_vacancies=max_context_vacancies)
+    fallback, fallback_source = (aggregate["answer"], "aggregate") if aggregate else (summary["answer"], "extractive")
+    answer_source, timed_out = "llm", False
+    t0 = time.perf_counter()
+    with span("llm", backend=llm_backend):
+        if llm_backend in ("ollama", "openai"):
+            generate = answer_with_ollama if llm_backend == "ollama" else answer_with_openai
+            if llm_deadline is not None:
+                kwargs["timeout"] = llm_deadline
+            try:
+                answer = generate(question, context, model=llm_model, **kwargs)
+            except requests.Timeout:
+                if llm_deadline is None:
+                    raise
+                timed_out = True
+                inc("rag_llm_timeouts_total", backend=llm_backend)
+                logger.warning("LLM %s missed the %.1fs deadline, answering %s", llm_backend, llm_deadline,
+                               fallback_source)
+                answer, answer_source = fallback, fallback_source
+        else:
+            # No LLM configured: the exact / extractive answer instead of the raw context
+            answer, answer_source = fallback, fallback_source
+    llm_seconds = time.perf_counter() - t0
+    if llm_backend in ("ollama", "openai") and not timed_out:
+        inc("rag_llm_prompt_tokens_total", prompt_tokens, backend=llm_backend)
+        logger.info("LLM %s answered in %.2fs (prompt ~%d tokens)", llm_backend, llm_seconds, prompt_tokens)
 
     # 4. Extract unique sources
     seen = set()
@@ -163,4 +515,10 @@ def rag_query(
         "sources": sources,
         "context":  context,
         "n_results": len(results),
+        "prompt_tokens": prompt_tokens,
+        "llm_seconds": llm_seconds,
+        "summary": summary,
+        "aggregate": aggregate,
+        "answer_source": answer_source,
+        "llm_timed_out": timed_out,
     }
@@ -0,0 +1,198 @@
+"""
+Opt-in profiling of index builds and queries, written to PROFILE_DIR for perf tickets.
+
+    with Profiler("build_index") as prof:
+        build_index(chunks)
+    prof.out_dir  # data/profiles/build_index-20260101-120000/
+
+Every run gets its own directory:
+    profile.prof    cProfile stats (snakeviz, gprof2dot, `python -m pstats`)
+    stacks.folded   sampled stacks in collapsed format, as `py-spy record -f raw`
+                    writes them (flamegraph.pl, inferno, speedscope)
+    summary.json    wall / CPU time and memory per rag.metrics span, top functions
+    summary.txt     the same as a table plus the pstats listing
+
+Stages are the spans of rag.metrics, so a profile breaks down along the same
+lines as the production metrics: model load, encoding, FAISS, pickling, ...
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from rag import metrics
+
+PROFILE_DIR = "data/profiles"
+
+# Stack sampling interval in seconds (py-spy defaults to 100 samples/s)
+SAMPLE_INTERVAL = 0.005
+
+# cProfile and tracemalloc are process-wide: one Profiler at a time may use them (on Python >= 3.12
+# a second active cProfile raises ValueError). Concurrent ones keep the stage timings and stacks only.
+_EXCLUSIVE = threading.Lock()
+
+
+class StackSampler:
+    """Samples the Python stacks of all threads into collapsed-stack counts."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+class Profiler:
+    """
+    Profile the enclosed block into a fresh directory under out_dir.
+
+    Args:
+        name: Prefix of the run directory (build_index, query, ...)
+        out_dir: Where run directories go
+        cprofile: Deterministic profile (about 1.5-2x slowdown of pure Python code)
+        sample_interval: Stack sampling period in seconds, 0 = no flamegraph stacks
+        trace_memory: tracemalloc for per-stage Python heap growth (slow, off by default)
+        top_n: Functions listed in the summary
+
+    If another Profiler already runs cProfile / tracemalloc in this process, this one
+    goes without them and sets `busy` (Streamlit sessions share one process).
+    """
+
+    def __init__(self, name: str, out_dir: str = PROFILE_DIR, cprofile: bool = True,
+                 sample_interval: float = SAMPLE_INTERVAL, trace_memory: bool = False, top_n: int = 30):
+        self.name = name
+        self.out_dir = os.path.join(out_dir, f"{name}-{datetime.now():%Y%m%d-%H%M%S-%f}")
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self.sampler = StackSampler(sample_interval) if sample_interval else None
+        self.trace_memory = trace_memory
+        self.top_n = top_n
+        self.summary = None
+        self.trace = None
+        self.busy = False
+        self._exclusive = False
+
+    def __enter__(self) -> "Profiler":
+        if self.cprofile or self.trace_memory:
+            self._exclusive = _EXCLUSIVE.acquire(blocking=False)
+            if not self._exclusive:
+                self.busy = True
+                self.cprofile, self.trace_memory = None, False
+        if self.trace_memory:
+            tracemalloc.start()
+        self._trace_cm = metrics.trace(resources=True)
+        self.trace = self._trace_cm.__enter__()
+        if self.sampler:
+            self.sampler.start()
+        self._wall0, self._cpu0 = time.perf_counter(), time.process_time()
+        if self.cprofile:
+            self.cprofile.enable()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        if self.cprofile:
+            self.cprofile.disable()
+        wall, cpu = time.perf_counter() - self._wall0, time.process_time() - self._cpu0
+        if self.sampler:
+            self.sampler.stop()
+        self._trace_cm.__exit__(*exc)
+        if self.trace_memory:
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            traced_peak = None
+
+        self.summary = {
+            "name": self.name,
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "peak_rss_mb": round(metrics.peak_rss_mb(), 1),
+            "peak_traced_mb": round(traced_peak / 2**20, 1) if traced_peak is not None else None,
+            "stages": [{k: round(v, 3) if isinstance(v, float) else v for k, v in s.items()}
+                       for s in self.trace.stages],
+            "top_functions": self._top_functions(),
+            "failed": exc[0] is not None,
+            "busy": self.busy,
+        }
+        if self._exclusive:
+            _EXCLUSIVE.release()
+            self._exclusive = False
+        self._write()
+        return False
+
+    def _top_functions(self) -> list[dict]:
+        if not self.cprofile:
+            return []
+        stats = pstats.Stats(self.cprofile).stats
+        rows = sorted(stats.items(), key=lambda kv: -kv[1][3])[:self.top_n]
+
+
+        return [{"function": f"{func} ({os.path.basename(file)}:{line})", "calls": nc,
+                 "tottime_s": round(tt, 4), "cumtime_s": round(ct, 4)}
+                for (file, line, func), (_, nc, tt, ct, _) in rows]
+
+    def _write(self) -> None:
+        os.makedirs(self.out_dir, exist_ok=True)
+        with open(os.path.join(self.out_dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(self.summary, f, ensure_ascii=False, indent=2)
+        with open(os.path.join(self.out_dir, "summary.txt"), "w", encoding="utf-8") as f:
+            f.write(format_summary(self.summary))
+            if self.cprofile:
+                out = io.StringIO()
+                pstats.Stats(self.cprofile, stream=out).sort_stats("cumulative").print_stats(self.top_n)
+                f.write("\n" + out.getvalue())
+        if self.cprofile:
+            self.cprofile.dump_stats(os.path.join(self.out_dir, "profile.prof"))
+        if self.sampler:
+            self.sampler.write(os.path.join(self.out_dir, "stacks.folded"))
+
+
+def format_summary(summary: dict) -> str:
+    """Per-stage table of a Profiler summary."""
+    lines = [f"{summary['name']}: wall {summary['wall_s']:.2f} s, CPU {summary['cpu_s']:.2f} s, "
+             f"peak RSS {summary['peak_rss_mb']:.0f} MB", "",
+             f"{'stage':<32} {'wall ms':>10} {'cpu ms':>10} {'peak RSS MB':>12} {'heap +MB':>9}"]
+    for s in summary["stages"]:
+        alloc = f"{s['alloc_mb']:9.1f}" if "alloc_mb" in s else f"{'':>9}"
+        lines.append(f"{'  ' * s['depth'] + s['name']:<32} {s['ms']:10.1f} {s.get('cpu_ms', 0):10.1f} "
+                     f"{s.get('peak_rss_mb', 0):12.0f} {alloc}")
+
+
+    return "\n".join(lines) + "\n"
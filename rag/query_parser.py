@@ -0,0 +1,190 @@
+"""
+Rule-based query understanding: city, salary and experience constraints out of free text.
+
+    parse_query("Backend с зарплатой от 500K в Алматы", cities=["Алматы", "Астана"])
+    -> ("Backend", {"city": "Алматы", "salary_min": 500000})
+    parse_query("Vue до 500к") -> ("Vue", {"salary_max": 500000})
+
+The recognised phrases become filters (pre-filtered through the index columns)
+and are cut from the text that gets embedded, so "в Алматы" no longer pulls the
+query vector towards vacancies that merely mention the city. Only a handful of
+precompiled regexes run per query, well under a millisecond.
+"""
+
+import re
+from functools import lru_cache
+
+from config import CURRENCY_RATES
+
+# Experience values as hh names them, with the years each covers [from, to)
+EXPERIENCE_LEVELS = (
+    ("Нет опыта", 0, 1),
+    ("От 1 до 3 лет", 1, 3),
+    ("От 3 до 6 лет", 3, 6),
+    ("Более 6 лет", 6, float("inf")),
+)
+
+# Lowercased spelling -> area name as in the index (besides the names and their case forms)
+CITY_ALIASES = {
+    "almaty": "Алматы",
+    "алма-ата": "Алматы",
+    "алма-ате": "Алматы",
+    "astana": "Астана",
+    "нур-султан": "Астана",
+    "нур-султане": "Астана",
+    "shymkent": "Шымкент",
+    "karaganda": "Караганда",
+    "moscow": "Москва",
+    "мск": "Москва",
+    "spb": "Санкт-Петербург",
+    "спб": "Санкт-Петербург",
+    "питер": "Санкт-Петербург",
+    "питере": "Санкт-Петербург",
+}
+
+# Currency words -> CURRENCY_RATES code
+_CURRENCIES = {"₸": "KZT", "тг": "KZT", "тенге": "KZT", "kzt": "KZT", "₽": "RUR", "руб": "RUR", "rub": "RUR",
+               "rur": "RUR", "$": "USD", "usd": "USD", "долл": "USD", "€": "EUR", "eur": "EUR", "евро": "EUR"}
+_MULTIPLIERS = {"k": 1e3, "к": 1e3, "тыс": 1e3, "тысяч": 1e3, "m": 1e6, "м": 1e6, "млн": 1e6, "миллион": 1e6}
+
+_NUMBER = r"\d{1,3}(?:[  ]\d{3})+|\d+(?:[.,]\d+)?"
+
+_NO_EXPERIENCE = re.compile(r"(?<!\w)(?:без|нет)\s+опыта(?:\s+работы)?(?!\w)|(?<!\w)no\s+experience(?!\w)", re.I)
+_YEARS = r"(?:год(?:а|ов)?|лет)(?!\w)"
+_EXPERIENCE = re.compile(
+    # "опыт(ом) (работы) от 3 лет", "опыт 1-3 года", "опыт 5+ лет", "опыт до 2 лет"
+    rf"(?<!\w)(?:с\s+)?опыт\w*\s+(?:работы\s+)?(?:(?P<from1>от\s+)|(?P<upto1>до\s+))?(?P<lo1>\d+)\s*(?P<plus1>\+)?"
+    rf"(?:\s*(?:-|–|до)\s*(?P<hi1>\d+))?\s*{_YEARS}"
+    # "от 3 лет опыта", "3+ года опыта", "2-4 года опыта", "до 2 лет опыта"
+    rf"|(?<!\w)(?:(?P<from2>от\s+)|(?P<upto2>до\s+))?(?P<lo2>\d+)\s*(?P<plus2>\+)?"
+    rf"(?:\s*(?:-|–|до)\s*(?P<hi2>\d+))?\s*{_YEARS}"
+    rf"\s+опыт\w*(?:\s+работы)?",
+    re.I,
+)
+_SALARY = re.compile(
+    r"(?<!\w)(?:(?:с\s+)?(?P<word>зарплат\w*|з/п|зп|оклад\w*|доход\w*|salary)\s*)?"
+    r"(?:(?P<cmp>от|from|не\s+ниже|не\s+меньше|больше|выше|>=?)|(?P<upto>до|не\s+выше|не\s+больше|up\s+to|<=?))?\s*"
+    rf"(?P<num>{_NUMBER})\s*"
+    r"(?P<mult>тысяч\w*|тыс\.?|миллион\w*|млн\.?|k|к|m|м)?(?!\w)\s*"
+    r"(?P<cur>₸|тг\.?|тенге|kzt|руб\w*\.?|₽|rub|rur|\$|usd|долл\w*|€|eur|евро)?(?!\w)",
+    re.I,
+)
+_LEFTOVER = re.compile(r"\s*[,;]\s*(?=[,;]|$)|^\s*[,;]\s*|\s+(?:и|с|в|от|по)\s*$", re.I)
+
+
+def _city_forms(name: str) -> set[str]:
+    """Lowercased name and its usual Russian case forms (Астана -> Астане, Шымкент -> Шымкенте)."""
+    n = name.lower().strip()
+    forms = {n}
+    if n.endswith("а"):
+        forms |= {n[:-1] + e for e in ("е", "ы", "у", "ой")}
+    elif n.endswith("я"):
+        forms |= {n[:-1] + e for e in ("е", "и", "ю")}
+    elif n.endswith("ь"):
+        forms |= {n[:-1] + "и"}
+    elif re.match(r"[бвгджзклмнпрстфхцчшщ]", n[-1:]):
+        forms |= {n + e for e in ("е", "а", "у", "ом")}
+
+
+    return forms
+
+
+@lru_cache(maxsize=8)
+def _city_matcher(cities: tuple[str, ...]) -> tuple[re.Pattern | None, dict[str, str]]:
+    """Regex over every form of cities and CITY_ALIASES, and form -> canonical name."""
+    canonical = {}
+    for alias, name in CITY_ALIASES.items():
+        canonical[alias] = next((c for c in cities if c.lower() == name.lower()), name)
+    for city in cities:
+        if city and city.strip():
+            for form in _city_forms(city):
+                canonical[form] = city
+    if not canonical:
+        return None, canonical
+    alternatives = "|".join(re.escape(f) for f in sorted(canonical, key=len, reverse=True))
+    pattern = re.compile(rf"(?<![\w-])(?:(?:в|во|из|по|г\.|город[ае]?)\s+)?(?P<city>{alternatives})(?![\w-])", re.I)
+
+
+    return pattern, canonical
+
+
+def _experience_levels(match: re.Match) -> list[str]:
+    lo = int(match["lo1"] or match["lo2"])
+    hi = match["hi1"] or match["hi2"]
+    at_least = bool(match["from1"] or match["from2"] or match["plus1"] or match["plus2"])
+    if hi is None and (match["upto1"] or match["upto2"]):
+        # "до 2 лет": [0, 2)
+        return [name for name, a, b in EXPERIENCE_LEVELS if a < lo]
+    if hi is not None:
+        lo_y, hi_y = lo, int(hi)
+        return [name for name, a, b in EXPERIENCE_LEVELS if a < max(hi_y, lo_y + 1) and b > lo_y]
+    if at_least:
+        return [name for name, a, b in EXPERIENCE_LEVELS if b > lo]
+    return [name for name, a, b in EXPERIENCE_LEVELS if a <= lo < b]
+
+
+def _salary(match: re.Match) -> float | None:
+    """Net salary in KZT of a salary match, None if it is not a salary after all."""
+    mult = (match["mult"] or "").lower().rstrip(".")
+    if not (match["word"] or match["cmp"] or match["upto"] or mult):
+        return None
+    value = float(re.sub(r"\s", "", match["num"]).replace(",", "."))
+    if mult:
+        value *= next(m for prefix, m in _MULTIPLIERS.items() if mult.startswith(prefix))
+    elif value < 1000:
+        return None  # "от 5", "топ 10" — not a salary
+    cur = (match["cur"] or "").lower().rstrip(".")
+    code = next((c for prefix, c in _CURRENCIES.items() if cur.startswith(prefix)), "KZT") if cur else "KZT"
+
+
+    return value * CURRENCY_RATES.get(code, 1.0)
+
+
+def parse_query(query: str, cities=None) -> tuple[str, dict]:
+    """
+    Split query into the text to embed and the filters it states.
+
+    cities: area names of the index (e.g. the "area_vocab" column); matched with
+    their case forms and CITY_ALIASES. Filters use the search() keys: "city",
+    "salary_min" / "salary_max" (net KZT; "до 500к" is an upper bound) and
+    "experience" (list of EXPERIENCE_LEVELS names).
+    The text is the query without the recognised phrases, or the query itself
+    if nothing else is left.
+    """
+    filters = {}
+    text = query
+
+    m = _NO_EXPERIENCE.search(text)
+    if m:
+        filters["experience"] = [EXPERIENCE_LEVELS[0][0]]
+    else:
+        m = _EXPERIENCE.search(text)
+        if m:
+            filters["experience"] = _experience_levels(m)
+    if m:
+        text = text[:m.start()] + " " + text[m.end():]
+
+    spans = []
+    for m in _SALARY.finditer(text):
+        salary = _salary(m)
+        key = "salary_max" if m["upto"] else "salary_min"
+        if salary is not None and key not in filters:
+            filters[key] = int(round(salary))
+            spans.append(m.span())
+    for start, end in reversed(spans):
+        text = text[:start] + " " + text[end:]
+
+    pattern, canonical = _city_matcher(tuple(sorted(str(c) for c in (cities if cities is not None else ()))))
+    if pattern is not None:
+        m = pattern.search(text)
+        if m:
+            filters["city"] = canonical[m["city"].lower()]
+            text = text[:m.start()] + " " + text[m.end():]
+
+    if not filters:
+        return query, filters
+    text = " ".join(text.split())
+    text = _LEFTOVER.sub("", text).strip(" ,;")
+
+
+    return text or query, filters
@@ -0,0 +1,179 @@
+"""
+Background hot reload of the published index (see rag.versioning) for long-running processes.
+
+    reloader = IndexReloader("data/index").start()
+    snap = reloader.current   # take once per request
+    search(q, snap.index, snap.model, snap.chunks, columns=snap.columns)
+
+A poller thread watches CURRENT. A new version is loaded and verified against
+its manifest next to the live one, then swapped in by a single reference
+assignment: queries in flight keep the snapshot they took and finish on it, the
+old index is freed once the last of them lets go. Memory peaks at two indexes
+during a reload.
+
+Tombstones (rag.tombstones) are polled the same way: a changed tombstones.json
+swaps in a snapshot sharing the index with a new "deleted" column. With
+compact_threshold the poller also compacts the live version once that share
+of its chunks is deleted, and picks up the compacted version on the next check.
+"""
+
+import gc
+import json
+import logging
+import os
+import threading
+import time
+
+from rag.analytics import load_analytics
+from rag.cards import load_cards
+from rag.indexer import INDEX_DIR, build_columns, load_columns, load_index
+from rag.tombstones import apply_tombstones, compact, deleted_ratio, load_tombstones, tombstones_mtime
+from rag.versioning import VERSIONS_DIR, current_version, verify_manifest
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSnapshot:
+    """Everything loaded from one index version; never mutated after load."""
+
+    def __init__(self, version: str | None, index_dir: str, index, model, chunks: list[dict],
+                 columns: dict | None, analytics: dict | None, tombstones: int | None = None,
+                 cards: dict | None = None):
+        self.version = version
+        self.index_dir = index_dir
+        self.index = index
+        self.model = model
+        self.chunks = chunks
+        self.columns = columns
+        self.analytics = analytics
+        self.tombstones = tombstones  # tombstones.json change marker the columns were built from
+        self.cards = cards  # vacancy_id -> display card (rag.cards), None for indexes built without them
+        self.loaded_at = time.time()
+
+    def with_tombstones(self, root: str) -> "IndexSnapshot":
+        """Same index, "deleted" column rebuilt from root's current tombstones."""
+        marker = tombstones_mtime(root)
+        columns = self.columns
+        if marker is not None:
+            columns = apply_tombstones(columns if columns is not None else build_columns(self.chunks), self.chunks, root)
+        return IndexSnapshot(self.version, self.index_dir, self.index, self.model, self.chunks, columns,
+                             self.analytics, marker, cards=self.cards)
+
+
+def load_snapshot(root: str = INDEX_DIR, model=None, verify: bool = True) -> IndexSnapshot:
+    """
+    Load the live version of root.
+
+    model: encoder to reuse, unless it is known to be another model_name than the version's.
+    verify: check checksums against the manifest first (versioned roots only).
+    """
+    version = current_version(root)
+    # From the version read, not a second look at CURRENT that may have moved since
+    index_dir = os.path.join(root, VERSIONS_DIR, version) if version else root
+    if version and verify:
+        verify_manifest(index_dir)
+    with open(os.path.join(index_dir, "config.json"), "r") as f:
+        model_name = json.load(f)["model_name"]
+    if getattr(model, "_model_name", model_name) != model_name:
+        model = None
+    index, model, chunks = load_index(index_dir, model=model)
+    model._model_name = model_name
+
+
+    snapshot = IndexSnapshot(version, index_dir, index, model, chunks, load_columns(index_dir), load_analytics(index_dir),
+                             cards=load_cards(index_dir))
+
+
+    return snapshot.with_tombstones(root)
+
+
+class IndexReloader:
+    """
+    Keeps .current pointing at the live version of root.
+
+    Args:
+        root: Versioned index root
+        interval: Seconds between CURRENT checks
+        verify: Checksum a new version before swapping it in
+        model: Already loaded encoder (tests, benchmarks), loaded from the index config otherwise
+        compact_threshold: Deleted share of the live chunks that triggers compaction (None = never)
+        keep: Versions kept when publishing a compacted one
+    """
+
+    def __init__(self, root: str = INDEX_DIR, interval: float = 10.0, verify: bool = True, model=None,
+                 compact_threshold: float | None = None, keep: int | None = 3):
+        self.root = root
+        self.interval = interval
+        self.verify = verify
+        self.compact_threshold = compact_threshold
+        self.keep = keep
+        self.current = load_snapshot(root, model=model, verify=verify)
+        self.reloads = 0
+        self.last_error = None
+        self._failed_version = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self) -> bool:
+        """Reload if CURRENT moved or tombstones changed; True if a new snapshot was swapped in."""
+        with self._lock:
+            version = current_version(self.root)
+            if version is None or version == self.current.version or version == self._failed_version:
+                if tombstones_mtime(self.root) == self.current.tombstones:
+                    return False
+                # Same index, new deleted bitmap: no reload, no double memory
+                self.current = self.current.with_tombstones(self.root)
+                logger.info(f"Tombstones updated: {len(load_tombstones(self.root))} closed vacancies, "
+                            f"{deleted_ratio(self.current.columns):.1%} of {self.current.version} deleted")
+                return True
+
+            t0 = time.perf_counter()
+            try:
+                snapshot = load_snapshot(self.root, model=self.current.model, verify=self.verify)
+            except Exception as e:
+                # Anything from a bad version (IndexIntegrityError, a pickle that passes the manifest but
+                # does not load, ...): keep serving the old one; retried once CURRENT changes again
+                self._failed_version = version
+                self.last_error = f"{version}: {e}"
+                logger.error(f"Index reload failed, keeping {self.current.version}: {e}")
+                return False
+
+            old, self.current = self.current, snapshot
+            self.reloads += 1
+            self._failed_version = None
+            self.last_error = None
+            logger.info(f"Index reloaded: {old.version} -> {snapshot.version} "
+                        f"({snapshot.index.ntotal} vectors, {time.perf_counter() - t0:.1f}s)")
+
+        # Drop our reference; the old index goes as soon as in-flight requests release it
+        del old
+        gc.collect()
+        return True
+
+    def maybe_compact(self) -> str | None:
+        """Compact the live version if its deleted share passed compact_threshold; the new version or None."""
+        if self.compact_threshold is None or self.current.version is None:
+            return None
+        if deleted_ratio(self.current.columns or {}) <= self.compact_threshold:
+            return None
+        return compact(self.root, keep=self.keep)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+                if self.maybe_compact():
+                    self.check()
+            except Exception as e:  # the poller must survive anything
+                logger.exception(f"Index reload check failed: {e}")
+
+    def start(self) -> "IndexReloader":
+        self._thread = threading.Thread(target=self._run, name="index-reloader", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,51 @@
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CURRENCY_RATES, GROSS_TO_NET
+
+
+SALARY_COLUMNS = ("salary_min", "salary_max", "salary_mid")
+
+
+def salary_columns(
+    records: list[dict],
+    rates: dict = CURRENCY_RATES,
+    gross_to_net: float = GROSS_TO_NET,
+) -> dict[str, np.ndarray]:
+    """
+    Normalise raw salary fields into net BASE_CURRENCY columns.
+
+    Works on vacancies and chunks alike (both carry salary_from, salary_to,
+    salary_currency, salary_gross). Returns float64 arrays aligned with records:
+        salary_min: lower bound (salary_from, or salary_to if only that is set)
+        salary_max: upper bound (salary_to, or salary_from if only that is set)
+        salary_mid: midpoint of the range
+    NaN means no salary or an unknown currency; 0 is treated as "not specified".
+    """
+    sal_from = np.array([r.get("salary_from") or np.nan for r in records], dtype="float64")
+    sal_to = np.array([r.get("salary_to") or np.nan for r in records], dtype="float64")
+    rate = np.array([rates.get(r.get("salary_currency"), np.nan) for r in records], dtype="float64")
+    gross = np.array([bool(r.get("salary_gross")) for r in records], dtype=bool)
+
+    factor = rate * np.where(gross, gross_to_net, 1.0)
+    lo = sal_from * factor
+    hi = sal_to * factor
+
+    salary_min = np.where(np.isnan(lo), hi, lo)
+    salary_max = np.where(np.isnan(hi), lo, hi)
+
+
+    return {
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "salary_mid": (salary_min + salary_max) / 2,
+    }
+
+
+def normalize_salary(record: dict) -> dict[str, float]:
+    """Scalar version of salary_columns for a single vacancy or chunk."""
+    return {name: float(col[0]) for name, col in salary_columns([record]).items()}
@@ -0,0 +1,209 @@
+"""
+Sharded FAISS index: chunks partitioned into N IndexFlatIP shards, searched scatter-gather.
+
+Partitioning keeps every chunk of a vacancy on one shard:
+    hash — crc32(vacancy_id) % N, even sizes
+    area — whole cities per shard (largest first onto the lightest shard),
+           so a city filter only searches the shards holding that city
+
+ShardedIndex answers index.search like a single FAISS index over the global
+chunk ids (row i = chunks[i]), so rag.indexer.search_batch works unchanged.
+The shards are searched in a thread pool — FAISS releases the GIL, so shards
+run in parallel without copying vectors into worker processes — and the
+per-shard top-k lists are merged into one top-k.
+"""
+
+import os
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import faiss
+import numpy as np
+
+SHARD_BY = ("hash", "area")
+SHARDS_DIR = "shards"
+SHARDS_FILE = "shards.npz"
+
+# Score FAISS reports for missing neighbours of an inner-product index
+_MISSING = np.float32(-np.finfo(np.float32).max)
+
+
+def _normalise_area(area: str | None) -> str:
+    return (area or "").lower().strip()
+
+
+def assign_shards(chunks: list[dict], n_shards: int, shard_by: str = "hash") -> np.ndarray:
+    """Shard number of every chunk (int16)."""
+    if shard_by not in SHARD_BY:
+        raise ValueError(f"Unknown shard_by '{shard_by}'. Available: {', '.join(SHARD_BY)}")
+
+    if shard_by == "hash":
+        return np.array([zlib.crc32(str(c.get("vacancy_id")).encode()) % n_shards for c in chunks], dtype=np.int16)
+
+    # Greedy balancing of whole areas: biggest area onto the currently smallest shard
+    sizes = Counter(_normalise_area(c.get("area")) for c in chunks)
+    load = [0] * n_shards
+    area_shard = {}
+    for area, n in sorted(sizes.items(), key=lambda kv: (-kv[1], kv[0])):
+        shard = min(range(n_shards), key=lambda s: (load[s], s))
+        area_shard[area] = shard
+        load[shard] += n
+
+
+    return np.array([area_shard[_normalise_area(c.get("area"))] for c in chunks], dtype=np.int16)
+
+
+class ShardedIndex:
+    """
+    N flat shards behind the faiss.Index search interface.
+
+    Args:
+        shards: One FAISS index per shard
+        ids: Global chunk ids of every shard's rows (ids[s][j] = row j of shard s)
+        areas: Normalised area names per shard when partitioned by area (enables city pruning)
+        workers: Threads for scatter-gather (default: one per shard)
+    """
+
+    def __init__(self, shards: list[faiss.Index], ids: list[np.ndarray], areas: list[list[str]] | None = None,
+                 workers: int | None = None):
+        self.shards = shards
+        self.ids = [np.asarray(i, dtype=np.int64) for i in ids]
+        self.areas = [set(a) for a in areas] if areas is not None else None
+        self.ntotal = sum(s.ntotal for s in shards)
+        self.d = shards[0].d
+        self.workers = workers or len(shards)
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="shard") if len(shards) > 1 else None
+        # Global id -> (shard, row in the shard), for reconstruct_batch
+        self._shard_of = np.empty(self.ntotal, dtype=np.int16)
+        self._local = np.empty(self.ntotal, dtype=np.int64)
+        for s, shard_ids in enumerate(self.ids):
+            self._shard_of[shard_ids] = s
+            self._local[shard_ids] = np.arange(len(shard_ids))
+
+    @classmethod
+    def from_embeddings(cls, embeddings: np.ndarray, assignment: np.ndarray, n_shards: int,
+                        areas: list[list[str]] | None = None, workers: int | None = None) -> "ShardedIndex":
+        shards, ids = [], []
+        for s in range(n_shards):
+            rows = np.flatnonzero(assignment == s)
+            index = faiss.IndexFlatIP(embeddings.shape[1])
+            index.add(embeddings[rows])
+            shards.append(index)
+            ids.append(rows)
+
+
+        return cls(shards, ids, areas=areas, workers=workers)
+
+    @property
+    def n_shards(self) -> int:
+        return len(self.shards)
+
+    def route(self, filters: dict | None) -> tuple[int, ...] | None:
+        """Shards a query with these filters can hit (None = all)."""
+        city = (filters or {}).get("city")
+        if not city or self.areas is None:
+            return None
+
+
+        return tuple(s for s, areas in enumerate(self.areas) if _normalise_area(city) in areas)
+
+    def search(self, x: np.ndarray, k: int, mask: np.ndarray | None = None,
+               shards: tuple[int, ...] | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k over the shards: (scores, global ids), shaped (len(x), k), -1 ids where fewer hits.
+
+        mask: boolean over global ids (the column pre-filter); shards it rules out entirely are skipped
+        shards: restrict to these shards (see route())
+        """
+        nq = len(x)
+        jobs = []
+        for s in (range(self.n_shards) if shards is None else shards):
+            if not self.shards[s].ntotal:
+                continue
+            local_mask = None
+            if mask is not None:
+                local_mask = mask[self.ids[s]]
+                if not local_mask.any():
+                    continue
+            jobs.append((s, local_mask))
+
+        if not jobs:
+            return np.full((nq, k), _MISSING, dtype=np.float32), np.full((nq, k), -1, dtype=np.int64)
+
+        if self._pool is None or len(jobs) == 1:
+            parts = [self._search_shard(x, k, s, m) for s, m in jobs]
+        else:
+            parts = list(self._pool.map(lambda job: self._search_shard(x, k, *job), jobs))
+
+
+        return _merge_topk(parts, k)
+
+    def reconstruct_batch(self, ids: np.ndarray) -> np.ndarray:
+        """Stored vectors of global ids, like faiss.Index.reconstruct_batch."""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.empty((len(ids), self.d), dtype="float32")
+        shard_of = self._shard_of[ids]
+        for s in np.unique(shard_of):
+            rows = shard_of == s
+            vectors[rows] = self.shards[s].reconstruct_batch(self._local[ids[rows]])
+
+
+        return vectors
+
+    def _search_shard(self, x: np.ndarray, k: int, shard: int, mask: np.ndarray | None):
+        index = self.shards[shard]
+        if mask is None:
+            scores, local = index.search(x, min(k, index.ntotal))
+        else:
+            bitmap = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap))
+            scores, local = index.search(x, min(k, index.ntotal), params=faiss.SearchParameters(sel=selector))
+        ids = np.where(local >= 0, self.ids[shard][np.maximum(local, 0)], -1)
+
+
+        return scores, ids
+
+    def write(self, index_dir: str) -> None:
+        os.makedirs(os.path.join(index_dir, SHARDS_DIR), exist_ok=True)
+        for s, shard in enumerate(self.shards):
+            faiss.write_index(shard, os.path.join(index_dir, SHARDS_DIR, f"shard_{s:03d}.index"))
+        np.savez(os.path.join(index_dir, SHARDS_FILE), **{f"ids_{s:03d}": ids for s, ids in enumerate(self.ids)})
+
+    @classmethod
+    def read(cls, index_dir: str, n_shards: int, areas: list[list[str]] | None = None,
+             workers: int | None = None) -> "ShardedIndex":
+        shards = [faiss.read_index(os.path.join(index_dir, SHARDS_DIR, f"shard_{s:03d}.index"))
+                  for s in range(n_shards)]
+        with np.load(os.path.join(index_dir, SHARDS_FILE)) as data:
+            ids = [data[f"ids_{s:03d}"] for s in range(n_shards)]
+
+
+        return cls(shards, ids, areas=areas, workers=workers)
+
+
+def shard_areas(chunks: list[dict], assignment: np.ndarray, n_shards: int) -> list[list[str]]:
+    """Sorted normalised area names on every shard."""
+    areas = [set() for _ in range(n_shards)]
+    for c, s in zip(chunks, assignment):
+        areas[s].add(_normalise_area(c.get("area")))
+
+
+    return [sorted(a) for a in areas]
+
+
+def _merge_topk(parts: list[tuple[np.ndarray, np.ndarray]], k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Merge per-shard (scores, ids) into the global top-k per query; ties keep shard order."""
+    scores = np.concatenate([p[0] for p in parts], axis=1)
+    ids = np.concatenate([p[1] for p in parts], axis=1)
+    scores = np.where(ids >= 0, scores, _MISSING)
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    scores = np.take_along_axis(scores, order, axis=1)
+    ids = np.take_along_axis(ids, order, axis=1)
+    if ids.shape[1] < k:
+        pad = k - ids.shape[1]
+        scores = np.pad(scores, ((0, 0), (0, pad)), constant_values=_MISSING)
+        ids = np.pad(ids, ((0, 0), (0, pad)), constant_values=-1)
+
+
+    return scores, ids
@@ -0,0 +1,176 @@
+from collections import Counter, defaultdict
+
+import numpy as np
+
+# Lowercased spelling -> canonical skill name. Everything else keeps its most frequent spelling.
+SKILL_ALIASES = {
+    "postgres": "PostgreSQL",
+    "postgresql": "PostgreSQL",
+    "postgre sql": "PostgreSQL",
+    "js": "JavaScript",
+    "javascript": "JavaScript",
+    "java script": "JavaScript",
+    "ts": "TypeScript",
+    "typescript": "TypeScript",
+    "k8s": "Kubernetes",
+    "kubernetes": "Kubernetes",
+    "golang": "Go",
+    "go": "Go",
+    "python3": "Python",
+    "python 3": "Python",
+    "python": "Python",
+    "react": "React",
+    "reactjs": "React",
+    "react.js": "React",
+    "vue": "Vue.js",
+    "vuejs": "Vue.js",
+    "vue.js": "Vue.js",
+    "node": "Node.js",
+    "nodejs": "Node.js",
+    "node.js": "Node.js",
+    "mssql": "MS SQL",
+    "ms sql": "MS SQL",
+    "ms sql server": "MS SQL",
+    "1c": "1С",
+    "1с": "1С",
+    "1с: предприятие": "1С",
+    "1с:предприятие": "1С",
+    "ml": "Machine Learning",
+    "машинное обучение": "Machine Learning",
+    "machine learning": "Machine Learning",
+    "английский язык": "Английский язык",
+    "english": "Английский язык",
+    "ci/cd": "CI/CD",
+    "rest": "REST API",
+    "rest api": "REST API",
+    "restful api": "REST API",
+}
+
+
+def skill_key(name: str) -> str:
+    """Matching key of a skill: lowercased, whitespace collapsed, aliases resolved."""
+    key = " ".join(name.lower().split())
+    alias = SKILL_ALIASES.get(key)
+
+
+    return alias.lower() if alias else key
+
+
+def split_skills(key_skills: str | None) -> list[str]:
+    """Parser joins key_skills with ", " — split them back."""
+    return [s.strip() for s in (key_skills or "").split(",") if s.strip()]
+
+
+def build_skill_matrix(skill_lists: list[list[str]]) -> dict[str, np.ndarray]:
+    """
+    Normalised vocabulary + sparse vacancy x skill matrix.
+
+    Args:
+        skill_lists: Raw key_skills of every vacancy, row i = vacancy i
+
+    Returns dict of arrays (saved with the index columns):
+        skill_vocab: canonical skill names, id = position
+        skill_indptr, skill_indices: CSR rows (vacancy -> skill ids), for facets
+        skill_postings_indptr, skill_postings: CSC columns (skill -> sorted vacancy rows), for filters
+        skill_keys, skill_key_ids: sorted matching keys and their skill ids, for lookups
+    """
+    ids = {}
+    spellings = defaultdict(Counter)
+    row_ids = []
+
+    for skills in skill_lists:
+        row = set()
+        for raw in skills:
+            key = skill_key(raw)
+            sid = ids.setdefault(key, len(ids))
+            spellings[sid][SKILL_ALIASES.get(" ".join(raw.lower().split()), raw)] += 1
+            row.add(sid)
+        row_ids.append(sorted(row))
+
+    vocab = [spellings[sid].most_common(1)[0][0] for sid in range(len(ids))]
+    keys = np.array(list(ids), dtype=str)  # dicts keep insertion order, so keys[sid] is the key of sid
+    key_order = np.argsort(keys)
+
+    lengths = np.fromiter((len(r) for r in row_ids), dtype=np.int64, count=len(row_ids))
+    indptr = np.zeros(len(row_ids) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter((s for r in row_ids for s in r), dtype=np.int32, count=int(indptr[-1]))
+
+    # Transpose: stable sort by skill id keeps vacancy rows sorted within each posting list
+    rows = np.repeat(np.arange(len(row_ids), dtype=np.int32), lengths)
+    order = np.argsort(indices, kind="stable")
+    postings_indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=len(vocab)), out=postings_indptr[1:])
+
+
+    return {
+        "skill_vocab": np.array(vocab, dtype=str),
+        "skill_indptr": indptr,
+        "skill_indices": indices,
+        "skill_postings_indptr": postings_indptr,
+        "skill_postings": rows[order],
+        "skill_keys": keys[key_order],
+        "skill_key_ids": key_order.astype(np.int32),
+    }
+
+
+def skill_ids(columns: dict[str, np.ndarray], names: list[str]) -> list[int]:
+    """Vocabulary ids of the given skill names (-1 for unknown skills)."""
+    keys = columns["skill_keys"]
+    result = []
+    for name in names:
+        key = skill_key(name)
+        pos = int(np.searchsorted(keys, key))
+        found = pos < len(keys) and keys[pos] == key
+        result.append(int(columns["skill_key_ids"][pos]) if found else -1)
+
+
+    return result
+
+
+def skills_vacancy_mask(columns: dict[str, np.ndarray], names: list[str]) -> np.ndarray:
+    """Bitmap of vacancies having ALL the given skills."""
+    n_vacancies = len(columns["skill_indptr"]) - 1
+    postings_indptr = columns["skill_postings_indptr"]
+    mask = np.ones(n_vacancies, dtype=bool)
+
+    for sid in skill_ids(columns, names):
+        if sid < 0:
+            return np.zeros(n_vacancies, dtype=bool)
+        has = np.zeros(n_vacancies, dtype=bool)
+        has[columns["skill_postings"][postings_indptr[sid]:postings_indptr[sid + 1]]] = True
+        mask &= has
+
+
+    return mask
+
+
+def top_skills(columns: dict[str, np.ndarray], vacancy_rows: np.ndarray, n: int = 20) -> list[tuple[str, int]]:
+    """Most frequent skills among the given vacancy rows (a result set or a filter match)."""
+    indptr = columns["skill_indptr"]
+    n_vacancies = len(indptr) - 1
+    vacancy_rows = np.asarray(vacancy_rows, dtype=np.int64)
+
+    if len(vacancy_rows) * 50 > n_vacancies:
+        # Large sets: expand a row bitmap onto the non-zeros, one linear pass
+        row_mask = np.zeros(n_vacancies, dtype=bool)
+        row_mask[vacancy_rows] = True
+        ids = columns["skill_indices"][np.repeat(row_mask, np.diff(indptr))]
+    else:
+        # Small sets (a page of results): gather the CSR slices of the rows at once
+        vacancy_rows = np.unique(vacancy_rows)
+        starts = indptr[vacancy_rows]
+        lengths = indptr[vacancy_rows + 1] - starts
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        ids = columns["skill_indices"][np.repeat(starts, lengths) + offsets]
+
+    if len(ids) == 0:
+        return []
+
+    counts = np.bincount(ids, minlength=len(columns["skill_vocab"]))
+    n = min(n, int((counts > 0).sum()))
+    top = np.argpartition(-counts, n - 1)[:n]
+    top = top[np.lexsort((top, -counts[top]))]
+
+
+    return [(str(columns["skill_vocab"][i]), int(counts[i])) for i in top]
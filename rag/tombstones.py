@@ -0,0 +1,281 @@
+"""
+Vacancy expiry without a rebuild: tombstones, a deleted-row bitmap and compaction.
+
+    data/index/
+        tombstones.json    {"<vacancy_id>": {"reason": "archived", "at": "2026-..."},
+                            "<vacancy_id>": {"reason": "expired", "at": "...", "published_at": "2025-..."}, ...}
+        CURRENT, versions/ (rag.versioning)
+
+An expiry pass marks closed vacancies — archived or removed on hh (checked
+through the API, rate-limited and in batches) or simply older than
+max_age_days — in tombstones.json next to CURRENT, so it applies to whatever
+version is live. apply_tombstones turns it into a boolean "deleted" column
+that search masks out of every query; nothing is re-embedded. An age
+tombstone records the published_at it expired: a vacancy republished under
+the same id (newer published_at) is live again.
+
+Once the deleted share of the live version passes a threshold, compact()
+publishes a new version with those rows dropped: vectors are copied out of
+the flat index, chunks and columns are rebuilt, analytics.json and cards.pkl
+are carried over as built (analytics still counts the removed vacancies until
+the next full build).
+Tombstones are kept after compaction, a rebuild from an old dump does not
+bring closed vacancies back; compact() prunes the ones whose vacancy is in
+none of the versions kept under versions/, so the file does not grow forever.
+"""
+
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+import requests
+
+from config import BASE_URL
+from parser.api import RateLimiter, fetch_vacancy_state
+from rag.cards import CARDS_FILE
+from rag.freshness import published_column, to_timestamp
+from rag.indexer import index_vectors, read_index, save_index
+from rag.versioning import VERSIONS_DIR, current_version, list_versions, new_version_dir, publish, write_manifest
+
+logger = logging.getLogger(__name__)
+
+TOMBSTONES_FILE = "tombstones.json"
+# Deleted share of the live version's chunks above which it is compacted
+COMPACT_THRESHOLD = 0.2
+# Vacancies checked through the API between two tombstone writes
+EXPIRY_BATCH = 200
+
+# tombstones.json is rewritten whole: one writer per process at a time
+_write_lock = threading.Lock()
+
+
+def load_tombstones(root: str) -> dict[str, dict]:
+    """vacancy_id -> {"reason", "at"[, "published_at"]} of root ({} if none)."""
+    path = os.path.join(root, TOMBSTONES_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_tombstones(root: str, tombstones: dict) -> None:
+    tmp = os.path.join(root, f"{TOMBSTONES_FILE}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(tombstones, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(root, TOMBSTONES_FILE))
+
+
+def add_tombstones(root: str, vacancy_ids, reason: str, published: dict[str, str] | None = None) -> int:
+    """
+    Tombstone vacancy_ids (atomic rewrite); returns how many were new or renewed.
+
+    published: vacancy_id -> the published_at being expired. Such a tombstone hides only
+    chunks published no later, and replaces an existing tombstone of the vacancy.
+    """
+    with _write_lock:
+        tombstones = load_tombstones(root)
+        at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        added = 0
+        for vid in map(str, vacancy_ids):
+            published_at = (published or {}).get(vid)
+            if vid in tombstones and published_at is None:
+                continue
+            tombstones[vid] = {"reason": reason, "at": at}
+            if published_at is not None:
+                tombstones[vid]["published_at"] = published_at
+            added += 1
+        if added:
+            _save_tombstones(root, tombstones)
+
+
+    return added
+
+
+def prune_tombstones(root: str) -> int:
+    """
+    Drop tombstones of vacancies in none of root's versions; returns how many.
+
+    Nothing is pruned while a version's chunks cannot be read (a build in progress).
+    """
+    live = set()
+    for name in list_versions(root):
+        try:
+            with open(os.path.join(root, VERSIONS_DIR, name, "chunks.pkl"), "rb") as f:
+                live.update(str(c.get("vacancy_id")) for c in pickle.load(f))
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            logger.info(f"Not pruning tombstones, version {name} is unreadable: {e}")
+            return 0
+    if not live:
+        return 0
+    with _write_lock:
+        tombstones = load_tombstones(root)
+        kept = {vid: t for vid, t in tombstones.items() if vid in live}
+        if len(kept) < len(tombstones):
+            _save_tombstones(root, kept)
+
+
+    return len(tombstones) - len(kept)
+
+
+def tombstones_mtime(root: str) -> int | None:
+    """Change marker of tombstones.json (None if absent) — cheap enough to poll."""
+    try:
+        return os.stat(os.path.join(root, TOMBSTONES_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _vacancy_ids(chunks: list[dict], vacancy_row: np.ndarray) -> list[str]:
+    """Vacancy id of every vacancy_row."""
+    ids = [None] * (int(vacancy_row.max()) + 1 if len(vacancy_row) else 0)
+    for c, row in zip(chunks, vacancy_row):
+        ids[row] = str(c.get("vacancy_id"))
+    return ids
+
+
+def _covers(tombstone: dict, published_ts: float) -> bool:
+    """The tombstone applies to a vacancy published at published_ts (unknown dates stay dead)."""
+    expired = tombstone.get("published_at")
+    return expired is None or not published_ts > to_timestamp(expired)
+
+
+def deleted_mask(chunks: list[dict], columns: dict[str, np.ndarray], tombstones: dict) -> np.ndarray:
+    """Boolean per chunk: its vacancy is tombstoned (and not republished since, for age tombstones)."""
+    if not tombstones:
+        return np.zeros(len(chunks), dtype=bool)
+    vacancy_row = columns["vacancy_row"]
+    published_ts = columns.get("published_ts")
+    if published_ts is None:
+        published_ts = published_column(chunks)
+    row_ts = np.full(int(vacancy_row.max()) + 1 if len(vacancy_row) else 0, np.nan)
+    row_ts[vacancy_row] = published_ts  # chunks of a vacancy share its published_at
+    dead = np.array([vid in tombstones and _covers(tombstones[vid], ts)
+                     for vid, ts in zip(_vacancy_ids(chunks, vacancy_row), row_ts)], dtype=bool)
+
+
+    return dead[vacancy_row]
+
+
+def apply_tombstones(columns: dict[str, np.ndarray], chunks: list[dict], root: str) -> dict[str, np.ndarray]:
+    """columns plus the "deleted" bitmap from root's tombstones (a new dict, columns is not modified)."""
+    return {**columns, "deleted": deleted_mask(chunks, columns, load_tombstones(root))}
+
+
+def expire_by_age(root: str, chunks: list[dict], max_age_days: float, now: float | None = None) -> list[str]:
+    """Tombstone vacancies published more than max_age_days ago; returns the new ones."""
+    now = datetime.now(timezone.utc).timestamp() if now is None else now
+    tombstones = load_tombstones(root)
+    published_ts = published_column(chunks)
+    old = {}
+    for c, ts in zip(chunks, published_ts):
+        vid = str(c.get("vacancy_id"))
+        if ts < now - max_age_days * 86400 and not (vid in tombstones and _covers(tombstones[vid], ts)):
+            old[vid] = c.get("published_at")
+    add_tombstones(root, sorted(old), "expired", published=old)
+
+
+    return sorted(old)
+
+
+def expire_via_api(
+    root: str,
+    chunks: list[dict],
+    base_url: str = BASE_URL,
+    limiter: Optional[RateLimiter] = None,
+    workers: int = 4,
+    batch_size: int = EXPIRY_BATCH,
+    limit: int | None = None,
+) -> dict[str, int]:
+    """
+    Ask hh for the state of every live vacancy and tombstone the archived / removed ones.
+
+    Requests share one RateLimiter across workers threads; tombstones are written
+    after every batch, so an interrupted pass keeps what it found. Vacancies
+    whose request failed stay live. limit: check at most this many (in index order).
+    Returns counts per state ("open", "archived", "gone", "failed").
+    """
+    limiter = limiter or RateLimiter()
+    dead = load_tombstones(root).keys()
+    ids = list(dict.fromkeys(str(c.get("vacancy_id")) for c in chunks if str(c.get("vacancy_id")) not in dead))
+    ids = ids[:limit] if limit is not None else ids
+
+    counts = {"open": 0, "archived": 0, "gone": 0, "failed": 0}
+    session = requests.Session()
+    with ThreadPoolExecutor(workers) as pool:
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            states = list(pool.map(lambda vid: fetch_vacancy_state(vid, base_url, limiter, session), batch))
+            for state in states:
+                counts[state or "failed"] += 1
+            for reason in ("archived", "gone"):
+                add_tombstones(root, [vid for vid, state in zip(batch, states) if state == reason], reason)
+            logger.info(f"Checked {start + len(batch)}/{len(ids)} vacancies: "
+                        f"{counts['archived'] + counts['gone']} closed, {counts['failed']} failed")
+
+
+    return counts
+
+
+def deleted_ratio(columns: dict[str, np.ndarray]) -> float:
+    deleted = columns.get("deleted")
+    return float(deleted.mean()) if deleted is not None and len(deleted) else 0.0
+
+
+def compact(root: str, keep: int | None = 3) -> str | None:
+    """
+    Publish a copy of the live version without tombstoned rows; returns the new version
+    (None if there was nothing to drop or another build was published meanwhile).
+
+    Only for versioned roots: readers switch over through CURRENT like after a build.
+    Tombstones of vacancies no kept version holds any more are pruned afterwards.
+    """
+    source = current_version(root)
+    if source is None:
+        raise ValueError(f"{root} is not a versioned index root, rebuild it with build_index.py")
+    source_dir = os.path.join(root, VERSIONS_DIR, source)
+    index, chunks, config = read_index(source_dir)
+    with np.load(os.path.join(source_dir, "columns.npz")) as data:
+        columns = {name: data[name] for name in ("vacancy_row", "published_ts") if name in data}
+    deleted = deleted_mask(chunks, columns, load_tombstones(root))
+    if not deleted.any():
+        return None
+
+    keep_rows = np.flatnonzero(~deleted)
+    vectors = index_vectors(index)[keep_rows]
+    del index
+
+    version_dir = new_version_dir(root)
+    try:
+        save_index(vectors, [chunks[i] for i in keep_rows], version_dir, model_name=config["model_name"],
+                   is_e5=config.get("is_e5", False), shards=config.get("shards", 1),
+                   shard_by=config.get("shard_by", "hash"), fields=config.get("fields"))
+        for name in ("analytics.json", CARDS_FILE):
+            if os.path.exists(os.path.join(source_dir, name)):
+                shutil.copy2(os.path.join(source_dir, name), version_dir)
+        write_manifest(version_dir)
+        if current_version(root) != source:
+            # A fresh build was published meanwhile: it wins, compacting it is the next pass's job
+            logger.info(f"{source} was replaced while compacting, dropping the compacted copy")
+            shutil.rmtree(version_dir, ignore_errors=True)
+            return None
+        version = publish(root, version_dir, keep=keep)
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    logger.info(f"Compacted {source} -> {version}: "
+                f"dropped {int(deleted.sum())} of {len(deleted)} chunks")
+    pruned = prune_tombstones(root)
+    if pruned:
+        logger.info(f"Pruned {pruned} tombstones of vacancies no kept version holds")
+
+
+    return version
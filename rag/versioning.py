@@ -0,0 +1,160 @@
+"""
+Versioned index directories with an atomic CURRENT pointer.
+
+    data/index/
+        CURRENT                       name of the live version (replaced atomically)
+        versions/
+            v20260101-120000-000000/  vacancies.index, chunks.pkl, columns.npz, ...
+                manifest.json         sha256 + size of every file of the version
+            v20260102-120000-000000/
+
+build_index.py builds into a fresh version, writes its manifest and only then
+swaps CURRENT, so a reader sees either the old or the new index, never a mix.
+resolve_index_dir() maps the root to the live version; a root without CURRENT
+(the old flat layout) resolves to itself.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+MANIFEST_FILE = "manifest.json"
+
+
+class IndexIntegrityError(ValueError):
+    """A version's files do not match its manifest (torn copy, disk error, manual edit)."""
+
+
+def current_version(root: str) -> str | None:
+    path = os.path.join(root, CURRENT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip() or None
+
+
+def resolve_index_dir(path: str) -> str:
+    """Directory holding the index files: the live version of a versioned root, else path itself."""
+    version = current_version(path)
+
+
+    return os.path.join(path, VERSIONS_DIR, version) if version else path
+
+
+def new_version_dir(root: str) -> str:
+    """Fresh, not yet published version directory under root."""
+    base = f"v{datetime.now():%Y%m%d-%H%M%S-%f}"
+    name, n = base, 1
+    while os.path.exists(os.path.join(root, VERSIONS_DIR, name)):
+        n += 1
+        name = f"{base}-{n}"
+    path = os.path.join(root, VERSIONS_DIR, name)
+    os.makedirs(path)
+
+
+    return path
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _index_files(version_dir: str) -> list[str]:
+    files = []
+    for dirpath, _, names in os.walk(version_dir):
+        for name in names:
+            rel = os.path.relpath(os.path.join(dirpath, name), version_dir)
+            if rel != MANIFEST_FILE:
+                files.append(rel.replace(os.sep, "/"))
+    return sorted(files)
+
+
+def write_manifest(version_dir: str) -> dict:
+    """Checksum every file of version_dir into its manifest.json."""
+    manifest = {
+        "version": os.path.basename(os.path.normpath(version_dir)),
+        "created_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "files": {rel: {"sha256": _sha256(os.path.join(version_dir, rel)),
+                        "bytes": os.path.getsize(os.path.join(version_dir, rel))}
+                  for rel in _index_files(version_dir)},
+    }
+    with open(os.path.join(version_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+    return manifest
+
+
+def verify_manifest(version_dir: str, checksums: bool = True) -> dict:
+    """
+    Check version_dir against its manifest; raises IndexIntegrityError.
+
+    checksums=False only compares file sizes (fast enough for every load).
+    """
+    path = os.path.join(version_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        raise IndexIntegrityError(f"{version_dir}: no {MANIFEST_FILE}")
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    for rel, expected in manifest["files"].items():
+        file = os.path.join(version_dir, rel)
+        if not os.path.exists(file):
+            raise IndexIntegrityError(f"{version_dir}: {rel} is missing")
+        if os.path.getsize(file) != expected["bytes"]:
+            raise IndexIntegrityError(f"{version_dir}: {rel} has {os.path.getsize(file)} bytes, "
+                                      f"manifest says {expected['bytes']}")
+        if checksums and _sha256(file) != expected["sha256"]:
+            raise IndexIntegrityError(f"{version_dir}: {rel} checksum mismatch")
+
+
+    return manifest
+
+
+def list_versions(root: str) -> list[str]:
+    """Version names under root, oldest first."""
+    path = os.path.join(root, VERSIONS_DIR)
+    if not os.path.isdir(path):
+        return []
+    return sorted(name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name)))
+
+
+def publish(root: str, version_dir: str, keep: int | None = 3) -> str:
+    """
+    Verify version_dir, point CURRENT at it atomically, drop old versions beyond keep (None = keep all).
+
+    Returns the published version name. The previous version is always kept,
+    so a reader that resolved it just before the swap can finish loading.
+    """
+    version = os.path.basename(os.path.normpath(version_dir))
+    if os.path.abspath(os.path.dirname(os.path.normpath(version_dir))) != \
+            os.path.abspath(os.path.join(root, VERSIONS_DIR)):
+        raise ValueError(f"{version_dir} is not a version of {root}")
+    verify_manifest(version_dir)
+    previous = current_version(root)
+
+    tmp = os.path.join(root, f"{CURRENT_FILE}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(root, CURRENT_FILE))
+
+    if keep:
+        # Names sort by build time: drop all but the newest `keep`
+        for name in list_versions(root)[:-keep]:
+            if name not in (version, previous):
+                shutil.rmtree(os.path.join(root, VERSIONS_DIR, name), ignore_errors=True)
+
+
+    return version
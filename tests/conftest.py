@@ -1,11 +1,18 @@
 
 import sys
 import os
+
+import faiss
+import numpy as np
 import pytest
  
 # Ensure project root is importable
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+from rag.analytics import save_analytics
+from rag.indexer import build_index
+from rag.versioning import new_version_dir, publish, write_manifest
+
 
 @pytest.fixture
 def sample_vacancy():
@@ -65,3 +72,49 @@ def sample_vacancies(sample_vacancy):
 
 
     return [sample_vacancy, v2, v3]
+
+
+class FakeModel:
+    """Deterministic stand-in for SentenceTransformer: one axis per known word."""
+
+    VOCAB = ["python", "java", "data"]
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        vecs = np.array([[t.lower().count(w) + 0.01 for w in self.VOCAB] for t in texts], dtype="float32")
+        return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def fake_model():
+    return FakeModel()
+
+
+@pytest.fixture
+def fake_index(fake_model):
+    chunks = [
+        {"vacancy_id": "1", "text": "python python", "area": "Алматы", "salary_from": 300000,
+         "salary_currency": "KZT", "key_skills": "Python, Django"},
+        {"vacancy_id": "2", "text": "python", "area": "Астана", "salary_from": 900000,
+         "salary_currency": "KZT", "key_skills": "Python, FastAPI"},
+        {"vacancy_id": "3", "text": "java", "area": "Алматы", "salary_from": 700000,
+         "salary_currency": "KZT", "key_skills": "Java, Spring"},
+        {"vacancy_id": "4", "text": "data", "area": "Алматы", "salary_from": None,
+         "salary_currency": None, "key_skills": "Python, Pandas"},
+    ]
+    index = faiss.IndexFlatIP(len(FakeModel.VOCAB))
+    index.add(fake_model.encode([c["text"] for c in chunks]))
+    return index, fake_model, chunks
+
+
+@pytest.fixture
+def publish_build(fake_model):
+    """publish_build(root, chunks, keep=3): build a fake-model index as a new version and make it live."""
+    def _publish_build(root, chunks, keep=3) -> str:
+        version_dir = new_version_dir(str(root))
+        build_index(chunks, model_name="fake", index_dir=version_dir, model=fake_model)
+        save_analytics({"n_vacancies": len(chunks)}, version_dir)
+        write_manifest(version_dir)
+        return publish(str(root), version_dir, keep=keep)
+
+
+    return _publish_build
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from rag.aggregates import answer_aggregate, detect_intent, vacancy_table
+from rag.indexer import search
+from rag.pipeline import rag_query
+
+
+def _vacancy(vid, name, employer, area, salary_from=None, salary_to=None, skills="", chunks=1):
+    return [{"vacancy_id": vid, "vacancy_name": name, "employer": employer, "area": area,
+             "salary_from": salary_from, "salary_to": salary_to, "salary_currency": "KZT" if salary_from else None,
+             "key_skills": skills, "text": f"{name} часть {i}"} for i in range(chunks)]
+
+
+@pytest.fixture
+def chunks():
+    return [
+        *_vacancy("1", "Python разработчик", "Kaspi", "Алматы", 400000, 600000, "Python, Django", chunks=3),
+        *_vacancy("2", "Senior Python Developer", "Kaspi", "Алматы", 800000, None, "python, FastAPI, Docker"),
+        *_vacancy("3", "Python backend", "Kolesa", "Алматы", None, None, "Python, PostgreSQL"),
+        *_vacancy("4", "Python разработчик", "Halyk", "Астана", 1000000, 1200000, "Python"),
+        *_vacancy("5", "DevOps инженер", "Kolesa", "Алматы", 700000, 900000, "Docker, Kubernetes", chunks=2),
+        *_vacancy("6", "Java-разработчик", "Halyk", "Алматы", 600000, None, "Java, Spring"),
+    ]
+
+
+class TestDetectIntent:
+    @pytest.mark.parametrize("question, intent", [
+        ("средняя зарплата Python в Алматы", "salary"),
+        ("Сколько платят DevOps?", "salary"),
+        ("какие компании нанимают DevOps", "employers"),
+        ("Кто больше всего ищет Java-разработчиков", "employers"),
+        ("Навыки для Data Science", "skills"),
+        ("какие технологии чаще требуют в backend", "skills"),
+        ("В каких городах больше всего вакансий Go", "cities"),
+        ("сколько вакансий Python в Астане", "count"),
+    ])
+    def test_aggregate_questions(self, question, intent):
+        assert detect_intent(question) == intent
+
+    @pytest.mark.parametrize("question", [
+        "Python-разработчик в Алматы", "Backend с зарплатой от 500K", "Сравни требования ML-вакансий", "",
+    ])
+    def test_plain_searches(self, question):
+        assert detect_intent(question) is None
+
+
+class TestVacancyTable:
+    def test_one_row_per_vacancy(self, chunks):
+        table = vacancy_table(chunks)
+        assert table["vacancy_id"].tolist() == ["1", "2", "3", "4", "5", "6"]
+        assert table.loc[0, "salary_mid"] == 500000 and np.isnan(table.loc[2, "salary_mid"])
+        assert table.loc[1, "skills"] == ["python", "fastapi", "docker"]
+        assert table.attrs["skill_names"]["python"] == "Python"
+
+    def test_deleted_dropped(self, chunks):
+        deleted = np.zeros(len(chunks), dtype=bool)
+        deleted[:3] = True  # every chunk of vacancy 1
+        assert "1" not in vacancy_table(chunks, {"deleted": deleted})["vacancy_id"].tolist()
+
+
+class TestAnswerAggregate:
+    def test_salary_over_all_matches(self, chunks):
+        result = answer_aggregate("средняя зарплата Python в Алматы", vacancy_table(chunks))
+        assert result["intent"] == "salary" and result["filters"] == {"city": "Алматы"}
+        assert result["topic"] == "Python" and result["n"] == 3
+        # Midpoints 500k and 800k; vacancy 3 has no salary
+        assert result["salary"]["n"] == 2 and result["salary"]["median"] == 650000
+        assert result["employers"] == [("Kaspi", 2), ("Kolesa", 1)]
+        assert "медиана 650 000" in result["answer"] and "вакансий: 3" in result["table"]
+
+    def test_employers_and_skills(self, chunks):
+        table = vacancy_table(chunks)
+        result = answer_aggregate("какие компании нанимают Python", table)
+        assert result["intent"] == "employers" and result["n"] == 4
+        assert result["employers"][0] == ("Kaspi", 2)
+        assert result["answer"].splitlines()[2].startswith("- Компании: Kaspi (2)")
+        assert answer_aggregate("Какие навыки нужны DevOps", table)["skills"] == [("Docker", 1), ("Kubernetes", 1)]
+
+    def test_inflected_topic(self, chunks):
+        result = answer_aggregate("сколько вакансий Java-разработчика", vacancy_table(chunks))
+        assert result["n"] == 1 and result["employers"] == [("Halyk", 1)]
+
+    def test_explicit_filters_win(self, chunks):
+        table = vacancy_table(chunks)
+        assert answer_aggregate("сколько вакансий Python в Алматы", table, filters={"city": "Астана"})["n"] == 1
+        assert answer_aggregate("сколько вакансий Python", table, filters={"salary_min": 700000})["n"] == 2
+
+    def test_no_matches(self, chunks):
+        result = answer_aggregate("средняя зарплата Rust", vacancy_table(chunks))
+        assert result["n"] == 0 and result["salary"] is None and "0 вакансий" in result["answer"]
+
+    def test_not_aggregate(self, chunks):
+        assert answer_aggregate("Python разработчик в Алматы", vacancy_table(chunks)) is None
+
+
+class TestRagQuery:
+    def test_exact_answer_in_context(self, fake_index):
+        index, model, chunks = fake_index
+        table = vacancy_table(chunks)
+        response = rag_query("какая средняя зарплата python", index, model, chunks, llm_backend="none",
+                             top_k=1, table=table)
+        assert response["aggregate"]["n"] == 3
+        assert response["context"].startswith(response["aggregate"]["table"])
+        assert response["answer_source"] == "aggregate" and response["answer"] == response["aggregate"]["answer"]
+
+    def test_precomputed_results_and_aggregate(self, fake_index, monkeypatch):
+        index, model, chunks = fake_index
+        table = vacancy_table(chunks)
+        question = "какая средняя зарплата python"
+        aggregate = answer_aggregate(question, table)
+        results = search(question, index, model, chunks, top_k=1)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("computed twice")
+        monkeypatch.setattr("rag.pipeline.search", fail)
+        monkeypatch.setattr("rag.pipeline.answer_aggregate", fail)
+        response = rag_query(question, index, model, chunks, llm_backend="none", results=results,
+                             aggregate=aggregate)
+        assert response["aggregate"] is aggregate and response["n_results"] == len(results)
+        assert response["context"].startswith(aggregate["table"])
+
+    def test_plain_question_unchanged(self, fake_index):
+        index, model, chunks = fake_index
+        response = rag_query("python", index, model, chunks, llm_backend="none", table=vacancy_table(chunks))
+        assert response["aggregate"] is None and response["answer_source"] == "extractive"
@@ -0,0 +1,65 @@
+from rag.analytics import compute_analytics, save_analytics, load_analytics, FieldCounter
+
+
+class TestComputeAnalytics:
+    def test_counts(self, sample_vacancies):
+        a = compute_analytics(sample_vacancies)
+        assert a["n_vacancies"] == 3
+        assert dict(a["cities"]["top"]) == {"Алматы": 2, "Астана": 1}
+        assert a["companies"]["n_distinct"] == 3
+
+    def test_skills_from_structured_field(self, sample_vacancies):
+        a = compute_analytics(sample_vacancies)
+        skills = dict(a["skills"]["top"])
+        assert skills["Python"] == 2
+        assert skills["React"] == 1
+
+    def test_skills_counted_by_key(self):
+        a = compute_analytics([{"key_skills": "Python, SQL"}, {"key_skills": "python,  sql "},
+                               {"key_skills": "PYTHON, Python"}])
+        assert a["skills"]["n_distinct"] == 2
+        assert a["skills"]["top"] == [["Python", 3], ["SQL", 2]]
+
+    def test_salary_stats(self, sample_vacancies):
+        sal = compute_analytics(sample_vacancies)["salaries"]
+        assert sal["n_with_salary"] == 3
+        # Midpoints: 650000, 700000 gross -> 567000 net, 350000
+        assert sal["min"] == 350000
+        assert sal["max"] == 650000
+        assert sal["median"] == 567000
+        assert sum(sal["histogram"]["counts"]) == 3
+
+    def test_salary_converted_to_base_currency(self):
+        sal = compute_analytics([{"salary_from": 1000, "salary_currency": "USD"}])["salaries"]
+        assert sal["currency"] == "KZT"
+        assert sal["median"] == 510000
+
+    def test_unknown_currency_skipped(self):
+        sal = compute_analytics([{"salary_from": 1000, "salary_currency": "XXX"}])["salaries"]
+        assert sal["n_with_salary"] == 1
+        assert sal["n"] == 0
+
+    def test_empty(self):
+        a = compute_analytics([])
+        assert a["n_vacancies"] == 0
+        assert a["salaries"]["n"] == 0
+        assert a["skills"]["top"] == []
+
+    def test_accepts_generator(self, sample_vacancies):
+        a = compute_analytics(v for v in sample_vacancies)
+        assert a["n_vacancies"] == 3
+
+    def test_custom_slice(self, sample_vacancies):
+        a = compute_analytics(sample_vacancies, slices={"exp": lambda: FieldCounter("experience")})
+        assert a["exp"]["n_distinct"] == 3
+        assert "cities" not in a
+
+
+class TestAnalyticsStorage:
+    def test_roundtrip(self, tmp_path, sample_vacancies):
+        a = compute_analytics(sample_vacancies)
+        save_analytics(a, str(tmp_path))
+        assert load_analytics(str(tmp_path)) == a
+
+    def test_missing_file(self, tmp_path):
+        assert load_analytics(str(tmp_path)) is None
@@ -0,0 +1,52 @@
+from benchmarks.synthetic import generate_vacancies
+from rag.cards import CARDS_FILE, format_salary, load_cards, result_cards, save_cards, vacancy_card
+from rag.chunker import chunk_documents, vacancy_to_document
+from rag.reloader import load_snapshot
+from rag.tombstones import add_tombstones, compact
+from rag.versioning import list_versions
+
+
+class TestCards:
+    def test_format_salary(self):
+        assert format_salary(300000, 500000, "KZT") == "от 300,000 до 500,000 KZT"
+        assert format_salary(None, 500000, "KZT") == "до 500,000 KZT"
+        assert format_salary(None, None, "KZT") == ""
+
+    def test_full_text_not_a_fragment(self):
+        vacancy = next(iter(generate_vacancies(1, seed=2, description_sentences=(20, 20))))
+        chunks = chunk_documents([vacancy], max_chunk_length=300)
+        card = vacancy_card(vacancy)
+        assert len(chunks) > 1
+        assert card["text"] == vacancy_to_document(vacancy)
+        assert card["vacancy_id"] == vacancy["id"] and card["employer"] in card["subtitle"]
+
+    def test_result_cards(self):
+        vacancies = list(generate_vacancies(3, seed=1))
+        cards = {v["id"]: vacancy_card(v) for v in vacancies[:2]}
+        chunks = chunk_documents(vacancies, max_chunk_length=300)
+        results = [dict(c, score=1 - i / len(chunks)) for i, c in enumerate(chunks)]
+        out = result_cards(results, cards)
+        assert [c["vacancy_id"] for c in out] == list(dict.fromkeys(r["vacancy_id"] for r in results))
+        assert out[0]["score"] == results[0]["score"]
+        assert out[0]["text"] == cards[out[0]["vacancy_id"]]["text"]
+        # No card stored (older index): falls back to the chunk
+        last = next(c for c in out if c["vacancy_id"] == vacancies[2]["id"])
+        assert last["text"] == next(r["text"] for r in results if r["vacancy_id"] == vacancies[2]["id"])
+        assert "score" not in cards[out[0]["vacancy_id"]]
+
+    def test_snapshot_and_compaction_keep_cards(self, tmp_path, fake_model, publish_build):
+        vacancies = list(generate_vacancies(20, seed=4, description_sentences=(1, 2)))
+        chunks = chunk_documents(vacancies, max_chunk_length=300)
+        publish_build(tmp_path, chunks)
+        assert load_cards(str(tmp_path)) is None
+        assert load_snapshot(str(tmp_path), model=fake_model).cards is None
+
+        version_dir = tmp_path / "versions" / list_versions(str(tmp_path))[-1]
+        cards = {v["id"]: vacancy_card(v) for v in vacancies}
+        save_cards(cards, str(version_dir))
+        assert (version_dir / CARDS_FILE).exists()
+        assert load_cards(str(tmp_path)) == cards
+
+        add_tombstones(str(tmp_path), [vacancies[0]["id"]], "archived")
+        assert compact(str(tmp_path), keep=None)
+        assert load_snapshot(str(tmp_path), model=fake_model, verify=False).cards == cards
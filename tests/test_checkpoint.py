@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from benchmarks.stub_hh import StubHH
+from benchmarks.synthetic import generate_vacancies
+from parser import hh_parser
+from parser.checkpoint import CrawlLog, iter_vacancies_log
+from parser.hh_parser import crawl_vacancies
+
+PARAMS = {"text": "", "area": 40, "max_vacancies": 250, "fetch_details": True, "experience": None, "partition": False}
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    with StubHH(generate_vacancies(250, seed=5, description_sentences=(2, 4))) as s:
+        monkeypatch.setattr(hh_parser, "VACANCIES_URL", f"{s.url}/vacancies")
+        yield s
+
+
+def _crawl(log, limit=None):
+    out = []
+    gen = crawl_vacancies(**log.params, detail_delay=0, log=log)
+    for v in gen:
+        out.append(v)
+        if limit is not None and len(out) == limit:
+            gen.close()  # like Ctrl-C in the middle of the detail loop
+            break
+    return out
+
+
+class TestCrawlLog:
+    def test_replays_state(self, tmp_path):
+        path = tmp_path / "crawl.log"
+        with CrawlLog(str(path), {"text": "python"}) as log:
+            log.page(0, 3, [{"id": "1"}, {"id": "2"}])
+            log.vacancy({"id": "1", "name": "A"})
+
+        with CrawlLog(str(path), resume=True) as log:
+            assert log.params == {"text": "python"}
+            assert [it["id"] for it in log.items] == ["1", "2"]
+            assert log.next_page == 1
+            assert not log.search_done
+            assert log.done_ids == {"1"}
+
+    def test_torn_last_line_is_dropped(self, tmp_path):
+        path = tmp_path / "crawl.log"
+        with CrawlLog(str(path), {}) as log:
+            log.vacancy({"id": "1"})
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"event": "vacancy", "vacancy": {"id": "2"')
+
+        with CrawlLog(str(path), resume=True) as log:
+            assert log.done_ids == {"1"}
+            log.vacancy({"id": "3"})
+        assert [v["id"] for v in iter_vacancies_log(str(path))] == ["1", "3"]
+        for line in open(path, encoding="utf-8"):
+            json.loads(line)
+
+    def test_resume_missing_log(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            CrawlLog(str(tmp_path / "nope.log"), resume=True)
+
+
+class TestResumableCrawl:
+    def test_resume_after_interrupt_fetches_each_detail_once(self, stub, tmp_path):
+        path = str(tmp_path / "crawl.log")
+        with CrawlLog(path, PARAMS) as log:
+            first = _crawl(log, limit=40)
+        assert len(first) == 40
+
+        with CrawlLog(path, resume=True) as log:
+            assert log.search_done
+            rest = _crawl(log)
+        assert len(rest) == 210
+
+        ids = [v["id"] for v in iter_vacancies_log(path)]
+        assert len(ids) == len(set(ids)) == 250
+        assert max(stub.detail_requests.values()) == 1
+        assert stub.requests["search"] == 3
+
+    def test_resume_continues_search_from_cursor(self, stub, tmp_path):
+        path = str(tmp_path / "crawl.log")
+        page0 = stub.search({"area": "40", "page": 0, "per_page": 100})[1]
+        with CrawlLog(path, PARAMS) as log:
+            log.page(0, page0["pages"], page0["items"])
+
+        with CrawlLog(path, resume=True) as log:
+            vacancies = _crawl(log)
+        assert len(vacancies) == 250
+        assert stub.requests["search"] == 2  # pages 1 and 2 only
+
+    def test_failed_details_stay_pending(self, stub, tmp_path):
+        path = str(tmp_path / "crawl.log")
+        lost = {v["id"]: stub.details.pop(v["id"]) for v in stub.items[:5]}
+        with CrawlLog(path, PARAMS) as log:
+            assert len(_crawl(log)) == 245
+
+        stub.details.update(lost)
+        with CrawlLog(path, resume=True) as log:
+            assert {v["id"] for v in _crawl(log)} == set(lost)
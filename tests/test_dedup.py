@@ -0,0 +1,91 @@
+import numpy as np
+
+from parser.dedup import (
+    IdSet, MinHasher, cluster_stats, find_near_duplicates, lsh_candidate_pairs, minhash_signatures, text_shingles,
+)
+
+BASE = " ".join(f"слово{i}" for i in range(80))
+
+
+class TestShingles:
+    def test_distinct(self):
+        assert len(text_shingles("a b c a b c", k=3)) == 3  # abc, bca, cab
+
+    def test_short_text(self):
+        assert len(text_shingles("одно", k=3)) == 1
+
+    def test_empty(self):
+        assert len(text_shingles("", k=3)) == 0
+        assert len(text_shingles(None, k=3)) == 0
+
+
+class TestMinHash:
+    def test_identical_texts_same_signature(self):
+        h = MinHasher(num_perm=64)
+        assert np.array_equal(h.signature(BASE), h.signature(BASE.upper()))
+
+    def test_empty_text(self):
+        assert MinHasher().signature("!!!") is None
+
+    def test_similarity_estimate(self):
+        sigs, valid = minhash_signatures([BASE, BASE.replace("слово40", "другое"), "совсем другой текст"])
+        assert valid.all()
+        assert (sigs[0] == sigs[1]).mean() > 0.8
+        assert (sigs[0] == sigs[2]).mean() < 0.2
+
+    def test_workers_same_result(self):
+        texts = [f"{BASE} {i}" for i in range(30)]
+        a, _ = minhash_signatures(texts, batch_size=10)
+        b, _ = minhash_signatures(texts, batch_size=10, workers=2)
+        assert np.array_equal(a, b)
+
+
+class TestNearDuplicates:
+    def test_clusters(self):
+        texts = [BASE, "Ищем Java-разработчика со знанием Spring", BASE.replace("слово40", "другое"), BASE]
+        labels = find_near_duplicates(texts)
+        assert labels.tolist() == [0, 1, 0, 0]
+
+    def test_empty_texts_not_clustered(self):
+        labels = find_near_duplicates(["", "", BASE])
+        assert labels.tolist() == [0, 1, 2]
+
+    def test_keys_separate_clusters(self):
+        labels = find_near_duplicates([BASE, BASE, BASE], keys=[("kaspi", "dev"), ("halyk", "dev"), ("kaspi", "dev")])
+        assert labels.tolist() == [0, 1, 0]
+
+    def test_threshold(self):
+        half = " ".join(f"слово{i}" for i in range(40)) + " " + " ".join(f"иное{i}" for i in range(40))
+        assert find_near_duplicates([BASE, half], threshold=0.9).tolist() == [0, 1]
+
+    def test_candidate_pairs_ordered(self):
+        sigs, valid = minhash_signatures([BASE, BASE, "другой текст вакансии"])
+        pairs = lsh_candidate_pairs(sigs, bands=16, valid=valid)
+        assert pairs.tolist() == [[0, 1]]
+
+    def test_stats(self):
+        stats = cluster_stats(np.array([0, 1, 0, 0, 4, 4]))
+        assert stats["n_clusters"] == 2
+        assert stats["n_duplicates"] == 3
+        assert stats["largest_cluster"] == 3
+        assert stats["cluster_sizes"] == {2: 1, 3: 1}
+
+
+class TestIdSet:
+    def test_in_memory(self):
+        ids = IdSet()
+        assert ids.add("1") is True
+        assert ids.add("1") is False
+        assert len(ids) == 1
+        assert not ids.on_disk
+
+    def test_spills_to_disk(self, tmp_path):
+        ids = IdSet(max_in_memory=2, tmp_dir=str(tmp_path))
+        for vid in ("1", "2", "3"):
+            assert ids.add(vid) is True
+        assert ids.on_disk
+        assert ids.add("2") is False
+        assert ids.add("4") is True
+        assert len(ids) == 4
+        ids.close()
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,81 @@
+import time
+
+import numpy as np
+import pytest
+
+from rag.diversity import diversify, mmr
+from rag.indexer import index_vectors, search
+from rag.sharding import ShardedIndex
+
+
+def _unit(*rows):
+    v = np.array(rows, dtype="float32")
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+class TestMMR:
+    def test_lambda_one_is_plain_ranking(self):
+        rng = np.random.default_rng(0)
+        scores = np.sort(rng.random(50))[::-1]
+        assert mmr(scores, rng.standard_normal((50, 8)), 10, lambda_=1.0).tolist() == list(range(10))
+
+    def test_skips_near_duplicates(self):
+        vectors = _unit([1, 0, 0], [1, 0.01, 0], [0, 1, 0], [0, 0, 1])
+        scores = np.array([0.9, 0.89, 0.7, 0.6])
+        assert mmr(scores, vectors, 3, lambda_=1.0).tolist() == [0, 1, 2]
+        assert mmr(scores, vectors, 3, lambda_=0.5).tolist() == [0, 2, 3]
+
+    def test_group_cap(self):
+        vectors = _unit(*np.eye(5))
+        scores = np.array([0.9, 0.8, 0.7, 0.6, 0.5])
+        groups = ["a", "a", "a", "b", "b"]
+        assert mmr(scores, vectors, 4, lambda_=1.0, groups=groups, max_per_group=1).tolist() == [0, 3]
+        assert mmr(scores, vectors, 4, lambda_=1.0, groups=groups, max_per_group=2).tolist() == [0, 1, 3, 4]
+
+    def test_edge_cases(self):
+        assert mmr(np.array([]), np.zeros((0, 3)), 5).tolist() == []
+        assert mmr(np.array([0.5]), np.zeros((1, 3)), 5).tolist() == [0]
+        with pytest.raises(ValueError):
+            mmr(np.array([0.5]), np.ones((1, 3)), 1, lambda_=1.5)
+
+    def test_diversify_keeps_unknown_employers_apart(self):
+        results = [{"vacancy_id": str(i), "employer": None, "score": 1 - i / 10} for i in range(3)]
+        assert len(diversify(results, _unit(*np.eye(3)), 3, lambda_=1.0, max_per_employer=1)) == 3
+
+    def test_fast(self):
+        rng = np.random.default_rng(1)
+        scores = np.sort(rng.random(200))[::-1]
+        vectors = rng.standard_normal((200, 384)).astype("float32")
+        groups = rng.integers(0, 20, 200)
+        mmr(scores, vectors, 10)
+        t0 = time.perf_counter()
+        for _ in range(20):
+            mmr(scores, vectors, 20, groups=groups, max_per_group=2)
+        assert (time.perf_counter() - t0) / 20 < 5e-3
+
+
+class TestSearchIntegration:
+    def test_near_duplicates_pushed_down(self, fake_index):
+        index, model, chunks = fake_index
+        plain = search("python", index, model, chunks, top_k=2)
+        assert {r["vacancy_id"] for r in plain} == {"1", "2"}
+        diverse = search("python", index, model, chunks, top_k=2, diversity={"lambda": 0.3})
+        assert diverse[0]["vacancy_id"] == plain[0]["vacancy_id"]
+        assert diverse[1]["vacancy_id"] in {"3", "4"}
+        assert search("python", index, model, chunks, top_k=2, diversity={"lambda": 1.0}) == plain
+
+    def test_employer_cap(self, fake_index):
+        index, model, chunks = fake_index
+        chunks = [dict(c, employer=e) for c, e in zip(chunks, ["Kaspi", "Kaspi", "Kaspi", "Halyk"])]
+        results = search("python", index, model, chunks, top_k=3, diversity={"lambda": 1.0, "max_per_employer": 1})
+        assert [r["employer"] for r in results] == ["Kaspi", "Halyk"]
+
+    def test_sharded_vectors(self, fake_index):
+        index, model, chunks = fake_index
+        vectors = index_vectors(index)
+        sharded = ShardedIndex.from_embeddings(vectors, np.array([1, 0, 1, 0]), 2)
+        ids = np.array([3, 0, 2])
+        assert np.allclose(sharded.reconstruct_batch(ids), vectors[ids])
+        diversity = {"lambda": 0.3}
+        assert [r["chunk_id"] for r in search("python", sharded, model, chunks, top_k=3, diversity=diversity)] == \
+               [r["chunk_id"] for r in search("python", index, model, chunks, top_k=3, diversity=diversity)]
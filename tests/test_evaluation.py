@@ -0,0 +1,104 @@
+import math
+
+import pytest
+
+from rag.chunker import chunk_documents
+from rag.evaluation import (
+    compare_index_dirs, diff_reports, evaluate, load_query_set, query_metrics, ranked_vacancies,
+    save_query_set, silver_query_set,
+)
+from rag.indexer import build_index, search, search_batch
+
+
+class TestQueryMetrics:
+    def test_perfect_ranking(self):
+        m = query_metrics(["a", "b", "c"], {"a", "b"}, ks=(1, 2))
+        assert m["rr"] == 1.0
+        assert m["recall@1"] == 0.5
+        assert m["recall@2"] == 1.0
+        assert m["ndcg@2"] == pytest.approx(1.0)
+
+    def test_late_hit(self):
+        m = query_metrics(["x", "y", "a"], {"a"}, ks=(1, 3))
+        assert m["rr"] == pytest.approx(1 / 3)
+        assert m["recall@1"] == 0.0
+        assert m["recall@3"] == 1.0
+        assert m["ndcg@3"] == pytest.approx(1 / math.log2(4))
+
+    def test_no_hit(self):
+        m = query_metrics(["x"], {"a"}, ks=(5,))
+        assert m["rr"] == 0.0 and m["recall@5"] == 0.0 and m["ndcg@5"] == 0.0
+
+    def test_ranked_vacancies_dedupes_chunks(self):
+        results = [{"vacancy_id": "1"}, {"vacancy_id": "1"}, {"vacancy_id": "2"}]
+        assert ranked_vacancies(results) == ["1", "2"]
+
+
+class TestSearchBatch:
+    def test_matches_search(self, fake_index):
+        index, model, chunks = fake_index
+        queries = ["python", "java", "data python", "python"]
+        filters = [None, {"city": "Алматы"}, {"salary_min": 500000}, {"skills": ["Python"]}]
+        batched = search_batch(queries, index, model, chunks, top_k=3, filters=filters, batch_size=3)
+        for q, f, got in zip(queries, filters, batched):
+            assert got == search(q, index, model, chunks, top_k=3, filters=f)
+
+
+class TestEvaluate:
+    def test_scores_fake_index(self, fake_index):
+        index, model, chunks = fake_index
+        query_set = [{"query": "java", "relevant": ["3"]}, {"query": "python", "relevant": ["1", "2"]}]
+        report = evaluate(query_set, index, model, chunks, ks=(1, 2))
+        assert report["summary"]["mrr"] == 1.0
+        assert report["summary"]["recall@2"] == 1.0
+        assert report["summary"]["n_queries"] == 2
+        assert report["summary"]["latency_ms"]["p50"] > 0
+        assert report["queries"][0]["ranked"][0] == "3"
+
+    def test_diff_flags_regressions(self):
+        base = {"summary": {"recall@10": 1.0}, "queries": [{"query": "q", "recall@10": 1.0}]}
+        cand = {"summary": {"recall@10": 0.5}, "queries": [{"query": "q", "recall@10": 0.5}]}
+        diff = diff_reports(base, cand)
+        assert diff["deltas"]["recall@10"] == -0.5
+        assert diff["regressed_queries"] == [{"query": "q", "baseline": 1.0, "candidate": 0.5}]
+
+    def test_diff_without_recall_at_10(self):
+        report = {"summary": {"recall@1": 0.5, "recall@5": 1.0, "mrr": 0.75},
+                  "queries": [{"query": "q", "recall@1": 0.5, "recall@5": 1.0, "rr": 0.75}]}
+        diff = diff_reports(report, report)
+        assert diff["metric"] == "recall@5" and diff["regressed_queries"] == []
+        assert diff_reports(report, report, metric="mrr")["metric"] == "mrr"
+        with pytest.raises(ValueError):
+            diff_reports(report, report, metric="recall@10")
+
+
+def _vacancies():
+    names = ["Python разработчик", "Java разработчик", "Data аналитик"]
+    return [{"id": str(i), "name": names[i % 3], "area": "Алматы", "key_skills": names[i % 3].split()[0],
+             "description": f"{names[i % 3]} описание вакансии номер {i}"} for i in range(12)]
+
+
+class TestIndexDirs:
+    def test_compare_two_index_dirs(self, tmp_path, fake_model):
+        chunks = chunk_documents(_vacancies())
+        build_index(chunks, index_dir=str(tmp_path / "a"), model=fake_model)
+        # Candidate index that lost the Java vacancies
+        build_index([c for c in chunks if "Java" not in c["vacancy_name"]], index_dir=str(tmp_path / "b"),
+                    model=fake_model)
+
+        query_set = silver_query_set(_vacancies(), n=10)
+        assert {q["query"] for q in query_set} == {"python разработчик python", "java разработчик java",
+                                                   "data аналитик data"}
+        report = compare_index_dirs(query_set, str(tmp_path / "a"), str(tmp_path / "b"), model=fake_model)
+        assert report["deltas"]["recall@10"] < 0
+        assert [q["query"] for q in report["regressed_queries"]] == ["java разработчик java"]
+
+        # Cutoffs without 10: judged by recall@5
+        report = compare_index_dirs(query_set, str(tmp_path / "a"), str(tmp_path / "b"), model=fake_model, ks=(1, 5))
+        assert report["metric"] == "recall@5" and "recall@10" not in report["deltas"]
+        assert [q["query"] for q in report["regressed_queries"]] == ["java разработчик java"]
+
+    def test_query_set_roundtrip(self, tmp_path):
+        path = str(tmp_path / "q.jsonl")
+        save_query_set([{"query": "a", "relevant": ["1"]}, {"query": "b", "relevant": []}], path)
+        assert load_query_set(path) == [{"query": "a", "relevant": ["1"]}]
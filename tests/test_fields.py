@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from rag.fields import FIELDS, encode_fields, expand_queries, field_weights
+from rag.indexer import build_index, load_index, read_index, search
+from rag.tombstones import add_tombstones, compact
+from rag.versioning import new_version_dir, publish, write_manifest
+
+CHUNKS = [
+    {"vacancy_id": "1", "vacancy_name": "Java developer", "key_skills": "Java", "text": "data python"},
+    {"vacancy_id": "1", "vacancy_name": "Java developer", "key_skills": "Java", "text": "python"},
+    {"vacancy_id": "2", "vacancy_name": "Analyst", "key_skills": "", "text": "java data"},
+    {"vacancy_id": "3", "vacancy_name": "Data engineer", "key_skills": "Python, Data", "text": "data"},
+]
+
+TITLE_HEAVY = {"text": 0.2, "title": 0.5, "skills": 0.3}
+
+
+def _vacancies(results):
+    return list(dict.fromkeys(r["vacancy_id"] for r in results))
+
+
+class TestVectors:
+    def test_encode_fields_layout(self, fake_model):
+        model = fake_model
+        text = model.encode([c["text"] for c in CHUNKS])
+        vecs = encode_fields(model, CHUNKS, text)
+        d = text.shape[1]
+        assert vecs.shape == (len(CHUNKS), len(FIELDS) * d)
+        assert np.allclose(vecs[:, :d], text)
+        # Title and skills are shared by the chunks of one vacancy
+        assert np.allclose(vecs[0, d:], vecs[1, d:])
+        # No skills -> zero block, so that field adds nothing to the score
+        assert not vecs[2, 2 * d:].any()
+
+    def test_expanded_query_scores(self, fake_model):
+        model = fake_model
+        text = model.encode([c["text"] for c in CHUNKS])
+        vecs = encode_fields(model, CHUNKS, text)
+        q = model.encode(["java"])
+        w = field_weights(TITLE_HEAVY)
+        d = text.shape[1]
+        expected = sum(wi * vecs[:, i * d:(i + 1) * d] @ q[0] for i, wi in enumerate(w))
+        assert np.allclose(vecs @ expand_queries(q, TITLE_HEAVY)[0], expected)
+
+    def test_weights(self):
+        assert field_weights({"text": 2, "title": 1, "skills": 1}).tolist() == pytest.approx([0.5, 0.25, 0.25])
+        with pytest.raises(ValueError):
+            field_weights({"salary": 1})
+        with pytest.raises(ValueError):
+            field_weights({"text": 0, "title": 0, "skills": 0})
+
+
+class TestSearch:
+    def test_weights_change_ranking(self, tmp_path, fake_model):
+        index, model, chunks = build_index(CHUNKS, model_name="fake", index_dir=str(tmp_path), model=fake_model,
+                                           multi_field=True)
+        assert index.d == len(FIELDS) * len(fake_model.VOCAB)
+        # The description mentions java, the title and skills of vacancy 1 are Java
+        assert _vacancies(search("java", index, model, chunks, top_k=4))[0] == "2"
+        assert _vacancies(search("java", index, model, chunks, top_k=4, field_weights=TITLE_HEAVY))[0] == "1"
+
+    def test_text_weight_only_matches_single_field(self, tmp_path, fake_model):
+        single, model, chunks = build_index(CHUNKS, model_name="fake", index_dir=str(tmp_path / "single"),
+                                            model=fake_model)
+        multi, _, _ = build_index(CHUNKS, model_name="fake", index_dir=str(tmp_path / "multi"), model=fake_model,
+                                  multi_field=True)
+        expected = search("python data", single, model, chunks, top_k=4)
+        results = search("python data", multi, model, chunks, top_k=4, field_weights={"title": 0, "skills": 0})
+        assert [r["score"] for r in results] == pytest.approx([r["score"] for r in expected])
+
+    def test_reload_and_compaction_keep_fields(self, tmp_path, fake_model):
+        version_dir = new_version_dir(str(tmp_path))
+        build_index(CHUNKS, model_name="fake", index_dir=version_dir, model=fake_model, multi_field=True)
+        write_manifest(version_dir)
+        publish(str(tmp_path), version_dir)
+        index, model, chunks = load_index(str(tmp_path), model=fake_model)
+        assert _vacancies(search("java", index, model, chunks, top_k=4, field_weights=TITLE_HEAVY))[0] == "1"
+
+        add_tombstones(str(tmp_path), ["3"], "archived")
+        compact(str(tmp_path))
+        index, kept, config = read_index(str(tmp_path))
+        assert config["fields"] == list(FIELDS) and index.d == len(FIELDS) * len(fake_model.VOCAB)
+        assert _vacancies(search("java", index, model, kept, top_k=4, field_weights=TITLE_HEAVY)) == ["1", "2"]
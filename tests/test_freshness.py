@@ -0,0 +1,95 @@
+from datetime import date, datetime, timezone
+
+import faiss
+import numpy as np
+import pytest
+
+from rag.chunker import chunk_documents
+from rag.freshness import decay_factor, freshness_mask, published_column, rescore, to_timestamp
+from rag.indexer import build_columns, search
+
+NOW = datetime(2025, 7, 1, tzinfo=timezone.utc).timestamp()
+DAY = 86400.0
+
+
+class TestTimestamps:
+    def test_parses_hh_format(self):
+        assert to_timestamp("2025-07-01T05:00:00+0500") == NOW
+        assert to_timestamp(date(2025, 7, 1)) == NOW
+        assert to_timestamp(NOW) == NOW
+        assert np.isnan(to_timestamp(None))
+
+    def test_column(self):
+        ts = published_column([{"published_at": "2025-07-01"}, {}, {"published_at": "garbage"},
+                               {"published_at": "2025-07-01"}])
+        assert ts.dtype == np.float64
+        assert ts[0] == ts[3] == NOW
+        assert np.isnan(ts[1]) and np.isnan(ts[2])
+
+    def test_chunks_keep_published_at(self):
+        chunks = chunk_documents([{"id": "1", "name": "Dev", "published_at": "2025-07-01T10:00:00+0500"}])
+        assert chunks[0]["published_at"] == "2025-07-01T10:00:00+0500"
+        assert build_columns(chunks)["published_ts"][0] == to_timestamp("2025-07-01T10:00:00+0500")
+
+
+class TestFilterAndDecay:
+    ts = np.array([NOW - 1 * DAY, NOW - 10 * DAY, NOW - 40 * DAY, np.nan])
+
+    def test_mask(self):
+        assert freshness_mask(self.ts, {"max_age_days": 7}, now=NOW).tolist() == [True, False, False, False]
+        assert freshness_mask(self.ts, {"published_after": "2025-06-01", "published_before": "2025-06-30"},
+                              now=NOW).tolist() == [False, True, False, False]
+        assert freshness_mask(self.ts, {}).all()
+
+    def test_decay_factor(self):
+        f = decay_factor(np.array([NOW, NOW - 30 * DAY, np.nan]), half_life_days=30, weight=0.4, now=NOW)
+        np.testing.assert_allclose(f, [1.0, 0.8, 0.6])
+
+    def test_rescore_reorders(self):
+        scores = np.array([0.9, 0.85, 0.5, -3.4e38], dtype="float32")
+        ids = np.array([2, 0, 1, -1])
+        decayed, new_ids, similarity = rescore(scores, ids, self.ts, half_life_days=7, weight=0.5, now=NOW)
+        assert new_ids.tolist() == [0, 2, 1, -1]
+        assert similarity.tolist()[:3] == pytest.approx([0.85, 0.9, 0.5])
+        assert decayed[-1] == -np.inf
+
+
+@pytest.fixture
+def dated_index(fake_model):
+    chunks = [
+        {"vacancy_id": "1", "text": "python python", "published_at": "2025-04-01T10:00:00+0500"},
+        {"vacancy_id": "2", "text": "python data", "published_at": "2025-06-30T10:00:00+0500"},
+        {"vacancy_id": "3", "text": "java", "published_at": "2025-06-30T10:00:00+0500"},
+        {"vacancy_id": "4", "text": "python", "published_at": None},
+    ]
+    model = fake_model
+    index = faiss.IndexFlatIP(len(fake_model.VOCAB))
+    index.add(model.encode([c["text"] for c in chunks]))
+    return index, model, chunks
+
+
+class TestSearch:
+    def test_date_prefilter(self, dated_index):
+        index, model, chunks = dated_index
+        results = search("python", index, model, chunks, top_k=4,
+                         filters={"published_after": "2025-06-01"}, columns=build_columns(chunks))
+        assert [r["vacancy_id"] for r in results] == ["2", "3"]
+
+    def test_decay_promotes_fresh(self, dated_index):
+        index, model, chunks = dated_index
+        plain = search("python", index, model, chunks, top_k=2)
+        assert plain[0]["vacancy_id"] in ("1", "4")
+
+        fresh = search("python", index, model, chunks, top_k=2, freshness={"now": NOW, "weight": 0.5})
+        assert fresh[0]["vacancy_id"] == "2"
+        assert fresh[0]["score"] < fresh[0]["similarity"]
+        assert fresh[0]["score"] >= fresh[1]["score"]
+
+    def test_columns_without_published_ts(self, dated_index):
+        # Indexes built before the column existed
+        index, model, chunks = dated_index
+        columns = build_columns(chunks)
+        del columns["published_ts"]
+        results = search("python", index, model, chunks, top_k=4, columns=columns,
+                         filters={"published_after": "2025-06-26"}, freshness={"now": NOW})
+        assert {r["vacancy_id"] for r in results} == {"2", "3"}
@@ -1,6 +1,4 @@
-
-import pytest
-from rag.indexer import _passes_filters
+from rag.indexer import _passes_filters, _filter_mask, build_columns, search, skill_facets
 
 
 class TestPassesFilters:
@@ -94,22 +92,76 @@ class TestPassesFilters:
         c = self._chunk()
         assert _passes_filters(c, {}) is True
 
+    def test_salary_other_currency(self):
+        c = self._chunk(salary_from=1000, salary_to=None, salary_currency="USD")
+        assert _passes_filters(c, {"salary_min": 500000}) is True
 
+    def test_skills_filter(self):
+        c = self._chunk(key_skills="Python, postgres")
+        assert _passes_filters(c, {"skills": ["PostgreSQL", "python"]}) is True
+        assert _passes_filters(c, {"skills": ["Python", "Java"]}) is False
 
+    def test_salary_gross_is_netted(self):
+        c = self._chunk(salary_from=None, salary_to=600000, salary_gross=True)
+        assert _passes_filters(c, {"salary_min": 500000}) is False
 
 
-
-
-
-
-
-
-
- 
-
-
-
-
-
-
-
+class TestFilterMask:
+    def test_salary_mask(self):
+        chunks = [
+            {"salary_from": 600000, "salary_currency": "KZT"},
+            {"salary_from": 100000, "salary_currency": "KZT"},
+            {"salary_from": None, "salary_to": None},
+            {"salary_to": 2000, "salary_currency": "USD"},
+        ]
+        mask = _filter_mask(build_columns(chunks), {"salary_min": 500000})
+        assert mask.tolist() == [True, False, False, True]
+
+    def test_no_filters_all_true(self):
+        mask = _filter_mask(build_columns([{}, {}]), {})
+        assert mask.all()
+
+
+class TestSearch:
+    def test_ranking(self, fake_index):
+        index, model, chunks = fake_index
+        results = search("python", index, model, chunks, top_k=2)
+        assert {r["vacancy_id"] for r in results} == {"1", "2"}
+        assert results[0]["score"] >= results[1]["score"]
+
+    def test_salary_prefilter(self, fake_index):
+        index, model, chunks = fake_index
+        results = search("python", index, model, chunks, top_k=1, filters={"salary_min": 500000})
+        assert [r["vacancy_id"] for r in results] == ["2"]
+
+    def test_prefilter_with_columns(self, fake_index):
+        index, model, chunks = fake_index
+        cols = build_columns(chunks)
+        results = search("data", index, model, chunks, top_k=4, filters={"salary_min": 500000}, columns=cols)
+        assert {r["vacancy_id"] for r in results} == {"2", "3"}
+
+    def test_combined_filters(self, fake_index):
+        index, model, chunks = fake_index
+        results = search("python", index, model, chunks, top_k=3,
+                         filters={"salary_min": 500000, "city": "Алматы"})
+        assert [r["vacancy_id"] for r in results] == ["3"]
+
+    def test_nothing_matches(self, fake_index):
+        index, model, chunks = fake_index
+        assert search("python", index, model, chunks, filters={"salary_min": 10**9}) == []
+
+    def test_skills_prefilter(self, fake_index):
+        index, model, chunks = fake_index
+        results = search("java", index, model, chunks, top_k=4, filters={"skills": ["python"]})
+        assert {r["vacancy_id"] for r in results} == {"1", "2", "4"}
+
+    def test_skill_facets(self, fake_index):
+        index, model, chunks = fake_index
+        results = search("python", index, model, chunks, top_k=2)
+        assert skill_facets(results, build_columns(chunks), n=1) == [("Python", 2)]
+
+
+class TestBuildColumns:
+    def test_vacancy_row_per_chunk(self):
+        chunks = [{"vacancy_id": "a"}, {"vacancy_id": "a"}, {"vacancy_id": "b"}]
+        assert build_columns(chunks)["vacancy_row"].tolist() == [0, 0, 1]
@@ -0,0 +1,63 @@
+import json
+
+from merge_data import input_files, merge
+from parser.storage import iter_vacancies, save_jsonl, save_parquet
+
+DESC = " ".join(f"слово{i}" for i in range(60))
+
+
+def _vacancy(vid, description=None, **kw):
+    return {"id": vid, "name": f"Dev {vid}", "employer_name": "Co", "description": description or " ".join(f"{vid}текст{i}" for i in range(60)),
+            "salary_from": None, "salary_to": None, **kw}
+
+
+class TestMerge:
+    def _inputs(self, tmp_path):
+        a = tmp_path / "a.json"
+        a.write_text(json.dumps([_vacancy("1"), _vacancy("2")], ensure_ascii=False), encoding="utf-8")
+        b = str(tmp_path / "b.jsonl")
+        save_jsonl([_vacancy("2"), _vacancy("3", description=DESC), _vacancy("4", description=DESC, name="Dev 3")], b)
+        return [str(a), b]
+
+    def test_exact_dedup(self, tmp_path):
+        out = str(tmp_path / "all.jsonl")
+        assert merge(self._inputs(tmp_path), output=out) == 4
+        assert [v["id"] for v in iter_vacancies(out)] == ["1", "2", "3", "4"]
+
+    def test_default_inputs_include_parquet(self, tmp_path):
+        inputs = self._inputs(tmp_path)
+        save_parquet([_vacancy("3"), _vacancy("5")], str(tmp_path / "c.parquet"))
+        save_jsonl([_vacancy("9")], str(tmp_path / "vacancies_all.jsonl"))
+        files = input_files(str(tmp_path))
+        assert files == sorted(inputs + [str(tmp_path / "c.parquet")])
+        out = str(tmp_path / "merged.jsonl")
+        assert merge(files, output=out) == 5
+        assert "5" in {v["id"] for v in iter_vacancies(out)}
+
+    def test_id_set_on_disk(self, tmp_path):
+        out = str(tmp_path / "all.jsonl")
+        assert merge(self._inputs(tmp_path), output=out, max_ids_in_memory=1) == 4
+
+    def test_parallel_same_result(self, tmp_path):
+        out = str(tmp_path / "all.parquet")
+        assert merge(self._inputs(tmp_path), output=out, workers=2) == 4
+        assert [v["id"] for v in iter_vacancies(out)] == ["1", "2", "3", "4"]
+
+    def test_near_dup_drop(self, tmp_path):
+        out = str(tmp_path / "all.jsonl")
+        assert merge(self._inputs(tmp_path), output=out, near_dup="drop") == 3
+        assert "4" not in {v["id"] for v in iter_vacancies(out)}
+
+    def test_near_dup_cluster(self, tmp_path):
+        out = str(tmp_path / "all.jsonl")
+        assert merge(self._inputs(tmp_path), output=out, near_dup="cluster") == 4
+        dup_of = {v["id"]: v["duplicate_of"] for v in iter_vacancies(out)}
+        assert dup_of == {"1": None, "2": None, "3": None, "4": "3"}
+
+    def test_near_dup_needs_same_employer_and_title(self, tmp_path):
+        # Same template description, different jobs: nothing is dropped
+        save_jsonl([_vacancy("1", description=DESC, name="Python Dev"), _vacancy("2", description=DESC, name="QA"),
+                    _vacancy("3", description=DESC, name="Python Dev", employer_name="Other")],
+                   str(tmp_path / "a.jsonl"))
+        out = str(tmp_path / "all.jsonl")
+        assert merge([str(tmp_path / "a.jsonl")], output=out, near_dup="drop") == 3
@@ -0,0 +1,106 @@
+import pytest
+
+from rag import metrics
+from rag.indexer import search
+from rag.metrics import REGISTRY, Histogram, span, trace
+
+
+@pytest.fixture
+def recording():
+    REGISTRY.reset()
+    metrics.enable()
+    yield REGISTRY
+    metrics.disable()
+    REGISTRY.reset()
+
+
+class TestSpans:
+    def test_disabled_is_noop(self):
+        REGISTRY.reset()
+        with span("encode") as s:
+            pass
+        assert s is metrics._NOOP
+        metrics.inc("rag_queries_total")
+        assert REGISTRY.snapshot() == {"counters": {}, "histograms": {}}
+
+    def test_trace_without_registry(self):
+        with trace() as t:
+            with span("outer"):
+                with span("inner"):
+                    pass
+                with span("inner"):
+                    pass
+        assert [(s["name"], s["depth"]) for s in t.stages] == [("outer", 0), ("inner", 1), ("inner", 1)]
+        assert set(t.breakdown()) == {"outer", "inner"}
+        assert t.total_ms == t.stages[0]["ms"]
+        assert REGISTRY.snapshot()["histograms"] == {}
+
+    def test_trace_ends_with_block(self):
+        with trace() as t:
+            pass
+        with span("late"):
+            pass
+        assert t.stages == []
+
+    def test_span_records_on_exception(self, recording):
+        with pytest.raises(ValueError):
+            with span("llm", backend="ollama"):
+                raise ValueError
+        hist = recording.snapshot()["histograms"]["rag_stage_seconds"]
+        assert hist[(("backend", "ollama"), ("stage", "llm"))]["count"] == 1
+
+    def test_traced_decorator(self):
+        @metrics.traced("work")
+        def work(x):
+            return x * 2
+
+        with trace() as t:
+            assert work(3) == 6
+        assert [s["name"] for s in t.stages] == ["work"]
+
+
+class TestRegistry:
+    def test_histogram_buckets(self):
+        h = Histogram(buckets=(1, 2, 5))
+        for v in (0.5, 1, 1.5, 3, 10):
+            h.observe(v)
+        assert h.counts == [2, 1, 1, 1]
+        assert h.quantile(0.5) == 2
+        assert h.quantile(1.0) is None
+
+    def test_prometheus_text(self, recording):
+        metrics.inc("rag_queries_total", 3)
+        metrics.observe("rag_stage_seconds", 0.002, stage="encode")
+        text = metrics.prometheus_text()
+        assert "# TYPE rag_queries_total counter\nrag_queries_total 3\n" in text
+        assert 'rag_stage_seconds_bucket{stage="encode",le="0.001"} 0' in text
+        assert 'rag_stage_seconds_bucket{stage="encode",le="0.0025"} 1' in text
+        assert 'rag_stage_seconds_bucket{stage="encode",le="+Inf"} 1' in text
+        assert 'rag_stage_seconds_count{stage="encode"} 1' in text
+
+    def test_write_prometheus(self, recording, tmp_path):
+        metrics.inc("rag_queries_total")
+        path = tmp_path / "rag.prom"
+        metrics.write_prometheus(str(path))
+        assert path.read_text() == metrics.prometheus_text()
+
+
+class TestInstrumentation:
+    def test_search_stages(self, fake_index):
+        index, model, chunks = fake_index
+        with trace() as t:
+            search("python", index, model, chunks, top_k=2, filters={"salary_min": 500000})
+        assert {"encode", "prefilter", "faiss_search", "collect"} <= set(t.breakdown())
+
+    def test_filter_counters(self, recording, fake_index):
+        index, model, chunks = fake_index
+        search("python", index, model, chunks, top_k=2, filters={"city": "Астана"})
+        counters = recording.snapshot()["counters"]
+        assert counters["rag_queries_total"][()] == 1
+        checked = counters["rag_row_filter_checked_total"][()]
+        rejected = counters["rag_row_filter_rejected_total"][()]
+        assert 0 < rejected < checked
+        assert "rag_prefilter_pass_ratio" not in recording.snapshot()["histograms"]
+
+        search("python", index, model, chunks, top_k=2, filters={"salary_min": 500000})
+        assert recording.snapshot()["histograms"]["rag_prefilter_pass_ratio"][()]["count"] == 1
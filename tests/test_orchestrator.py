@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from benchmarks.stub_hh import StubHH
+from benchmarks.synthetic import generate_vacancies
+from parser.api import RateLimiter
+from parser.checkpoint import CrawlLog, iter_vacancies_log
+from parser.orchestrator import CrawlOrchestrator, load_crawl_config, run_crawl
+
+QUERIES = ["разработчик", "Python", "Backend", "инженер"]
+
+
+@pytest.fixture
+def vacancies():
+    return list(generate_vacancies(600, seed=7, description_sentences=(2, 4)))
+
+
+@pytest.fixture
+def stub(vacancies):
+    with StubHH(vacancies) as s:
+        yield s
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "crawl.json"
+    path.write_text(json.dumps({"areas": ["kazakhstan"], "detail_workers": 4, "queries": QUERIES}))
+    return load_crawl_config(str(path))
+
+
+def _expected(vacancies):
+    return {v["id"] for v in vacancies if any(q.lower() in v["name"].lower() for q in QUERIES)}
+
+
+class TestLoadCrawlConfig:
+    def test_defaults_and_overrides(self, tmp_path):
+        path = tmp_path / "crawl.json"
+        path.write_text(json.dumps({
+            "max_per_query": 100,
+            "queries": ["Python", {"text": "1С", "areas": ["almaty", "astana"], "max": 50}],
+        }))
+        config = load_crawl_config(str(path))
+        assert config["searches"] == [
+            {"text": "Python", "area": 40, "experience": None, "max": 100},
+            {"text": "1С", "area": 160, "experience": None, "max": 50},
+            {"text": "1С", "area": 159, "experience": None, "max": 50},
+        ]
+
+    def test_unknown_area(self, tmp_path):
+        path = tmp_path / "crawl.json"
+        path.write_text(json.dumps({"queries": [{"text": "x", "areas": ["atlantis"]}]}))
+        with pytest.raises(ValueError):
+            load_crawl_config(str(path))
+
+
+class TestCrawlOrchestrator:
+    def test_each_detail_fetched_once(self, stub, vacancies, config, tmp_path):
+        log_path = str(tmp_path / "crawl.log")
+        report = run_crawl(config, log_path, base_url=stub.url, limiter=RateLimiter(rate=0))
+
+        ids = [v["id"] for v in iter_vacancies_log(log_path)]
+        assert len(ids) == len(set(ids))
+        assert set(ids) == _expected(vacancies)
+        assert stub.requests["detail"] == len(ids)
+        assert max(stub.detail_requests.values()) == 1
+
+        assert report["unique"] == len(ids)
+        assert report["summaries"] == sum(s["collected"] for s in report["searches"])
+        assert report["detail_fetches_saved"] == report["summaries"] - report["unique"] > 0
+        assert sum(s["new"] for s in report["searches"]) == report["unique"]
+
+    def test_vacancies_have_details(self, stub, config, tmp_path):
+        log_path = str(tmp_path / "crawl.log")
+        run_crawl(config, log_path, base_url=stub.url, limiter=RateLimiter(rate=0))
+        v = next(iter_vacancies_log(log_path))
+        assert v["description"] and "<p>" not in v["description"]
+        assert v["experience"]
+
+    def test_resume_skips_done(self, stub, vacancies, config, tmp_path):
+        log_path = str(tmp_path / "crawl.log")
+        with CrawlLog(log_path, {"config": config}) as log:
+            gen = CrawlOrchestrator(config, base_url=stub.url, limiter=RateLimiter(rate=0)).crawl(log)
+            for i, _ in enumerate(gen):
+                if i == 30:
+                    gen.close()
+                    break
+        searches = stub.requests["search"]
+
+        report = run_crawl(config, log_path, resume=True, base_url=stub.url, limiter=RateLimiter(rate=0))
+        assert stub.requests["search"] == searches
+        # Only details in flight at the interrupt (window of 4 * detail_workers) are fetched again
+        refetched = sum(c - 1 for c in stub.detail_requests.values())
+        assert refetched <= 4 * config["detail_workers"]
+        assert report["vacancies"] == len(_expected(vacancies))
@@ -1,5 +1,12 @@
 
-from parser.hh_parser import clean_html, parse_salary, parse_vacancy
+import json
+import os
+
+import pytest
+
+from parser.hh_parser import _clean_html_bs4, clean_html, parse_salary, parse_vacancy
+
+GOLDEN_FILE = os.path.join(os.path.dirname(__file__), "data", "descriptions.json")
 
 
 class TestCleanHtml:
@@ -19,6 +26,32 @@ class TestCleanHtml:
         assert "A" in result
         assert "B" in result
 
+    def test_skips_script_and_style(self):
+        html = "<p>Text</p><script>var x = 1;</script><style>p { color: red }</style>"
+        assert clean_html(html) == "Text"
+
+    def test_entities_and_br(self):
+        assert clean_html("<p>A &amp; B<br/>C&nbsp;D</p>") == "A & B\nC\xa0D"
+
+    def test_plain_text(self):
+        assert clean_html("Just text") == "Just text"
+
+
+with open(GOLDEN_FILE, encoding="utf-8") as f:
+    GOLDEN = json.load(f)
+
+
+class TestCleanHtmlGolden:
+    """clean_html must give the same text as the original BeautifulSoup implementation."""
+
+    @pytest.mark.parametrize("sample", GOLDEN, ids=range(len(GOLDEN)))
+    def test_matches_golden(self, sample):
+        assert clean_html(sample["html"]) == sample["text"]
+
+    @pytest.mark.parametrize("sample", GOLDEN, ids=range(len(GOLDEN)))
+    def test_matches_bs4(self, sample):
+        assert clean_html(sample["html"]) == _clean_html_bs4(sample["html"])
+
 
 class TestParseSalary:
     def test_full_salary(self):
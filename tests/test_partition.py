@@ -0,0 +1,93 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.stub_hh import StubHH
+from benchmarks.synthetic import generate_vacancies
+from parser.api import RateLimiter
+from parser.partition import SearchPartitioner
+
+TZ = timezone(timedelta(hours=5))
+YEAR_2025 = (datetime(2025, 1, 1, tzinfo=TZ), datetime(2026, 1, 1, tzinfo=TZ))
+
+
+@pytest.fixture(scope="module")
+def vacancies():
+    return list(generate_vacancies(3000, seed=3, description_sentences=(2, 4)))
+
+
+@pytest.fixture(scope="module")
+def stub(vacancies):
+    with StubHH(vacancies, cap=200) as s:
+        yield s
+
+
+def _partitioner(stub, params, **kwargs):
+    return SearchPartitioner(params, base_url=stub.url, limiter=RateLimiter(rate=0), workers=8,
+                             date_range=YEAR_2025, cap=stub.cap, per_page=50, **kwargs)
+
+
+class TestSearchPartitioner:
+    def test_complete_coverage_over_cap(self, stub, vacancies):
+        p = _partitioner(stub, {"area": 40})
+        items = p.run()
+        ids = [it["id"] for it in items]
+        assert len(ids) == len(set(ids))
+        assert set(ids) == {v["id"] for v in vacancies}
+        assert p.stats["found"] == len(vacancies)
+        assert p.stats["capped_slices"] == 0
+
+    def test_splits_big_city_by_date(self, stub, vacancies):
+        almaty = {v["id"] for v in vacancies if v["area"] == "Алматы"}
+        assert len(almaty) > stub.cap
+        p = _partitioner(stub, {"area": "160"})
+        assert {it["id"] for it in p.run()} == almaty
+        assert p.stats["slices"] > 1
+
+    def test_under_cap_single_slice(self, stub, vacancies):
+        expected = {v["id"] for v in vacancies if v["area"] == "Павлодар"}
+        assert len(expected) <= stub.cap
+        p = _partitioner(stub, {"area": "185"})
+        assert {it["id"] for it in p.run()} == expected
+        assert p.stats["slices"] == 1
+
+    def test_text_filter_kept_in_slices(self, stub, vacancies):
+        expected = {v["id"] for v in vacancies if "разработчик" in v["name"].lower()}
+        items = _partitioner(stub, {"area": 40, "text": "разработчик"}).run()
+        assert {it["id"] for it in items} == expected
+
+    def test_vacancies_posted_to_parent_area(self):
+        vacancies = list(generate_vacancies(500, seed=5, description_sentences=(0, 0)))
+        for v in vacancies[:150]:
+            v["area"] = "Казахстан"  # posted to the country, not a city
+        with StubHH(vacancies, cap=200) as s:
+            p = _partitioner(s, {"area": "40"})
+            items = p.run()
+        assert {it["id"] for it in items} == {v["id"] for v in vacancies}
+        assert p.stats["capped_slices"] == 0
+
+    def test_unsplittable_slice_is_capped(self):
+        same_time = [dict(v, area="Алматы", published_at="2025-05-01T10:00:00+05:00")
+                     for v in generate_vacancies(300, description_sentences=(0, 0))]
+        with StubHH(same_time, cap=200) as s:
+            p = _partitioner(s, {"area": "160"})
+            items = p.run()
+        assert len(items) == 200
+        assert p.stats["capped_slices"] == 1
+
+
+class TestRateLimiter:
+    def test_spaces_calls(self):
+        limiter = RateLimiter(rate=100)
+        t0 = time.monotonic()
+        for _ in range(11):
+            limiter.wait()
+        assert time.monotonic() - t0 >= 0.09
+
+    def test_zero_rate_is_unlimited(self):
+        limiter = RateLimiter(rate=0)
+        t0 = time.monotonic()
+        for _ in range(1000):
+            limiter.wait()
+        assert time.monotonic() - t0 < 0.1
@@ -1,16 +1,24 @@
 
-from rag.pipeline import format_context, SYSTEM_PROMPT, RAG_PROMPT_TEMPLATE
+import time
+from datetime import datetime, timezone
+
+import faiss
+
+from benchmarks.stub_models import StubLLM
+from rag.pipeline import (
+    format_context, estimate_tokens, extractive_answer, rag_query, SYSTEM_PROMPT, RAG_PROMPT_TEMPLATE,
+)
 
 
 class TestFormatContext:
-    def _result(self, vid, name="Dev", employer="Co", area="Алматы", text="описание"):
+    def _result(self, vid, name="Dev", employer="Co", area="Алматы", text="описание", score=0.95):
         return {
             "vacancy_id": vid,
             "vacancy_name": name,
             "employer": employer,
             "area": area,
             "text": text,
-            "score": 0.95,
+            "score": score,
         }
 
     def test_basic_formatting(self):
@@ -38,6 +46,56 @@ class TestFormatContext:
         ctx = format_context([])
         assert ctx == ""
 
+    def test_highest_score_first(self):
+        results = [self._result("1", name="Low", score=0.1), self._result("2", name="High", score=0.9)]
+        ctx = format_context(results, max_chunks=1)
+        assert "High" in ctx
+        assert "Low" not in ctx
+
+
+class TestContextBudget:
+    def _long_result(self, vid, score=0.9):
+        desc = "\n".join(f"Требование номер {i} про Python и Django." for i in range(200))
+        text = f"Вакансия: Dev {vid}\nКомпания: Co\n\nОписание:\n{desc}"
+        return {"vacancy_id": vid, "vacancy_name": f"Dev {vid}", "employer": "Co",
+                "area": "Алматы", "text": text, "score": score}
+
+    def test_fits_budget(self):
+        results = [self._long_result(str(i)) for i in range(5)]
+        ctx = format_context(results, max_chunks=5, max_tokens=500)
+        assert estimate_tokens(ctx) <= 500
+        assert ctx.count("[Вакансия:") == 5
+
+    def test_metadata_kept_when_trimmed(self):
+        ctx = format_context([self._long_result("1")], max_tokens=200)
+        assert "Вакансия: Dev 1" in ctx
+        assert "Компания: Co" in ctx
+
+    def test_relevant_sentences_preferred(self):
+        text = "Вакансия: Dev\n\nОписание:\n" + "Пишем отчёты в Excel. " * 40 + "Нужен опыт с Kubernetes."
+        r = {"vacancy_id": "1", "vacancy_name": "Dev", "employer": "Co", "area": "Алматы",
+             "text": text, "score": 0.9}
+        ctx = format_context([r], max_tokens=100, question="опыт Kubernetes")
+        assert "Kubernetes" in ctx
+
+    def test_boilerplate_dropped(self):
+        text = "Вакансия: Dev\n\nОписание:\nТребования:\nPython\nМы предлагаем:\nДМС\nПеченьки"
+        r = {"vacancy_id": "1", "vacancy_name": "Dev", "employer": "Co", "area": "Алматы",
+             "text": text, "score": 0.9}
+        ctx = format_context([r], max_tokens=1000)
+        assert "Python" in ctx
+        assert "Печеньки" not in ctx
+
+    def test_work_conditions_kept(self):
+        text = "Вакансия: Dev\n\nОписание:\nТребования:\nPython\nУсловия:\nУдалённая работа, гибкий график"
+        r = {"vacancy_id": "1", "vacancy_name": "Dev", "employer": "Co", "area": "Алматы",
+             "text": text, "score": 0.9}
+        assert "Удалённая работа" in format_context([r], max_tokens=1000)
+
+    def test_no_budget_keeps_full_text(self):
+        r = self._long_result("1")
+        assert r["text"] in format_context([r])
+
 
 class TestPromptTemplates:
     def test_system_prompt_in_russian(self):
@@ -54,6 +112,98 @@ class TestPromptTemplates:
         assert "тест вопрос" in filled
 
 
+class TestExtractiveAnswer:
+    def _result(self, vid, desc, score, employer="Co", skills="", salary_from=None):
+        text = f"Вакансия: Dev {vid}\nКомпания: {employer}\nГород: Алматы\n\nОписание:\n{desc}"
+        return {"vacancy_id": vid, "vacancy_name": f"Dev {vid}", "employer": employer, "area": "Алматы",
+                "text": text, "score": score, "key_skills": skills, "salary_from": salary_from,
+                "salary_to": None, "salary_currency": "KZT" if salary_from else None}
 
-
-
+    def test_sentences_and_aggregates(self):
+        results = [
+            self._result("1", "Разработка сервисов на Django и PostgreSQL. Мы дружная команда профессионалов.",
+                         0.9, employer="Kaspi", skills="Python, Django", salary_from=600000),
+            self._result("2", "Поддержка внутренних сервисов компании. Настройка Django приложений и деплой.",
+                         0.8, employer="Kaspi", skills="python, SQL", salary_from=400000),
+            self._result("3", "Аналитика данных и построение отчётов для бизнеса.", 0.7, employer="Halyk",
+                         skills="SQL"),
+        ]
+        summary = extractive_answer("Какой опыт с Django нужен?", results, max_sentences=2)
+        assert summary["n_vacancies"] == 3
+        assert [s["vacancy_name"] for s in summary["sentences"]] == ["Dev 1", "Dev 2"]
+        assert all("Django" in s["text"] for s in summary["sentences"])
+        assert summary["salary"] == {"n": 2, "median": 500000.0, "min": 400000.0, "max": 600000.0,
+                                     "currency": "KZT"}
+        assert summary["skills"] == [("Python", 2), ("SQL", 2), ("Django", 1)]
+        assert summary["employers"] == [("Kaspi", 2), ("Halyk", 1)]
+        assert "медиана 500 000" in summary["answer"] and "Kaspi (2)" in summary["answer"]
+
+    def test_skips_fragments_and_metadata(self):
+        results = [self._result("1", "продолжение обрезанного предложения из прошлого чанка. "
+                                     "Полное предложение про разработку API. Обрезанное предложение в конце ча", 0.9)]
+        texts = [s["text"] for s in extractive_answer("разработка API", results)["sentences"]]
+        assert texts == ["Полное предложение про разработку API."]
+
+    def test_empty(self):
+        summary = extractive_answer("python", [])
+        assert summary["n_vacancies"] == 0 and summary["salary"] is None
+        assert summary["answer"] == "Подходящих вакансий не найдено."
+
+    def test_fast(self):
+        desc = " ".join(f"Предложение номер {i} про Python, Django и базы данных." for i in range(40))
+        results = [self._result(str(i), desc, 1 - i / 20, skills="Python, Django, SQL", salary_from=500000)
+                   for i in range(20)]
+        extractive_answer("Python Django", results)
+        t0 = time.perf_counter()
+        for _ in range(10):
+            extractive_answer("Python Django", results)
+        assert (time.perf_counter() - t0) / 10 < 0.05
+
+
+class TestLLMDeadline:
+    def test_slow_llm_falls_back(self, fake_index):
+        index, model, chunks = fake_index
+        with StubLLM(base_latency=1.0) as llm:
+            t0 = time.perf_counter()
+            response = rag_query("python", index, model, chunks, llm_backend="ollama", llm_deadline=0.1,
+                                 base_url=llm.url)
+            assert time.perf_counter() - t0 < 0.8
+            # The request was closed, not left generating: the server sees the client gone
+            while not llm.n_cancelled and time.perf_counter() - t0 < 5:
+                time.sleep(0.05)
+        assert llm.n_cancelled == 1 and llm.n_requests == 0
+        assert response["llm_timed_out"] and response["answer_source"] == "extractive"
+        assert response["answer"] == response["summary"]["answer"]
+
+    def test_llm_in_time(self, fake_index):
+        index, model, chunks = fake_index
+        with StubLLM() as llm:
+            response = rag_query("python", index, model, chunks, llm_backend="ollama", llm_deadline=10,
+                                 base_url=llm.url)
+        assert not response["llm_timed_out"] and response["answer_source"] == "llm"
+        assert response["answer"].startswith("Ответ заглушки")
+
+    def test_no_llm_answers_extractively(self, fake_index):
+        index, model, chunks = fake_index
+        response = rag_query("python", index, model, chunks, llm_backend="none")
+        assert response["answer_source"] == "extractive"
+        assert "По 4 найденным вакансиям" in response["answer"]
+
+
+class TestFreshness:
+    def test_decay_reaches_context_and_sources(self, fake_model):
+        chunks = [
+            {"vacancy_id": "1", "vacancy_name": "Старая", "text": "python python", "published_at": "2025-04-01"},
+            {"vacancy_id": "2", "vacancy_name": "Свежая", "text": "python data", "published_at": "2025-06-30"},
+        ]
+        model = fake_model
+        index = faiss.IndexFlatIP(len(fake_model.VOCAB))
+        index.add(model.encode([c["text"] for c in chunks]))
+        now = datetime(2025, 7, 1, tzinfo=timezone.utc).timestamp()
+
+        plain = rag_query("python", index, model, chunks, llm_backend="none", top_k=2)
+        assert [s["name"] for s in plain["sources"]] == ["Старая", "Свежая"]
+        fresh = rag_query("python", index, model, chunks, llm_backend="none", top_k=2,
+                          freshness={"now": now, "weight": 0.5})
+        assert [s["name"] for s in fresh["sources"]] == ["Свежая", "Старая"]
+        assert fresh["context"].index("Свежая") < fresh["context"].index("Старая")
@@ -0,0 +1,81 @@
+import json
+import os
+import pstats
+
+from rag.indexer import build_index, search
+from rag.metrics import span, trace
+from rag.profiling import Profiler, format_summary
+
+
+def _busy(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+class TestProfiler:
+    def test_writes_run_directory(self, tmp_path):
+        with Profiler("unit", out_dir=str(tmp_path), sample_interval=0.001) as prof:
+            with span("outer"):
+                with span("inner"):
+                    _busy(300_000)
+
+        assert os.path.dirname(prof.out_dir) == str(tmp_path)
+        assert sorted(os.listdir(prof.out_dir)) == ["profile.prof", "stacks.folded", "summary.json", "summary.txt"]
+
+        summary = json.load(open(os.path.join(prof.out_dir, "summary.json"), encoding="utf-8"))
+        assert [(s["name"], s["depth"]) for s in summary["stages"]] == [("outer", 0), ("inner", 1)]
+        assert {"ms", "cpu_ms", "peak_rss_mb"} <= set(summary["stages"][1])
+        assert summary["stages"][1]["cpu_ms"] > 0
+        assert any("_busy" in f["function"] for f in summary["top_functions"])
+        assert pstats.Stats(os.path.join(prof.out_dir, "profile.prof")).total_calls > 0
+
+    def test_folded_stacks(self, tmp_path):
+        with Profiler("unit", out_dir=str(tmp_path), cprofile=False, sample_interval=0.001) as prof:
+            _busy(2_000_000)
+        lines = open(os.path.join(prof.out_dir, "stacks.folded"), encoding="utf-8").read().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert stack.startswith("MainThread;")
+        assert any("_busy (test_profiling.py:" in line for line in lines)
+        assert not os.path.exists(os.path.join(prof.out_dir, "profile.prof"))
+
+    def test_trace_memory(self, tmp_path):
+        with Profiler("unit", out_dir=str(tmp_path), cprofile=False, sample_interval=0, trace_memory=True) as prof:
+            with span("alloc"):
+                data = [bytes(1024) for _ in range(2048)]
+        assert prof.summary["stages"][0]["alloc_mb"] >= 2
+        assert prof.summary["peak_traced_mb"] >= 2
+        assert "heap +MB" in format_summary(prof.summary)
+        del data
+
+    def test_caller_trace_joins_profile(self, tmp_path):
+        with Profiler("unit", out_dir=str(tmp_path), cprofile=False, sample_interval=0) as prof:
+            with trace() as t:
+                with span("search"):
+                    pass
+        assert t is prof.trace
+        assert [s["name"] for s in prof.summary["stages"]] == ["search"]
+
+    def test_concurrent_profiler_skips_cprofile(self, tmp_path):
+        with Profiler("first", out_dir=str(tmp_path), sample_interval=0) as first:
+            with Profiler("second", out_dir=str(tmp_path), sample_interval=0) as second:
+                with span("search"):
+                    _busy(10_000)
+        assert not first.busy and second.busy
+        assert second.summary["busy"] and second.summary["top_functions"] == []
+        assert not os.path.exists(os.path.join(second.out_dir, "profile.prof"))
+        assert os.path.exists(os.path.join(first.out_dir, "profile.prof"))
+        # Released: the next one profiles again
+        with Profiler("third", out_dir=str(tmp_path), sample_interval=0) as third:
+            pass
+        assert not third.busy
+
+    def test_build_and_query_stages(self, tmp_path, fake_model):
+        chunks = [{"vacancy_id": str(i), "text": "python data" if i % 2 else "java"} for i in range(20)]
+        model = fake_model
+        with Profiler("build_index", out_dir=str(tmp_path), sample_interval=0) as prof:
+            index, _, _ = build_index(chunks, model_name="fake", index_dir=str(tmp_path / "index"), model=model)
+            search("python", index, model, chunks, top_k=3)
+        names = [s["name"] for s in prof.summary["stages"]]
+        assert names[:4] == ["encode_passages", "faiss_add", "save_index", "build_columns"]
+        assert "faiss_search" in names
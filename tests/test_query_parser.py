@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from rag.indexer import _filter_mask, build_columns, parse_query, search
+
+CITIES = ["Алматы", "Астана", "Шымкент", "Караганда", "Усть-Каменогорск"]
+
+
+class TestParseQuery:
+    @pytest.mark.parametrize("query, text, filters", [
+        ("Backend с зарплатой от 500K в Алматы", "Backend", {"salary_min": 500_000, "city": "Алматы"}),
+        ("Java в Астане от 1.5 млн", "Java", {"salary_min": 1_500_000, "city": "Астана"}),
+        ("DevOps, зп от 800 000 тг", "DevOps", {"salary_min": 800_000}),
+        ("вакансии в Усть-Каменогорске", "вакансии", {"city": "Усть-Каменогорск"}),
+        ("python almaty", "python", {"city": "Алматы"}),
+        ("аналитик без опыта в Шымкенте", "аналитик", {"experience": ["Нет опыта"], "city": "Шымкент"}),
+        ("Golang опыт 1-3 года", "Golang", {"experience": ["От 1 до 3 лет"]}),
+        ("React 3+ года опыта", "React", {"experience": ["От 3 до 6 лет", "Более 6 лет"]}),
+        ("Python с опытом от 1 года", "Python", {"experience": ["От 1 до 3 лет", "От 3 до 6 лет", "Более 6 лет"]}),
+        # Upper bounds: "до N" is a maximum, never a minimum
+        ("Vue 3 до 500к", "Vue 3", {"salary_max": 500_000}),
+        ("Python от 300к до 600к", "Python", {"salary_min": 300_000, "salary_max": 600_000}),
+        ("QA до 2 лет опыта", "QA", {"experience": ["Нет опыта", "От 1 до 3 лет"]}),
+        ("Go опыт до 1 года", "Go", {"experience": ["Нет опыта"]}),
+    ])
+    def test_extracts(self, query, text, filters):
+        assert parse_query(query, CITIES) == (text, filters)
+
+    @pytest.mark.parametrize("query", ["Python 3 и Django", "топ 10 компаний", "Навыки для Data Science", "1С"])
+    def test_leaves_plain_queries(self, query):
+        assert parse_query(query, CITIES) == (query, {})
+
+    def test_currency(self):
+        _, filters = parse_query("ML от 150к руб", CITIES)
+        assert filters["salary_min"] == 900_000  # CURRENCY_RATES["RUR"] = 6
+
+    def test_only_known_cities(self):
+        assert parse_query("вакансии в Париже", CITIES) == ("вакансии в Париже", {})
+
+    def test_filters_only(self):
+        # Nothing left to embed: keep the query
+        assert parse_query("в Алматы", CITIES) == ("в Алматы", {"city": "Алматы"})
+
+    def test_fast(self):
+        queries = ["Backend с зарплатой от 500K в Алматы, опыт от 3 лет", "Python-разработчик", "ML в Астане"] * 300
+        parse_query(queries[0], CITIES)
+        t0 = time.perf_counter()
+        for q in queries:
+            parse_query(q, CITIES)
+        assert (time.perf_counter() - t0) / len(queries) < 1e-3
+
+
+class TestSearchIntegration:
+    def test_stated_filters_prefiltered(self, fake_index):
+        index, model, chunks = fake_index
+        results = search("python в Астане", index, model, chunks, top_k=4, parse_queries=True)
+        assert [r["vacancy_id"] for r in results] == ["2"]
+
+        results = search("python от 500K", index, model, chunks, top_k=4, parse_queries=True)
+        assert {r["vacancy_id"] for r in results} == {"2", "3"}
+
+        results = search("python до 500K", index, model, chunks, top_k=4, parse_queries=True)
+        assert [r["vacancy_id"] for r in results] == ["1"]
+
+    def test_explicit_filters_win(self, fake_index):
+        index, model, chunks = fake_index
+        results = search("python в Астане", index, model, chunks, top_k=4, filters={"city": "Алматы"},
+                         parse_queries=True)
+        assert {r["vacancy_id"] for r in results} == {"1", "3", "4"}
+
+    def test_city_and_experience_columns(self, fake_index):
+        _, _, chunks = fake_index
+        chunks = [dict(c, experience=e) for c, e in zip(chunks, ["Нет опыта", "От 1 до 3 лет", "Более 6 лет", ""])]
+        columns = build_columns(chunks)
+        assert columns["area_vocab"].tolist() == ["Алматы", "Астана"]
+        assert _filter_mask(columns, {"city": " алматы"}).tolist() == [True, False, True, True]
+        assert _filter_mask(columns, {"experience": ["От 3 до 6 лет", "Более 6 лет"]}).tolist() == \
+               [False, False, True, False]
+        assert _filter_mask(columns, {"city": "Париж"}).tolist() == [False] * 4
+
+    def test_old_columns_filter_per_chunk(self, fake_index):
+        index, model, chunks = fake_index
+        columns = {k: v for k, v in build_columns(chunks).items() if not k.startswith(("area_", "experience_"))}
+        results = search("python", index, model, chunks, top_k=4, filters={"city": "Астана"}, columns=columns)
+        assert [r["vacancy_id"] for r in results] == ["2"]
@@ -0,0 +1,43 @@
+import math
+
+import numpy as np
+
+from rag.salary import salary_columns, normalize_salary
+
+
+class TestSalaryColumns:
+    def test_range_kzt(self):
+        s = normalize_salary({"salary_from": 400000, "salary_to": 600000, "salary_currency": "KZT"})
+        assert s == {"salary_min": 400000, "salary_max": 600000, "salary_mid": 500000}
+
+    def test_from_only(self):
+        s = normalize_salary({"salary_from": 300000, "salary_to": None, "salary_currency": "KZT"})
+        assert s["salary_min"] == s["salary_max"] == s["salary_mid"] == 300000
+
+    def test_to_only(self):
+        s = normalize_salary({"salary_from": None, "salary_to": 500000, "salary_currency": "KZT"})
+        assert s["salary_min"] == s["salary_max"] == 500000
+
+    def test_currency_conversion(self):
+        s = normalize_salary({"salary_from": 1000, "salary_currency": "USD"},)
+        assert s["salary_min"] == 510000
+
+    def test_custom_rates(self):
+        cols = salary_columns([{"salary_from": 10, "salary_currency": "USD"}], rates={"USD": 2.0})
+        assert cols["salary_min"][0] == 20
+
+    def test_gross_to_net(self):
+        s = normalize_salary({"salary_from": 100000, "salary_currency": "KZT", "salary_gross": True})
+        assert s["salary_min"] == 81000
+
+    def test_no_salary_is_nan(self):
+        s = normalize_salary({"salary_from": None, "salary_to": 0, "salary_currency": None})
+        assert all(math.isnan(v) for v in s.values())
+
+    def test_unknown_currency_is_nan(self):
+        assert math.isnan(normalize_salary({"salary_from": 100, "salary_currency": "XXX"})["salary_mid"])
+
+    def test_columns_aligned(self, sample_vacancies):
+        cols = salary_columns(sample_vacancies)
+        assert all(len(c) == 3 for c in cols.values())
+        assert cols["salary_max"].dtype == np.float64
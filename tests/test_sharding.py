@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from benchmarks.stub_models import HashingEmbedder
+from benchmarks.synthetic import generate_vacancies
+from rag.chunker import chunk_documents
+from rag.indexer import build_columns, build_index, load_index, search_batch
+from rag.sharding import ShardedIndex, _merge_topk, assign_shards
+
+QUERIES = ["python разработчик", "data scientist алматы", "java spring", "менеджер проектов", "devops kubernetes"]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    chunks = chunk_documents(generate_vacancies(300, seed=3))
+    model = HashingEmbedder(dim=64)
+    return chunks, model, model.encode([c["text"] for c in chunks])
+
+
+def _ids(results):
+    return [[r["chunk_id"] for r in res] for res in results]
+
+
+def _scores(results):
+    return [[round(r["score"], 5) for r in res] for res in results]
+
+
+class TestAssignShards:
+    def test_hash_keeps_vacancy_together(self, corpus):
+        chunks, _, _ = corpus
+        assignment = assign_shards(chunks, 4, "hash")
+        shard_of = {}
+        for c, s in zip(chunks, assignment):
+            assert shard_of.setdefault(c["vacancy_id"], s) == s
+        assert set(assignment.tolist()) == {0, 1, 2, 3}
+
+    def test_area_whole_cities(self, corpus):
+        chunks, _, _ = corpus
+        assignment = assign_shards(chunks, 3, "area")
+        shard_of = {}
+        for c, s in zip(chunks, assignment):
+            assert shard_of.setdefault(c["area"], s) == s
+
+    def test_unknown(self, corpus):
+        with pytest.raises(ValueError):
+            assign_shards(corpus[0], 2, "employer")
+
+
+class TestShardedSearch:
+    @pytest.mark.parametrize("shard_by", ["hash", "area"])
+    @pytest.mark.parametrize("n_shards", [2, 5])
+    def test_same_results_as_single_index(self, corpus, tmp_path, shard_by, n_shards):
+        chunks, model, _ = corpus
+        single, _, _ = build_index(chunks, model_name="hashing", index_dir=str(tmp_path / "one"), model=model)
+        sharded, _, _ = build_index(chunks, model_name="hashing", index_dir=str(tmp_path / "many"), model=model,
+                                    shards=n_shards, shard_by=shard_by)
+        assert isinstance(sharded, ShardedIndex) and sharded.ntotal == single.ntotal
+
+        columns = build_columns(chunks)
+        filters = [None, {"city": "Алматы"}, {"salary_min": 400_000}, {"skills": ["Python"]},
+                   {"city": "Астана", "salary_min": 300_000}]
+        expected = search_batch(QUERIES, single, model, chunks, top_k=10, filters=filters, columns=columns)
+        got = search_batch(QUERIES, sharded, model, chunks, top_k=10, filters=filters, columns=columns)
+        assert _scores(got) == _scores(expected)
+        assert [set(i) for i in _ids(got)] == [set(i) for i in _ids(expected)]
+
+    def test_city_prunes_shards(self, corpus):
+        chunks, model, vecs = corpus
+        assignment = assign_shards(chunks, 4, "area")
+        areas = [sorted({c["area"].lower() for c, s in zip(chunks, assignment) if s == shard}) for shard in range(4)]
+        index = ShardedIndex.from_embeddings(vecs, assignment, 4, areas=areas)
+
+        route = index.route({"city": "Алматы"})
+        assert len(route) == 1
+        assert index.route({"salary_min": 1}) is None
+        assert index.route({"city": "Лондон"}) == ()
+
+        results = search_batch(["python"], index, model, chunks, top_k=5, filters=[{"city": "Алматы"}])[0]
+        assert results and all(r["area"] == "Алматы" for r in results)
+        assert search_batch(["python"], index, model, chunks, filters=[{"city": "Лондон"}])[0] == []
+
+    def test_mask_skips_shards(self, corpus):
+        chunks, _, vecs = corpus
+        index = ShardedIndex.from_embeddings(vecs, assign_shards(chunks, 4, "hash"), 4)
+        mask = np.zeros(len(chunks), dtype=bool)
+        mask[index.ids[2][:3]] = True
+        scores, ids = index.search(vecs[:1], 5, mask=mask)
+        assert set(ids[0][:3]) == set(index.ids[2][:3].tolist())
+        assert (ids[0][3:] == -1).all()
+
+    def test_load_roundtrip(self, corpus, tmp_path):
+        chunks, model, _ = corpus
+        built, _, _ = build_index(chunks, model_name="hashing", index_dir=str(tmp_path), model=model,
+                                  shards=3, shard_by="area")
+        loaded, _, loaded_chunks = load_index(str(tmp_path), model=model)
+        assert isinstance(loaded, ShardedIndex)
+        assert loaded.areas == built.areas
+        assert _ids(search_batch(QUERIES, loaded, model, loaded_chunks)) == \
+            _ids(search_batch(QUERIES, built, model, chunks))
+
+
+def test_merge_pads_missing():
+    parts = [(np.array([[0.9, 0.1]], dtype="float32"), np.array([[4, 7]])),
+             (np.array([[0.5]], dtype="float32"), np.array([[2]]))]
+    scores, ids = _merge_topk(parts, 4)
+    assert ids.tolist() == [[4, 2, 7, -1]]
+    assert scores[0, :3].tolist() == pytest.approx([0.9, 0.5, 0.1])
@@ -0,0 +1,59 @@
+import numpy as np
+
+from rag.skills import build_skill_matrix, skill_ids, skill_key, skills_vacancy_mask, split_skills, top_skills
+
+
+class TestSkillKey:
+    def test_case_and_spaces(self):
+        assert skill_key("  Docker  Compose ") == "docker compose"
+
+    def test_aliases(self):
+        assert skill_key("postgres") == skill_key("PostgreSQL")
+        assert skill_key("k8s") == skill_key("Kubernetes")
+
+    def test_split(self):
+        assert split_skills("Python, Django,  ,SQL") == ["Python", "Django", "SQL"]
+        assert split_skills(None) == []
+
+
+class TestSkillMatrix:
+    def _matrix(self):
+        return build_skill_matrix([
+            ["Python", "Django", "postgres"],
+            ["python", "PostgreSQL"],
+            ["Java"],
+            [],
+        ])
+
+    def test_vocab_canonical(self):
+        m = self._matrix()
+        assert sorted(m["skill_vocab"].tolist()) == ["Django", "Java", "PostgreSQL", "Python"]
+
+    def test_csr_rows(self):
+        m = self._matrix()
+        assert m["skill_indptr"].tolist() == [0, 3, 5, 6, 6]
+
+    def test_lookup_unknown(self):
+        m = self._matrix()
+        assert skill_ids(m, ["Cobol"]) == [-1]
+
+    def test_filter_intersection(self):
+        m = self._matrix()
+        assert skills_vacancy_mask(m, ["PYTHON", "postgresql"]).tolist() == [True, True, False, False]
+        assert not skills_vacancy_mask(m, ["Python", "Java"]).any()
+        assert not skills_vacancy_mask(m, ["Cobol"]).any()
+
+    def test_top_skills(self):
+        m = self._matrix()
+        top = top_skills(m, np.array([0, 1, 2, 3]), n=2)
+        assert top == [("Python", 2), ("PostgreSQL", 2)]
+
+    def test_top_skills_subset(self):
+        m = self._matrix()
+        assert top_skills(m, np.array([2, 2])) == [("Java", 1)]
+        assert top_skills(m, np.array([3])) == []
+
+    def test_empty(self):
+        m = build_skill_matrix([])
+        assert len(m["skill_vocab"]) == 0
+        assert not skills_vacancy_mask(m, ["Python"]).any()
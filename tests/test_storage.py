@@ -0,0 +1,104 @@
+import json
+
+from parser.storage import (
+    VacancyParquetWriter, append_parquet, iter_parquet, iter_vacancies, load_parquet, save_jsonl, save_parquet,
+    save_vacancies, vacancy_files,
+)
+
+
+class TestStreamingFormats:
+    def test_jsonl_roundtrip(self, tmp_path, sample_vacancies):
+        path = str(tmp_path / "v.jsonl")
+        assert save_jsonl(iter(sample_vacancies), path) == 3
+        assert list(iter_vacancies(path)) == sample_vacancies
+
+    def test_jsonl_compact(self, tmp_path, sample_vacancy):
+        path = tmp_path / "v.jsonl"
+        save_jsonl([sample_vacancy], str(path))
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert "Алматы" in lines[0]  # not \\u-escaped
+
+    def test_parquet_keeps_types(self, tmp_path, sample_vacancies):
+        path = str(tmp_path / "v.parquet")
+        assert save_parquet(sample_vacancies, path, batch_size=2) == 3
+        loaded = list(iter_vacancies(path))
+        assert [v["id"] for v in loaded] == ["12345", "67890", "11111"]
+        assert loaded[0]["salary_from"] == 500000
+        assert isinstance(loaded[0]["salary_from"], int)
+        assert loaded[1]["salary_to"] is None
+        assert loaded[1]["salary_gross"] is True
+
+    def test_legacy_json(self, tmp_path, sample_vacancies):
+        path = tmp_path / "v.json"
+        path.write_text(json.dumps(sample_vacancies, ensure_ascii=False), encoding="utf-8")
+        assert list(iter_vacancies(str(path))) == sample_vacancies
+
+    def test_save_by_extension(self, tmp_path, sample_vacancies):
+        for name in ("a.jsonl", "a.parquet", "a.json"):
+            path = str(tmp_path / name)
+            assert save_vacancies(iter(sample_vacancies), path) == 3
+            assert len(list(iter_vacancies(path))) == 3
+
+    def test_directory_and_glob(self, tmp_path, sample_vacancies):
+        save_jsonl(sample_vacancies[:2], str(tmp_path / "part-0.jsonl"))
+        save_jsonl(sample_vacancies[2:], str(tmp_path / "part-1.jsonl"))
+        (tmp_path / "notes.txt").write_text("skip me")
+        assert len(vacancy_files(str(tmp_path))) == 2
+        assert len(list(iter_vacancies(str(tmp_path)))) == 3
+        assert len(list(iter_vacancies(str(tmp_path / "part-*.jsonl")))) == 3
+
+
+class TestParquetBackend:
+    def _dataset(self, tmp_path, sample_vacancies):
+        path = str(tmp_path / "v.parquet")
+        save_parquet(sample_vacancies, path, batch_size=1)  # one row group per vacancy
+        return path
+
+    def test_column_projection(self, tmp_path, sample_vacancies):
+        path = self._dataset(tmp_path, sample_vacancies)
+        rows = list(iter_vacancies(path, columns=["id", "area"]))
+        assert rows[0] == {"id": "12345", "area": "Алматы"}
+
+    def test_predicate_pushdown(self, tmp_path, sample_vacancies):
+        path = self._dataset(tmp_path, sample_vacancies)
+        rows = list(iter_parquet(path, columns=["id"], filters=[("salary_from", ">=", 600000)]))
+        assert rows == [{"id": "67890"}]
+
+    def test_load_parquet_dataframe(self, tmp_path, sample_vacancies):
+        path = self._dataset(tmp_path, sample_vacancies)
+        df = load_parquet(path, columns=["id", "salary_from"], filters=[("area", "=", "Алматы")])
+        assert df["id"].tolist() == ["12345", "11111"]
+        assert "int64" in str(df["salary_from"].dtype)
+        assert df["salary_from"].isna().tolist() == [False, True]
+
+    def test_json_filters_match_parquet(self, tmp_path, sample_vacancies):
+        path = str(tmp_path / "v.jsonl")
+        save_jsonl(sample_vacancies, path)
+        rows = list(iter_vacancies(path, columns=["id"], filters=[("area", "=", "Алматы"), ("salary_to", "<", 400000)]))
+        assert rows == [{"id": "11111"}]
+
+    def test_append_parts(self, tmp_path, sample_vacancies):
+        dataset = str(tmp_path / "ds")
+        append_parquet(sample_vacancies[:1], dataset)
+        append_parquet(sample_vacancies[1:], dataset)
+        assert [v["id"] for v in iter_vacancies(dataset)] == ["12345", "67890", "11111"]
+        assert len(load_parquet(dataset, columns=["id"])) == 3
+
+    def test_append_after_removed_part(self, tmp_path, sample_vacancies):
+        dataset = tmp_path / "ds"
+        append_parquet(sample_vacancies[:1], str(dataset))
+        second = append_parquet(sample_vacancies[1:2], str(dataset))
+        (dataset / "part-00000.parquet").unlink()
+        third = append_parquet(sample_vacancies[2:], str(dataset))
+        assert third != second and third.endswith("part-00002.parquet")
+        assert [v["id"] for v in iter_vacancies(str(dataset))] == ["67890", "11111"]
+
+    def test_writer_row_groups(self, tmp_path, sample_vacancies):
+        import pyarrow.parquet as pq
+
+        path = str(tmp_path / "v.parquet")
+        with VacancyParquetWriter(path) as w:
+            w.write(sample_vacancies[:2])
+            w.write(sample_vacancies[2:])
+        assert pq.ParquetFile(path).num_row_groups == 2
@@ -0,0 +1,171 @@
+import pytest
+
+from benchmarks.stub_hh import StubHH
+from benchmarks.synthetic import generate_vacancies
+from parser.api import RateLimiter, fetch_vacancy_state
+from rag.chunker import chunk_documents
+from rag.freshness import to_timestamp
+from rag.indexer import build_columns, build_index, load_columns, load_index, read_index, search
+from rag.reloader import IndexReloader
+from rag.tombstones import (
+    add_tombstones, apply_tombstones, compact, deleted_ratio, expire_by_age, expire_via_api, load_tombstones,
+)
+from rag.versioning import current_version, list_versions, new_version_dir, publish, write_manifest
+
+
+@pytest.fixture
+def vacancies():
+    return list(generate_vacancies(60, seed=3, description_sentences=(1, 2)))
+
+
+@pytest.fixture
+def chunks(vacancies):
+    return chunk_documents(vacancies, max_chunk_length=300)
+
+
+def _ids(results):
+    return {r["vacancy_id"] for r in results}
+
+
+class TestDeletedBitmap:
+    def test_search_hides_tombstoned(self, tmp_path, chunks, fake_model, publish_build):
+        publish_build(tmp_path, chunks)
+        index, model, chunks = load_index(str(tmp_path), model=fake_model)
+        top = search("python", index, model, chunks, top_k=10, columns=load_columns(str(tmp_path)))
+        closed = sorted(_ids(top))[:3]
+
+        assert add_tombstones(str(tmp_path), closed, "archived") == 3
+        assert add_tombstones(str(tmp_path), closed, "archived") == 0
+        columns = apply_tombstones(load_columns(str(tmp_path)), chunks, str(tmp_path))
+        assert columns["deleted"].sum() == sum(c["vacancy_id"] in closed for c in chunks)
+
+        for filters in (None, {"salary_min": 1}, {"city": chunks[0]["area"]}):
+            results = search("python", index, model, chunks, top_k=len(chunks), filters=filters, columns=columns)
+            assert results and not _ids(results) & set(closed)
+        # Without the bitmap nothing is hidden
+        assert _ids(search("python", index, model, chunks, top_k=len(chunks))) >= set(closed)
+
+    def test_everything_deleted(self, tmp_path, chunks, fake_model, publish_build):
+        publish_build(tmp_path, chunks)
+        add_tombstones(str(tmp_path), {c["vacancy_id"] for c in chunks}, "expired")
+        columns = apply_tombstones(build_columns(chunks), chunks, str(tmp_path))
+        index, model, _ = load_index(str(tmp_path), model=fake_model)
+        assert search("python", index, model, chunks, columns=columns) == []
+
+
+class TestExpiry:
+    def test_via_api(self, tmp_path, vacancies, chunks, publish_build):
+        publish_build(tmp_path, chunks)
+        ids = [v["id"] for v in vacancies]
+        with StubHH(vacancies) as stub:
+            stub.close(ids[:5])
+            stub.close(ids[5:8], remove=True)
+            assert fetch_vacancy_state(ids[0], stub.url) == "archived"
+            assert fetch_vacancy_state(ids[5], stub.url) == "gone"
+            assert fetch_vacancy_state(ids[9], stub.url) == "open"
+
+            counts = expire_via_api(str(tmp_path), chunks, base_url=stub.url, limiter=RateLimiter(rate=0),
+                                    batch_size=16)
+            assert counts == {"open": len(ids) - 8, "archived": 5, "gone": 3, "failed": 0}
+            tombstones = load_tombstones(str(tmp_path))
+            assert {vid for vid, t in tombstones.items() if t["reason"] == "archived"} == set(ids[:5])
+            assert {vid for vid, t in tombstones.items() if t["reason"] == "gone"} == set(ids[5:8])
+
+            # Tombstoned vacancies are not checked again
+            before = stub.requests["detail"]
+            expire_via_api(str(tmp_path), chunks, base_url=stub.url, limiter=RateLimiter(rate=0))
+            assert stub.requests["detail"] - before == len(ids) - 8
+
+    def test_by_age(self, tmp_path, chunks):
+        now = max(to_timestamp(c["published_at"]) for c in chunks)
+        expired = expire_by_age(str(tmp_path), chunks, max_age_days=20, now=now)
+        assert expired
+        for c in chunks:
+            is_old = to_timestamp(c["published_at"]) < now - 20 * 86400
+            assert (c["vacancy_id"] in expired) == is_old
+        assert expire_by_age(str(tmp_path), chunks, max_age_days=20, now=now) == []
+
+    def test_republished_vacancy_is_live(self, tmp_path, chunks):
+        now = max(to_timestamp(c["published_at"]) for c in chunks)
+        vid = expire_by_age(str(tmp_path), chunks, max_age_days=20, now=now)[0]
+        assert load_tombstones(str(tmp_path))[vid]["published_at"]
+        republished = [dict(c, published_at="2030-01-01T00:00:00+05:00") if c["vacancy_id"] == vid else c
+                       for c in chunks]
+
+        deleted = apply_tombstones(build_columns(republished), republished, str(tmp_path))["deleted"]
+        assert not any(d for c, d in zip(republished, deleted) if c["vacancy_id"] == vid)
+        assert apply_tombstones(build_columns(chunks), chunks, str(tmp_path))["deleted"].sum() == deleted.sum() + \
+            sum(c["vacancy_id"] == vid for c in chunks)
+        # Aged out again: the tombstone moves to the new date
+        assert vid in expire_by_age(str(tmp_path), republished, max_age_days=20, now=to_timestamp("2030-03-01"))
+        assert load_tombstones(str(tmp_path))[vid]["published_at"] == "2030-01-01T00:00:00+05:00"
+
+
+class TestCompaction:
+    @pytest.mark.parametrize("shards", [1, 3])
+    def test_drops_rows_without_reembedding(self, tmp_path, chunks, shards, monkeypatch, fake_model):
+        version_dir = new_version_dir(str(tmp_path))
+        build_index(chunks, model_name="fake", index_dir=version_dir, model=fake_model, shards=shards)
+        write_manifest(version_dir)
+        v1 = publish(str(tmp_path), version_dir)
+        assert compact(str(tmp_path)) is None  # nothing tombstoned
+
+        closed = {chunks[0]["vacancy_id"], chunks[-1]["vacancy_id"]}
+        add_tombstones(str(tmp_path), closed, "archived")
+        index, model, _ = load_index(str(tmp_path), model=fake_model)
+        columns = apply_tombstones(load_columns(str(tmp_path)), chunks, str(tmp_path))
+        before = search("python data", index, model, chunks, top_k=10, columns=columns)
+
+        monkeypatch.setattr(type(fake_model), "encode", None)  # compaction must not embed anything
+        v2 = compact(str(tmp_path))
+        assert current_version(str(tmp_path)) == v2 != v1
+        index2, kept, config = read_index(str(tmp_path))
+        assert config.get("shards", 1) == shards
+        assert index2.ntotal == len(kept) == len(chunks) - columns["deleted"].sum()
+        assert not {c["vacancy_id"] for c in kept} & closed
+        monkeypatch.undo()
+
+        columns2 = apply_tombstones(load_columns(str(tmp_path)), kept, str(tmp_path))
+        assert deleted_ratio(columns2) == 0
+        after = search("python data", index2, fake_model, kept, top_k=10, columns=columns2)
+        assert [(r["vacancy_id"], r["chunk_index"]) for r in after] == \
+               [(r["vacancy_id"], r["chunk_index"]) for r in before]
+        assert [r["score"] for r in after] == pytest.approx([r["score"] for r in before])
+
+    def test_prunes_tombstones_of_vacancies_in_no_version(self, tmp_path, chunks, publish_build):
+        publish_build(tmp_path, chunks)
+        closed = {chunks[0]["vacancy_id"]}
+        add_tombstones(str(tmp_path), closed | {"gone-long-ago"}, "archived")
+        compact(str(tmp_path))
+        # The closed vacancy is still in the previous version, a rollback must keep it hidden
+        assert load_tombstones(str(tmp_path)).keys() == closed
+
+    def test_flat_root_rejected(self, tmp_path, chunks, fake_model):
+        build_index(chunks, model_name="fake", index_dir=str(tmp_path), model=fake_model)
+        with pytest.raises(ValueError):
+            compact(str(tmp_path))
+
+
+class TestReloader:
+    def test_tombstones_and_compaction(self, tmp_path, chunks, fake_model, publish_build):
+        v1 = publish_build(tmp_path, chunks)
+        reloader = IndexReloader(str(tmp_path), model=fake_model, compact_threshold=0.3)
+        first = reloader.current
+        assert reloader.check() is False and reloader.maybe_compact() is None
+
+        vacancy_ids = list(dict.fromkeys(c["vacancy_id"] for c in chunks))
+        add_tombstones(str(tmp_path), vacancy_ids[:5], "archived")
+        assert reloader.check() is True
+        snap = reloader.current
+        assert snap.version == v1 and snap.index is first.index
+        assert 0 < deleted_ratio(snap.columns) < 0.3
+        assert reloader.maybe_compact() is None
+
+        add_tombstones(str(tmp_path), vacancy_ids[5:30], "expired")
+        assert reloader.check() is True
+        assert deleted_ratio(reloader.current.columns) > 0.3
+        v2 = reloader.maybe_compact()
+        assert v2 and reloader.check() is True
+        assert reloader.current.version == v2
+        assert deleted_ratio(reloader.current.columns) == 0
+        assert v1 in list_versions(str(tmp_path))  # previous version kept for in-flight readers
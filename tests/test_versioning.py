@@ -0,0 +1,126 @@
+import gc
+import os
+import time
+import weakref
+
+import pytest
+
+from rag.analytics import load_analytics
+from rag.indexer import build_index, load_columns, load_index, search
+from rag.reloader import IndexReloader
+from rag.versioning import (
+    IndexIntegrityError, current_version, list_versions, new_version_dir, publish, resolve_index_dir,
+    verify_manifest, write_manifest,
+)
+
+
+def _chunks(n: int, text: str = "python") -> list[dict]:
+    return [{"vacancy_id": str(i), "text": f"{text} {i}", "area": "Алматы"} for i in range(n)]
+
+
+class TestPublish:
+    def test_current_pointer(self, tmp_path, fake_model, publish_build):
+        assert resolve_index_dir(str(tmp_path)) == str(tmp_path)
+        v1 = publish_build(tmp_path, _chunks(3))
+        assert current_version(str(tmp_path)) == v1
+        assert resolve_index_dir(str(tmp_path)) == os.path.join(str(tmp_path), "versions", v1)
+
+        v2 = publish_build(tmp_path, _chunks(5))
+        assert v2 > v1
+        index, _, chunks = load_index(str(tmp_path), model=fake_model)
+        assert index.ntotal == len(chunks) == 5
+        assert len(load_columns(str(tmp_path))["vacancy_row"]) == 5
+        assert load_analytics(str(tmp_path)) == {"n_vacancies": 5}
+        assert not os.path.exists(os.path.join(str(tmp_path), "CURRENT.tmp"))
+
+    def test_manifest_detects_corruption(self, tmp_path, fake_model):
+        version_dir = new_version_dir(str(tmp_path))
+        build_index(_chunks(3), model_name="fake", index_dir=version_dir, model=fake_model)
+        manifest = write_manifest(version_dir)
+        assert {"vacancies.index", "chunks.pkl", "columns.npz", "config.json"} <= set(manifest["files"])
+        verify_manifest(version_dir)
+
+        path = os.path.join(version_dir, "chunks.pkl")
+        data = bytearray(open(path, "rb").read())
+        data[-2] ^= 0xFF
+        open(path, "wb").write(bytes(data))
+        verify_manifest(version_dir, checksums=False)  # same size
+        with pytest.raises(IndexIntegrityError, match="checksum"):
+            verify_manifest(version_dir)
+        with pytest.raises(IndexIntegrityError):
+            publish(str(tmp_path), version_dir)
+        assert current_version(str(tmp_path)) is None
+
+        os.remove(path)
+        with pytest.raises(IndexIntegrityError, match="missing"):
+            verify_manifest(version_dir, checksums=False)
+
+    def test_keeps_newest_versions(self, tmp_path, publish_build):
+        versions = [publish_build(tmp_path, _chunks(2), keep=2) for _ in range(4)]
+        assert list_versions(str(tmp_path)) == versions[-2:]
+
+    def test_rejects_foreign_dir(self, tmp_path):
+        other = tmp_path / "elsewhere"
+        other.mkdir()
+        with pytest.raises(ValueError):
+            publish(str(tmp_path / "index"), str(other))
+
+
+class TestReloader:
+    def test_hot_reload(self, tmp_path, fake_model, publish_build):
+        v1 = publish_build(tmp_path, _chunks(3, "java"))
+        reloader = IndexReloader(str(tmp_path), model=fake_model)
+        old = reloader.current
+        assert old.version == v1 and old.analytics == {"n_vacancies": 3}
+        assert reloader.check() is False
+
+        v2 = publish_build(tmp_path, _chunks(6, "python"))
+        assert reloader.check() is True
+        new = reloader.current
+        assert new.version == v2 and new.index.ntotal == 6
+        assert new.model is old.model  # same model_name: encoder reused
+
+        # A request that took the old snapshot finishes on it
+        assert len(search("java", old.index, old.model, old.chunks, top_k=2)) == 2
+        ref = weakref.ref(old)
+        del old
+        gc.collect()
+        assert ref() is None
+
+    def test_bad_version_keeps_serving(self, tmp_path, fake_model, publish_build):
+        v1 = publish_build(tmp_path, _chunks(3))
+        reloader = IndexReloader(str(tmp_path), model=fake_model)
+
+        v2 = publish_build(tmp_path, _chunks(4))
+        os.remove(os.path.join(str(tmp_path), "versions", v2, "chunks.pkl"))
+        assert reloader.check() is False
+        assert reloader.current.version == v1
+        assert v2 in reloader.last_error
+        assert reloader.check() is False  # not retried until CURRENT moves
+
+    def test_unloadable_version_with_valid_manifest(self, tmp_path, fake_model, publish_build):
+        v1 = publish_build(tmp_path, _chunks(3))
+        reloader = IndexReloader(str(tmp_path), model=fake_model)
+
+        v2 = publish_build(tmp_path, _chunks(4))
+        version_dir = os.path.join(str(tmp_path), "versions", v2)
+        with open(os.path.join(version_dir, "chunks.pkl"), "wb") as f:
+            f.write(b"not a pickle")
+        write_manifest(version_dir)  # checksums match, the load still fails
+        assert reloader.check() is False
+        assert reloader.current.version == v1
+        assert v2 in reloader.last_error
+        assert reloader.check() is False
+
+    def test_background_thread(self, tmp_path, fake_model, publish_build):
+        publish_build(tmp_path, _chunks(3))
+        reloader = IndexReloader(str(tmp_path), interval=0.01, model=fake_model).start()
+        try:
+            v2 = publish_build(tmp_path, _chunks(4))
+            for _ in range(500):
+                if reloader.current.version == v2:
+                    break
+                time.sleep(0.01)
+            assert reloader.current.version == v2
+        finally:
+            reloader.stop()